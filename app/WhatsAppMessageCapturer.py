@@ -4,29 +4,81 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import os
+import time
+
+# Mensagens recebidas (as do chatbot, do ponto de vista de quem testa)
+SELETOR_MENSAGEM_BOT = "div.message-in div.message-text"
+
+# Instala na página um MutationObserver que guarda as mensagens novas num buffer.
+# Cada mensagem recebe um número de sequência crescente; as que já estavam na tela são ignoradas.
+# arguments[0]: seletor CSS das mensagens; arguments[1]: primeiro número de sequência
+_SCRIPT_OBSERVAR = """
+const seletor = arguments[0];
+if (window.__capturador) return window.__capturador.proximo;
+const estado = {buffer: [], proximo: arguments[1], vistos: new WeakSet()};
+const registrar = (el) => {
+    if (estado.vistos.has(el)) return;
+    estado.vistos.add(el);
+    estado.buffer.push({seq: estado.proximo++, texto: el.innerText});
+};
+document.querySelectorAll(seletor).forEach((el) => estado.vistos.add(el));
+new MutationObserver((mutacoes) => {
+    for (const mutacao of mutacoes) {
+        for (const no of mutacao.addedNodes) {
+            if (no.nodeType !== Node.ELEMENT_NODE) continue;
+            if (no.matches(seletor)) registrar(no);
+            no.querySelectorAll(seletor).forEach(registrar);
+        }
+    }
+}).observe(document.body, {childList: true, subtree: true});
+window.__capturador = estado;
+return estado.proximo;
+"""
+
+# Descarta do buffer o que já foi recebido (seq <= arguments[0]) e devolve até arguments[1] mensagens.
+# Devolve null se o observador não existe mais (ex: página recarregada).
+_SCRIPT_DRENAR = """
+const estado = window.__capturador;
+if (!estado) return null;
+estado.buffer = estado.buffer.filter((m) => m.seq > arguments[0]);
+return estado.buffer.slice(0, arguments[1]);
+"""
+
 
 class WhatsAppMessageCapturer:
-    def __init__(self, porta_debug=9222):
+    def __init__(self, porta_debug=9222, driver=None, seletor_mensagem=SELETOR_MENSAGEM_BOT):
         """
         Conecta-se a uma instância do Chrome já aberta em modo de debug
         
         Args:
             porta_debug (int): Porta usada para remote debugging
+            driver: WebDriver já criado (ex: Chrome headless nos testes); se informado, porta_debug é ignorada
+            seletor_mensagem (str): Seletor CSS das mensagens do chatbot no modo de observação
         """
-        print("aqui 1")
+        self.seletor_mensagem = seletor_mensagem
+        # Maior número de sequência já entregue (marca d'água do modo de observação)
+        self.marca = -1
+        if driver is not None:
+            self.driver = driver
+            return
+
         # Configurações para conectar ao Chrome em execução
         chrome_options = Options()
         chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{porta_debug}")
-        print("aqui 2")
 
         # Caminho para o ChromeDriver (pode variar)
+        from webdriver_manager.chrome import ChromeDriverManager
         
         service = Service(ChromeDriverManager().install())
-        print("aqui 3")
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        print("aqui 3")
+        
+    def abrir_contato(self, contato, timeout=10):
+        """Localiza e clica no contato"""
+        contato_elemento = WebDriverWait(self.driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, f"//span[@title='{contato}']"))
+        )
+        contato_elemento.click()
         
     def capturar_ultima_mensagem(self, contato):
         """
@@ -39,14 +91,10 @@ class WhatsAppMessageCapturer:
             str: Texto da última mensagem
         """
         try:
-            # Localiza e clica no contato
-            contato_elemento = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, f"//span[@title='{contato}']"))
-            )
-            contato_elemento.click()
+            self.abrir_contato(contato)
             
             # Captura todas as mensagens
-            mensagens = self.driver.find_elements_by_css_selector("div.message-text")
+            mensagens = self.driver.find_elements(By.CSS_SELECTOR, "div.message-text")
             
             # Retorna a última mensagem
             if mensagens:
@@ -61,6 +109,74 @@ class WhatsAppMessageCapturer:
 
             return None
 
+    def iniciar_observador(self):
+        """
+        Instala o MutationObserver na página aberta (se ainda não estiver instalado).
+
+        A partir daí, só as mensagens que aparecerem depois são entregues por drenar().
+        """
+        self.driver.execute_script(_SCRIPT_OBSERVAR, self.seletor_mensagem, self.marca + 1)
+
+    def drenar(self, tamanho_lote=100):
+        """
+        Busca as mensagens novas do buffer da página numa única chamada de script.
+
+        A marca d'água garante que cada mensagem é entregue uma vez só: a página só descarta o que
+        já foi confirmado, e o que vier repetido (ex: após uma chamada que falhou) é ignorado aqui.
+
+        Returns:
+            list: Textos das mensagens novas, em ordem de chegada
+        """
+        itens = self.driver.execute_script(_SCRIPT_DRENAR, self.marca, tamanho_lote)
+        if itens is None:
+            # Página recarregada: reinstala o observador continuando a numeração
+            self.iniciar_observador()
+            return []
+        novas = []
+        for item in itens:
+            if item["seq"] > self.marca:
+                novas.append(item["texto"])
+                self.marca = item["seq"]
+        return novas
+
+    def observar(self, contato=None, intervalo=0.5, tamanho_lote=100, duracao=None):
+        """
+        Modo de observação: gera as mensagens novas do chatbot conforme chegam, sem reler a conversa.
+
+        Args:
+            contato (str): Contato a abrir antes de observar (None = conversa já aberta)
+            intervalo (float): Espera em segundos quando não há mensagem nova
+            tamanho_lote (int): Máximo de mensagens trazidas por chamada de script
+            duracao (float): Segundos de observação (None = até o gerador ser fechado)
+
+        Yields:
+            str: Texto de cada mensagem nova
+        """
+        if contato is not None:
+            self.abrir_contato(contato)
+        self.iniciar_observador()
+        fim = None if duracao is None else time.monotonic() + duracao
+        while fim is None or time.monotonic() < fim:
+            novas = self.drenar(tamanho_lote)
+            yield from novas
+            if len(novas) < tamanho_lote:
+                time.sleep(intervalo)
+
+    def validar_em_tempo_real(self, validador, contato=None, **kwargs):
+        """
+        Passa cada mensagem nova para `validador.validar_resposta` assim que ela chega.
+
+        Args:
+            validador: ChatbotIAValidator (ou outro objeto com validar_resposta)
+            contato (str): Contato a abrir antes de observar
+            **kwargs: Repassados a observar (intervalo, tamanho_lote, duracao)
+
+        Yields:
+            dict: Resultado da validação de cada mensagem
+        """
+        for mensagem in self.observar(contato, **kwargs):
+            yield validador.validar_resposta(mensagem)
+
 # Função para iniciar o Chrome em modo de debug
 def iniciar_chrome_debug(porta=9222):
     """
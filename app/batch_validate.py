@@ -0,0 +1,453 @@
+"""
+Valida em lote todas as conversas exportadas do WhatsApp de uma pasta, com retomada.
+
+Uso (a partir da pasta app/):
+    python batch_validate.py conversas/ resultados.jsonl --api-key ... --tamanho-lote 8
+    python batch_validate.py conversas/ resultados.parquet --trabalhadores 8 --embedding
+    python batch_validate.py conversas/ resultados.jsonl        # de novo: continua de onde parou
+
+Cada arquivo passa por ChatbotIAValidator.validar_exportacao (e, com --embedding, pela
+similaridade do EmbeddingValidator) num pool de threads. Os resultados são gravados à medida que
+os arquivos terminam: em JSONL, uma linha por mensagem; em Parquet, uma pasta com um arquivo
+part-NNNNN.parquet a cada --linhas-por-parte linhas ou --segundos-por-parte segundos, o que vier
+primeiro (uma queda sem aviso, como SIGKILL ou falta de memória, perde no máximo esse intervalo).
+
+O checkpoint (padrão: <saida>.checkpoint) tem uma linha por arquivo concluído, gravada só depois
+que os resultados dele estão no disco. Numa nova execução, arquivos do checkpoint com mesmo
+tamanho e data de modificação são pulados (sem chamar a IA de novo) e o que foi gravado depois
+do último checkpoint é descartado, então uma execução interrompida não duplica linhas. Arquivos
+modificados são validados de novo e as linhas da versão anterior saem da saída; se a saída
+sumiu ou está menor que o checkpoint, os arquivos afetados também são validados de novo.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from chatbot.validate_chatbot import PREFIXO_ERRO_API, ChatbotIAValidator
+from chatbot.whatsapp_parser import abrir_exportacao
+
+
+class Checkpoint:
+    """Arquivos já concluídos, num JSONL que só recebe linhas novas (tolera a última linha cortada)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.entradas = {}
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        entrada = json.loads(linha)
+                    except ValueError:
+                        # Execução interrompida no meio da escrita
+                        continue
+                    self.entradas[entrada["arquivo"]] = entrada
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+
+    def concluido(self, arquivo, assinatura):
+        entrada = self.entradas.get(arquivo)
+        return entrada is not None and entrada["assinatura"] == assinatura
+
+    def registrar(self, entrada):
+        self._arquivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self.entradas[entrada["arquivo"]] = entrada
+
+    def reescrever(self, entradas):
+        """Troca todo o conteúdo do checkpoint por `entradas`, de forma atômica."""
+        self._arquivo.close()
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            for entrada in entradas:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        self.entradas = {entrada["arquivo"]: entrada for entrada in entradas}
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class _SaidaJSONL:
+    """
+    Uma linha por mensagem; o checkpoint guarda o tamanho do arquivo depois de cada conversa.
+
+    As linhas dos arquivos em `descartar` (que serão validados de novo) são removidas na abertura.
+    """
+
+    def __init__(self, caminho, checkpoint, descartar=()):
+        validos = max((entrada.get("offset", 0) for entrada in checkpoint.entradas.values()), default=0)
+        tamanho = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+        if tamanho < validos:
+            # Saída apagada ou cortada: o checkpoint não vale mais, tudo é validado de novo
+            print(f"Aviso: {caminho} tem {tamanho} bytes, menos que os {validos} do checkpoint; "
+                  f"validando todos os arquivos de novo")
+            checkpoint.reescrever([])
+            validos = 0
+        self._arquivo = open(caminho, "ab")
+        # Descarta linhas gravadas depois do último checkpoint (execução interrompida)
+        self._arquivo.truncate(validos)
+        self._arquivo.seek(validos)
+        descartar = set(descartar) & set(checkpoint.entradas)
+        if descartar:
+            self._remover_linhas(caminho, checkpoint, descartar)
+
+    def _remover_linhas(self, caminho, checkpoint, descartar):
+        self._arquivo.close()
+        temporario = f"{caminho}.tmp"
+        with open(caminho, "rb") as origem, open(temporario, "wb") as destino:
+            for linha in origem:
+                if json.loads(linha)["arquivo"] not in descartar:
+                    destino.write(linha)
+            destino.flush()
+            os.fsync(destino.fileno())
+        # Se cair entre a troca da saída e a do checkpoint, a saída fica menor que o checkpoint
+        # e a próxima execução valida tudo de novo: nunca sobra linha de uma versão antiga
+        tamanho = os.path.getsize(temporario)
+        os.replace(temporario, caminho)
+        checkpoint.reescrever([
+            dict(entrada, offset=tamanho) for arquivo, entrada in checkpoint.entradas.items()
+            if arquivo not in descartar
+        ])
+        self._arquivo = open(caminho, "ab")
+
+    def escrever(self, entrada, resultados):
+        for resultado in resultados:
+            self._arquivo.write((json.dumps(resultado, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        return [dict(entrada, offset=self._arquivo.tell())]
+
+    def fechar(self):
+        self._arquivo.close()
+        return []
+
+
+_PARTE = re.compile(r"part-(\d+)\.parquet")
+
+
+class _SaidaParquet:
+    """
+    Pasta de arquivos part-NNNNN.parquet; conversas só entram no checkpoint quando a parte delas é gravada.
+
+    As partes com linhas dos arquivos em `descartar` são regravadas sem elas, com um nome novo.
+    """
+
+    def __init__(self, pasta, checkpoint, linhas_por_parte=50_000, descartar=(), segundos_por_parte=30.0):
+        self.pasta = pasta
+        self.linhas_por_parte = linhas_por_parte
+        self.segundos_por_parte = segundos_por_parte
+        self._inicio_parte = None
+        os.makedirs(pasta, exist_ok=True)
+        partes = {entrada["parte"] for entrada in checkpoint.entradas.values() if "parte" in entrada}
+        existentes = {nome for nome in os.listdir(pasta) if _PARTE.fullmatch(nome)}
+        # Um nome de parte nunca é reaproveitado, nem o de uma parte descartada abaixo
+        self._proxima = max((int(_PARTE.fullmatch(nome).group(1)) + 1 for nome in existentes | partes), default=0)
+        # Partes gravadas depois do último checkpoint
+        for nome in existentes:
+            if nome not in partes:
+                os.remove(os.path.join(pasta, nome))
+        self._linhas = []
+        self._entradas = []
+
+        perdidas = partes - existentes
+        if perdidas:
+            print(f"Aviso: {len(perdidas)} partes do checkpoint não existem em {pasta}; "
+                  f"os arquivos delas serão validados de novo")
+        descartar = set(descartar) & set(checkpoint.entradas)
+        if perdidas or descartar:
+            self._remover_linhas(checkpoint, descartar, perdidas)
+
+    def _remover_linhas(self, checkpoint, descartar, perdidas):
+        mantidas = [
+            entrada for arquivo, entrada in checkpoint.entradas.items()
+            if arquivo not in descartar and entrada.get("parte") not in perdidas
+        ]
+        afetadas = {checkpoint.entradas[arquivo]["parte"] for arquivo in descartar} - perdidas
+        novos_nomes = {}
+        for nome in sorted(afetadas):
+            if not any(entrada["parte"] == nome for entrada in mantidas):
+                continue
+            df = pd.read_parquet(os.path.join(self.pasta, nome))
+            novos_nomes[nome] = self._gravar_parte(df[~df["arquivo"].isin(descartar)])
+        # A troca do checkpoint é o passo atômico: antes dela valem as partes antigas, depois as novas
+        checkpoint.reescrever([dict(entrada, parte=novos_nomes.get(entrada["parte"], entrada["parte"]))
+                               for entrada in mantidas])
+        for nome in afetadas:
+            os.remove(os.path.join(self.pasta, nome))
+
+    def _gravar_parte(self, df):
+        nome = f"part-{self._proxima:05d}.parquet"
+        caminho_temporario = os.path.join(self.pasta, f".{nome}.tmp")
+        df.to_parquet(caminho_temporario, index=False)
+        os.replace(caminho_temporario, os.path.join(self.pasta, nome))
+        self._proxima += 1
+        return nome
+
+    def escrever(self, entrada, resultados):
+        self._linhas.extend(resultados)
+        self._entradas.append(entrada)
+        if self._inicio_parte is None:
+            self._inicio_parte = time.monotonic()
+        # Também por tempo: sem isso, uma queda perderia tudo desde a última parte cheia
+        if len(self._linhas) >= self.linhas_por_parte or \
+                time.monotonic() - self._inicio_parte >= self.segundos_por_parte:
+            return self._gravar()
+        return []
+
+    def _gravar(self):
+        if not self._entradas:
+            return []
+        # Vereditos e detalhes têm chaves variáveis: guardados como texto JSON
+        linhas = [
+            {chave: json.dumps(valor, ensure_ascii=False) if isinstance(valor, (dict, list)) else valor
+             for chave, valor in linha.items()}
+            for linha in self._linhas
+        ]
+        nome = self._gravar_parte(pd.DataFrame(linhas))
+        confirmadas = [dict(entrada, parte=nome) for entrada in self._entradas]
+        self._linhas, self._entradas, self._inicio_parte = [], [], None
+        return confirmadas
+
+    def fechar(self):
+        return self._gravar()
+
+
+def abrir_saida(caminho, checkpoint, linhas_por_parte=50_000, descartar=(), segundos_por_parte=30.0):
+    """
+    Saída JSONL ou Parquet, já sem o que não vale mais.
+
+    Linhas gravadas depois do último checkpoint e linhas dos arquivos em `descartar` (que serão
+    validados de novo) são removidas; arquivos cuja saída sumiu saem do checkpoint.
+    """
+    if caminho.endswith(".parquet"):
+        return _SaidaParquet(caminho, checkpoint, linhas_por_parte, descartar, segundos_por_parte)
+    return _SaidaJSONL(caminho, checkpoint, descartar)
+
+
+def listar_conversas(entrada, padrao="*.txt"):
+    """Caminhos relativos (ordenados) dos arquivos de `entrada` que casam com `padrao`, em subpastas também."""
+    raiz = Path(entrada)
+    return sorted(str(caminho.relative_to(raiz)) for caminho in raiz.rglob(padrao) if caminho.is_file())
+
+
+def _assinatura(caminho):
+    estado = os.stat(caminho)
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+def _formatar_duracao(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}m{segundos:02d}s" if horas else f"{minutos}m{segundos:02d}s"
+
+
+class BatchValidator:
+    """
+    Valida arquivos de conversa em paralelo e grava os resultados com checkpoint.
+
+    Args:
+        validador_ia: ChatbotIAValidator (com tamanho_lote > 1, as mensagens de cada bloco vão em lote)
+        validador_embedding: EmbeddingValidator opcional; acrescenta nota_similaridade e
+            detalhes_similaridade a cada mensagem
+        trabalhadores (int): Arquivos validados ao mesmo tempo
+        intervalo_progresso (float): Segundos entre as linhas de progresso
+        saida_progresso: Onde imprimir o progresso (padrão: sys.stderr)
+    """
+
+    def __init__(self, validador_ia, validador_embedding=None, trabalhadores=4, intervalo_progresso=5.0,
+                 saida_progresso=None):
+        self.validador_ia = validador_ia
+        self.validador_embedding = validador_embedding
+        self.trabalhadores = trabalhadores
+        self.intervalo_progresso = intervalo_progresso
+        self.saida_progresso = saida_progresso or sys.stderr
+        # O modelo de embeddings é um só: uma thread por vez
+        self._trava_embedding = threading.Lock()
+
+    def validar_arquivo(self, caminho, arquivo):
+        """
+        Resultados de todas as mensagens do chatbot de um arquivo, com a coluna "arquivo".
+
+        Raises:
+            RuntimeError: Se alguma mensagem ficou sem veredito por erro na API (o arquivo não
+                entra no checkpoint e é tentado de novo na próxima execução)
+        """
+        with abrir_exportacao(caminho) as origem:
+            resultados = list(self.validador_ia.validar_exportacao(origem))
+        erros = [resultado["observacoes"] for resultado in resultados
+                 if resultado.get("observacoes", "").startswith(PREFIXO_ERRO_API)]
+        if erros:
+            raise RuntimeError(f"{len(erros)} de {len(resultados)} mensagens sem veredito ({erros[0]})")
+        if self.validador_embedding is not None and resultados:
+            with self._trava_embedding:
+                similaridades = self.validador_embedding.calcular_similaridade_lote(
+                    [resultado["mensagem_original"] for resultado in resultados]
+                )
+            for resultado, similaridade in zip(resultados, similaridades):
+                resultado["nota_similaridade"] = similaridade["nota"]
+                resultado["detalhes_similaridade"] = similaridade["detalhes_validacao"]
+        for resultado in resultados:
+            resultado["arquivo"] = arquivo
+        return resultados
+
+    def validar_diretorio(self, entrada, saida, checkpoint=None, padrao="*.txt", linhas_por_parte=50_000,
+                          segundos_por_parte=30.0):
+        """
+        Valida os arquivos de `entrada` ainda não concluídos e grava os resultados em `saida`.
+
+        Args:
+            entrada (str): Pasta com as exportações (subpastas incluídas)
+            saida (str): Arquivo .jsonl, ou pasta .parquet
+            checkpoint (str): Arquivo de checkpoint (padrão: saida + ".checkpoint")
+            padrao (str): Padrão dos nomes de arquivo
+            linhas_por_parte (int): Linhas por arquivo Parquet
+            segundos_por_parte (float): Tempo máximo até gravar uma parte (e registrar os arquivos
+                dela no checkpoint), mesmo sem chegar a linhas_por_parte
+
+        Returns:
+            dict: arquivos (total), pulados, concluidos, falhas, mensagens e tempo (s)
+        """
+        checkpoint = Checkpoint(checkpoint or f"{saida}.checkpoint")
+        arquivos = listar_conversas(entrada, padrao)
+        assinaturas = {arquivo: _assinatura(os.path.join(entrada, arquivo)) for arquivo in arquivos}
+        # Arquivos modificados desde o checkpoint: as linhas antigas saem antes de validar de novo
+        modificados = {arquivo for arquivo, assinatura in assinaturas.items()
+                       if arquivo in checkpoint.entradas and not checkpoint.concluido(arquivo, assinatura)}
+        escritor = abrir_saida(saida, checkpoint, linhas_por_parte, descartar=modificados,
+                               segundos_por_parte=segundos_por_parte)
+        pendentes = [(arquivo, assinatura) for arquivo, assinatura in assinaturas.items()
+                     if not checkpoint.concluido(arquivo, assinatura)]
+
+        bytes_total = sum(assinatura[0] for _, assinatura in pendentes)
+        bytes_feitos = 0
+        resumo = {"arquivos": len(arquivos), "pulados": len(arquivos) - len(pendentes), "concluidos": 0,
+                  "falhas": 0, "mensagens": 0}
+        print(f"{len(arquivos)} arquivos, {resumo['pulados']} já concluídos, {len(pendentes)} a validar",
+              file=self.saida_progresso)
+
+        inicio = self._ultimo_progresso = time.perf_counter()
+        fila = iter(pendentes)
+        em_andamento = {}
+        executor = ThreadPoolExecutor(max_workers=self.trabalhadores)
+        try:
+            while True:
+                # No máximo 2 arquivos por trabalhador em memória
+                while len(em_andamento) < 2 * self.trabalhadores:
+                    proximo = next(fila, None)
+                    if proximo is None:
+                        break
+                    arquivo, _ = proximo
+                    futuro = executor.submit(self.validar_arquivo, os.path.join(entrada, arquivo), arquivo)
+                    em_andamento[futuro] = proximo
+                if not em_andamento:
+                    break
+                feitos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for futuro in feitos:
+                    arquivo, assinatura = em_andamento.pop(futuro)
+                    bytes_feitos += assinatura[0]
+                    try:
+                        resultados = futuro.result()
+                    except Exception as e:
+                        # Fica fora do checkpoint: será tentado de novo na próxima execução
+                        resumo["falhas"] += 1
+                        print(f"Aviso: falha ao validar {arquivo}: {type(e).__name__}: {e}", file=self.saida_progresso)
+                        continue
+                    entrada_checkpoint = {"arquivo": arquivo, "assinatura": assinatura, "mensagens": len(resultados)}
+                    for confirmada in escritor.escrever(entrada_checkpoint, resultados):
+                        checkpoint.registrar(confirmada)
+                    resumo["concluidos"] += 1
+                    resumo["mensagens"] += len(resultados)
+                self._progresso(resumo, len(pendentes), bytes_feitos, bytes_total, inicio)
+        except KeyboardInterrupt:
+            print("Interrompido: o que já está no checkpoint não será validado de novo.", file=self.saida_progresso)
+            for futuro in em_andamento:
+                futuro.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for confirmada in escritor.fechar():
+                checkpoint.registrar(confirmada)
+            checkpoint.fechar()
+
+        resumo["tempo"] = time.perf_counter() - inicio
+        self._progresso(resumo, len(pendentes), bytes_feitos, bytes_total, inicio, final=True)
+        return resumo
+
+    def _progresso(self, resumo, total, bytes_feitos, bytes_total, inicio, final=False):
+        agora = time.perf_counter()
+        if not final and agora - self._ultimo_progresso < self.intervalo_progresso:
+            return
+        self._ultimo_progresso = agora
+        decorrido = max(agora - inicio, 1e-9)
+        feitos = resumo["concluidos"] + resumo["falhas"]
+        if final:
+            estimativa = f"concluído em {_formatar_duracao(decorrido)}"
+        elif bytes_feitos:
+            # ETA pelos bytes: arquivos de tamanhos muito diferentes não distorcem a estimativa
+            estimativa = f"ETA {_formatar_duracao(decorrido * (bytes_total - bytes_feitos) / bytes_feitos)}"
+        else:
+            estimativa = "ETA ?"
+        print(f"{feitos}/{total} arquivos | {resumo['mensagens']} mensagens | "
+              f"{feitos / decorrido:.2f} arquivos/s, {resumo['mensagens'] / decorrido:.1f} mensagens/s | {estimativa}",
+              file=self.saida_progresso)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entrada", help="Pasta com as exportações do WhatsApp")
+    parser.add_argument("saida", help="resultados.jsonl, ou resultados.parquet (pasta)")
+    parser.add_argument("--padrao", default="*.txt")
+    parser.add_argument("--checkpoint", default=None, help="Padrão: <saida>.checkpoint")
+    parser.add_argument("--trabalhadores", type=int, default=4)
+    parser.add_argument("--api-key", default=None, help="Chave da API de IA (sem ela, vereditos simulados)")
+    parser.add_argument("--endpoint", default=None)
+    parser.add_argument("--modelo", default="gpt-4")
+    parser.add_argument("--tamanho-lote", type=int, default=1, help="Respostas por prompt na API")
+    parser.add_argument("--cache-vereditos", default=None, help="Arquivo SQLite do VerdictCache")
+    parser.add_argument("--embedding", action="store_true", help="Inclui a similaridade do EmbeddingValidator")
+    parser.add_argument("--cenarios", default=None, help="JSON de cenários do EmbeddingValidator")
+    parser.add_argument("--linhas-por-parte", type=int, default=50_000)
+    parser.add_argument("--segundos-por-parte", type=float, default=30.0,
+                        help="Grava uma parte Parquet pelo menos a cada tantos segundos")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache_vereditos:
+        from chatbot.verdict_cache import VerdictCache
+
+        cache = VerdictCache(args.cache_vereditos)
+    validador_ia = ChatbotIAValidator(api_key=args.api_key, endpoint=args.endpoint, modelo=args.modelo,
+                                      cache=cache, tamanho_lote=args.tamanho_lote,
+                                      tamanho_pool=max(10, args.trabalhadores))
+    validador_embedding = None
+    if args.embedding:
+        from embedding_validator import EmbeddingValidator
+
+        validador_embedding = EmbeddingValidator(registro=args.cenarios).warmup()
+
+    try:
+        resumo = BatchValidator(validador_ia, validador_embedding, trabalhadores=args.trabalhadores).validar_diretorio(
+            args.entrada, args.saida, checkpoint=args.checkpoint, padrao=args.padrao,
+            linhas_por_parte=args.linhas_por_parte, segundos_por_parte=args.segundos_por_parte
+        )
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+    finally:
+        validador_ia.fechar()
+    raise SystemExit(1 if resumo["falhas"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara a validação em série (validar_conversa) com a concorrente (validar_conversas) contra o
+servidor de teste com latência injetada, sem chamar a API real.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_async_validation
+    python -m benchmarks.bench_async_validation --conversas 20 --latencia 0.5 --concorrencia 1 4 8 16
+    python -m benchmarks.bench_async_validation --rpm 600     # com limite de requisições por minuto
+    python -m benchmarks.bench_async_validation --lote 5      # inclui o modo em lote (tamanho_lote=5)
+
+Cada conversa tem uma saudação (não relevante) e duas mensagens sobre o exame, como nos exemplos
+de validate_chatbot.py; cada mensagem relevante é uma chamada ao servidor (ou parte de um lote).
+"""
+import argparse
+import time
+
+from chatbot.mock_llm_server import MockLLMServer
+from chatbot.validate_chatbot import ChatbotIAValidator
+
+# Um nome diferente por conversa, para as mensagens não serem idênticas (o modo em lote não repete textos)
+CONVERSA = """[15:26, 06/02/2025] {nome}: olá
+[15:26, 06/02/2025] Futurotec Homologação: Olá, {nome}! Boa Tarde! Como posso ajudar?
+[15:27, 06/02/2025] {nome}: gostaria de listar meus exames
+[15:27, 06/02/2025] Futurotec Homologação: Olá, {nome}! Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.
+[15:27, 06/02/2025] Futurotec Homologação: {nome}, você realizou um exame de ULTRASSONOGRAFIA em 31/01/2025 e o laudo será disponibilizado em 03/02/2025."""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversas", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.3, help="Latência simulada por chamada (s)")
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rpm", type=float, default=None, help="Limite de requisições por minuto")
+    parser.add_argument("--tpm", type=float, default=None, help="Limite de tokens por minuto")
+    parser.add_argument("--lote", type=int, default=None, help="Também mede o modo em lote com este tamanho_lote")
+    args = parser.parse_args()
+
+    conversas = [CONVERSA.format(nome=f"Paciente {i}") for i in range(args.conversas)]
+    with MockLLMServer(latencia=args.latencia) as servidor:
+        validator = ChatbotIAValidator(api_key="teste", endpoint=servidor.url,
+                                       tamanho_pool=max(args.concorrencia))
+
+        inicio = time.perf_counter()
+        referencia = [validator.validar_conversa(conversa) for conversa in conversas]
+        tempo_serie = time.perf_counter() - inicio
+        chamadas = servidor.requisicoes
+        print(f"{args.conversas} conversas, {chamadas} chamadas, latência {args.latencia:.2f}s\n")
+        print(f"{'modo':>14} {'tempo (s)':>10} {'chamadas/s':>11} {'speedup':>8}")
+        print(f"{'série':>14} {tempo_serie:>10.2f} {chamadas / tempo_serie:>11.1f} {1:>7.1f}x")
+
+        for concorrencia in args.concorrencia:
+            inicio = time.perf_counter()
+            resultados = validator.validar_conversas(conversas, max_concorrencia=concorrencia,
+                                                     requisicoes_por_minuto=args.rpm,
+                                                     tokens_por_minuto=args.tpm)
+            tempo = time.perf_counter() - inicio
+            assert resultados == referencia, "resultado diferente do caminho em série"
+            print(f"{f'concorrência {concorrencia}':>14} {tempo:>10.2f} {chamadas / tempo:>11.1f} "
+                  f"{tempo_serie / tempo:>7.1f}x")
+        validator.fechar()
+
+        if args.lote:
+            validator_lote = ChatbotIAValidator(api_key="teste", endpoint=servidor.url, tamanho_lote=args.lote,
+                                                tamanho_pool=max(args.concorrencia))
+            for concorrencia in args.concorrencia:
+                antes = servidor.requisicoes
+                inicio = time.perf_counter()
+                validator_lote.validar_conversas(conversas, max_concorrencia=concorrencia,
+                                                 requisicoes_por_minuto=args.rpm, tokens_por_minuto=args.tpm)
+                tempo = time.perf_counter() - inicio
+                feitas = servidor.requisicoes - antes
+                print(f"{f'lote {args.lote}, conc. {concorrencia}':>14} {tempo:>10.2f} {chamadas / tempo:>11.1f} "
+                      f"{tempo_serie / tempo:>7.1f}x  ({feitas} requisições)")
+            validator_lote.fechar()
+        print(f"\nconexões TCP abertas no servidor: {servidor.conexoes}")
+
+
+if __name__ == "__main__":
+    main()
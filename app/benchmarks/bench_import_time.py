@@ -0,0 +1,75 @@
+"""
+Mede o tempo de partida a frio (import em um processo Python novo) de cada ponto de entrada.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --repeticoes 10 --detalhes
+
+Cada medição roda `python -c "<código>"` num subprocesso, então inclui o custo de iniciar o
+interpretador; a linha "python (vazio)" serve de referência. Com --detalhes, mostra os módulos
+mais caros de cada import (python -X importtime).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PONTOS_DE_ENTRADA = {
+    "python (vazio)": "pass",
+    "pre_processing.pre_processor": "import pre_processing.pre_processor",
+    "embedding_validator": "import embedding_validator",
+    "EmbeddingValidator()": "from embedding_validator import EmbeddingValidator; EmbeddingValidator()",
+    "chatbot.validate_chatbot": "import chatbot.validate_chatbot",
+    "ChatbotIAValidator()": "from chatbot.validate_chatbot import ChatbotIAValidator; ChatbotIAValidator()",
+    "sentiment_predictor": "import sentiment_predictor",
+    "training.training": "import training.training",
+    "training.training_embedding": "import training.training_embedding",
+}
+
+
+def medir(codigo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], cwd=APP_DIR, check=True, stderr=subprocess.DEVNULL)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def mais_caros(codigo, n=5):
+    # Linhas do -X importtime: "import time: self | cumulative | módulo"
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=APP_DIR,
+                           capture_output=True, text=True, check=True).stderr
+    modulos = []
+    for linha in saida.splitlines()[1:]:
+        partes = linha.split("|")
+        if len(partes) == 3:
+            modulos.append((int(partes[1]), partes[2].strip()))
+    return sorted(modulos, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--detalhes", action="store_true", help="Mostra os imports mais caros")
+    args = parser.parse_args()
+
+    print(f"{'ponto de entrada':<32} {'mediana (ms)':>12} {'mínimo (ms)':>12}")
+    for nome, codigo in PONTOS_DE_ENTRADA.items():
+        try:
+            tempos = medir(codigo, args.repeticoes)
+        except subprocess.CalledProcessError:
+            print(f"{nome:<32} {'falhou (dependência ausente?)':>25}")
+            continue
+        print(f"{nome:<32} {statistics.median(tempos) * 1000:>12.0f} {min(tempos) * 1000:>12.0f}")
+        if args.detalhes:
+            for acumulado, modulo in mais_caros(codigo):
+                print(f"{'':<4}{modulo:<40} {acumulado / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
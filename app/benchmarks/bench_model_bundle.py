@@ -0,0 +1,114 @@
+"""
+Compara o pacote de inferência (sentiment_predictor) com o pickle do sklearn: carga e vazão.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_model_bundle
+    python -m benchmarks.bench_model_bundle --documentos 200000 --vocabulario 20000 --ngramas
+
+Treina CountVectorizer + MultinomialNB (como training.train_model) sobre textos sintéticos já
+pré-processados, salva com joblib e com save_bundle e mede:
+  - carga a frio: processo Python novo que importa, carrega e classifica um texto;
+  - carga a quente: só a leitura dos arquivos, no mesmo processo;
+  - vazão: documentos por segundo de vectorizer.transform + model.predict contra predict_processed.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from sentiment_predictor import DEFAULT_PREPROCESSOR_CONFIG, SentimentPredictor, save_bundle
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO_JOBLIB = """
+import joblib
+model, vectorizer = joblib.load({caminho!r})
+model.predict(vectorizer.transform(["produt otim"]))
+"""
+
+CODIGO_PACOTE = """
+from sentiment_predictor import SentimentPredictor
+SentimentPredictor.load({caminho!r}).predict_processed(["produt otim"])
+"""
+
+
+def textos_sinteticos(n_documentos, tamanho_vocabulario, semente=42):
+    # Frequências de Zipf, como num corpus real; rótulos 1-5 dependentes das palavras
+    rng = np.random.default_rng(semente)
+    palavras = np.array([f"termo{i}" for i in range(tamanho_vocabulario)])
+    probabilidades = 1 / np.arange(1, tamanho_vocabulario + 1)
+    probabilidades /= probabilidades.sum()
+    textos, rotulos = [], []
+    for tamanho in rng.integers(3, 40, size=n_documentos):
+        indices = rng.choice(tamanho_vocabulario, size=tamanho, p=probabilidades)
+        textos.append(" ".join(palavras[indices]))
+        rotulos.append(int(indices.sum() % 5) + 1)
+    return textos, np.array(rotulos)
+
+
+def medir_subprocesso(codigo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], cwd=APP_DIR, check=True)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documentos", type=int, default=50_000)
+    parser.add_argument("--vocabulario", type=int, default=20_000, help="Palavras distintas no corpus sintético")
+    parser.add_argument("--max-features", type=int, default=5000, help="Como em training.train_model")
+    parser.add_argument("--ngramas", action="store_true", help="Vetorizador com ngram_range=(1, 2)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    textos, rotulos = textos_sinteticos(args.documentos, args.vocabulario)
+    vectorizer = CountVectorizer(max_features=args.max_features, ngram_range=(1, 2) if args.ngramas else (1, 1))
+    model = MultinomialNB().fit(vectorizer.fit_transform(textos), rotulos)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_joblib = os.path.join(pasta, "modelo.joblib")
+        caminho_pacote = os.path.join(pasta, "pacote")
+        joblib.dump((model, vectorizer), caminho_joblib)
+        save_bundle(caminho_pacote, model, vectorizer, DEFAULT_PREPROCESSOR_CONFIG)
+
+        print(f"{args.documentos} documentos, {len(vectorizer.vocabulary_)} termos, {len(model.classes_)} classes\n")
+        print(f"{'':<28} {'joblib + sklearn':>18} {'SentimentPredictor':>20}")
+        frio_joblib = medir_subprocesso(CODIGO_JOBLIB.format(caminho=caminho_joblib), args.repeticoes)
+        frio_pacote = medir_subprocesso(CODIGO_PACOTE.format(caminho=caminho_pacote), args.repeticoes)
+        print(f"{'carga a frio (ms)':<28} {frio_joblib * 1000:>18.0f} {frio_pacote * 1000:>20.0f}")
+
+        quente_joblib = medir(lambda: joblib.load(caminho_joblib), args.repeticoes)
+        quente_pacote = medir(lambda: SentimentPredictor.load(caminho_pacote), args.repeticoes)
+        print(f"{'carga a quente (ms)':<28} {quente_joblib * 1000:>18.1f} {quente_pacote * 1000:>20.1f}")
+
+        predictor = SentimentPredictor.load(caminho_pacote)
+        esperado = model.predict(vectorizer.transform(textos))
+        iguais = np.mean(predictor.predict_processed(textos) == esperado)
+        vazao_sklearn = len(textos) / medir(lambda: model.predict(vectorizer.transform(textos)), args.repeticoes)
+        vazao_pacote = len(textos) / medir(lambda: predictor.predict_processed(textos), args.repeticoes)
+        print(f"{'vazão (docs/s)':<28} {vazao_sklearn:>18,.0f} {vazao_pacote:>20,.0f}")
+        print(f"\nPredições iguais às do sklearn: {iguais:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Mede o ganho do pré-processamento em paralelo (process_texts / load_df_processed com n_jobs).
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_parallel_preprocessing
+    python -m benchmarks.bench_parallel_preprocessing --workers 1 2 4 8 --limit 50000
+
+Para cada número de workers imprime o tempo, as avaliações/s e o speedup em relação a 1 worker,
+e confere se o resultado é idêntico ao do caminho em série.
+
+Ainda não há números de speedup registrados para 1/2/4/8 workers. O ambiente em que o modo
+paralelo foi escrito não tinha o B2W-Reviews01.csv, nem os dados do NLTK (stopwords e
+tokenizador, sem acesso à rede para baixá-los), e tinha um único núcleo, onde mais workers não
+podem acelerar nada. O ganho precisa ser medido com este script numa máquina com vários
+núcleos, antes de mudar o n_jobs padrão de load_df_processed (hoje 1).
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from pre_processing.pre_processor import PortuguesePreprocessor, process_texts
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(APP_DIR, "pre_processing", "B2W-Reviews01.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Caminho do B2W-Reviews01.csv")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunksize", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=None, help="Usa apenas as N primeiras avaliações")
+    args = parser.parse_args()
+
+    reviews = pd.read_csv(args.csv, usecols=["review_text"], nrows=args.limit)["review_text"].tolist()
+    print(f"{len(reviews)} avaliações, chunksize={args.chunksize}, {os.cpu_count()} núcleos disponíveis\n")
+    print(f"{'workers':>7} {'tempo (s)':>10} {'aval./s':>10} {'speedup':>8}")
+
+    reference = None
+    serial_time = None
+    for n_jobs in args.workers:
+        # Cache de radicais novo a cada rodada, para não favorecer as execuções seguintes
+        preprocessor = PortuguesePreprocessor()
+        start = time.perf_counter()
+        processed = process_texts(reviews, n_jobs=n_jobs, chunksize=args.chunksize, preprocessor=preprocessor)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = processed
+        elif processed != reference:
+            raise SystemExit(f"Resultado com {n_jobs} workers difere do primeiro resultado")
+        if n_jobs == 1:
+            serial_time = elapsed
+        speedup = f"{serial_time / elapsed:.2f}x" if serial_time else "-"
+        print(f"{n_jobs:>7} {elapsed:>10.2f} {len(reviews) / elapsed:>10.0f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Mede a memória economizada e o desvio da nota com embeddings em float16/int8, contra o float32.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_quantization                      # modelo real + datasets/cenarios.json
+    python -m benchmarks.bench_quantization --respostas respostas.txt
+    python -m benchmarks.bench_quantization --sintetico --referencias 100000
+
+Em cada precisão, as referências e as respostas passam pela mesma quantização usada no
+ReferenceRegistry e no EmbeddingCache, e a nota é calculada como em EmbeddingValidator
+(round(max(similaridades) * 5, 2)).
+"""
+import argparse
+import os
+
+import numpy as np
+
+from embedding_quantization import PRECISOES, desquantizar, quantizar
+from reference_registry import ReferenceRegistry, normalizar_linhas
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESPOSTAS_EXEMPLO = [
+    "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+    "Olá! Encontrei seu exame de imagem para o próximo mês.",
+    "Bom dia! Seu ultrassom foi agendado e será processado em breve.",
+    "Olá, Jonas! Boa Tarde! Como posso ajudar?",
+    "Você realizou um exame de ULTRASSONOGRAFIA em 31/01/2025 e o laudo será disponibilizado em 03/02/2025.",
+    "Consultei seu histórico e identifiquei um exame ultrassonográfico do dia 31 de janeiro deste ano.",
+]
+
+
+def embeddings_modelo(caminho_cenarios, respostas):
+    from embedding_validator import EmbeddingValidator
+
+    validator = EmbeddingValidator(registro=caminho_cenarios)
+    embeddings_respostas = validator.cache.obter_lote(respostas, validator._codificar)
+    return validator.registro, embeddings_respostas
+
+
+def embeddings_sinteticos(n_referencias, n_respostas, dimensao, semente=42):
+    rng = np.random.default_rng(semente)
+    por_cenario = 20
+    registro = ReferenceRegistry([
+        {"nome": f"cenario_{i}", "respostas_referencia": [""] * por_cenario}
+        for i in range(max(1, n_referencias // por_cenario))
+    ])
+    referencias = normalizar_linhas(rng.normal(size=(len(registro.respostas_referencia), dimensao)))
+    registro.construir_embeddings(lambda _: referencias)
+    # Respostas próximas de referências existentes, para as notas cobrirem a faixa alta
+    base = referencias[rng.integers(0, len(referencias), size=n_respostas)]
+    respostas = normalizar_linhas(base + rng.normal(scale=0.05, size=base.shape))
+    return registro, respostas
+
+
+def notas(registro, embeddings_respostas):
+    # Nota de cada resposta no cenário com a referência mais similar
+    melhores = registro.melhores_cenarios(embeddings_respostas, k=1)
+    return np.array([pontuacao for ((_, pontuacao),) in melhores]) * 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cenarios", default=os.path.join(APP_DIR, "datasets", "cenarios.json"))
+    parser.add_argument("--respostas", default=None, help="Arquivo texto com uma resposta por linha")
+    parser.add_argument("--sintetico", action="store_true", help="Usa embeddings aleatórios em vez do modelo")
+    parser.add_argument("--referencias", type=int, default=10_000, help="Referências no modo sintético")
+    parser.add_argument("--n-respostas", type=int, default=2_000, help="Respostas no modo sintético")
+    parser.add_argument("--dimensao", type=int, default=384, help="Dimensão no modo sintético (MiniLM = 384)")
+    args = parser.parse_args()
+
+    if args.sintetico:
+        registro_base, embeddings_respostas = embeddings_sinteticos(args.referencias, args.n_respostas, args.dimensao)
+    else:
+        respostas = RESPOSTAS_EXEMPLO
+        if args.respostas:
+            with open(args.respostas, encoding="utf-8") as f:
+                respostas = [linha.strip() for linha in f if linha.strip()]
+        registro_base, embeddings_respostas = embeddings_modelo(args.cenarios, respostas)
+
+    referencias = registro_base.matriz
+    memoria_float32 = None
+    notas_float32 = None
+    print(f"{len(referencias)} referências, {len(embeddings_respostas)} respostas, dimensão {referencias.shape[1]}\n")
+    print(f"{'precisão':>9} {'memória':>12} {'economia':>9} {'desvio máx. nota':>17} {'notas arredondadas diferentes':>30}")
+    for precisao in PRECISOES:
+        registro = ReferenceRegistry([
+            {"nome": nome, "respostas_referencia": registro_base.respostas_do_cenario(nome)}
+            for nome in registro_base.nomes
+        ]).construir_embeddings(lambda _: referencias, precisao=precisao)
+        # Respostas como ficariam guardadas no cache em memória
+        respostas_guardadas = desquantizar(*quantizar(embeddings_respostas, precisao))
+        resultado = notas(registro, respostas_guardadas)
+
+        memoria = registro.memoria_bytes()
+        if precisao == "float32":
+            memoria_float32, notas_float32 = memoria, resultado
+        desvio = np.abs(resultado - notas_float32).max()
+        diferentes = int((np.round(resultado, 2) != np.round(notas_float32, 2)).sum())
+        economia = 1 - memoria / memoria_float32
+        print(f"{precisao:>9} {memoria / 1024:>10.1f}KB {economia:>8.0%} {desvio:>17.5f} {diferentes:>30}")
+
+
+if __name__ == "__main__":
+    main()
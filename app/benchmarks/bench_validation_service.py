@@ -0,0 +1,123 @@
+"""
+Teste de carga do serviço de validação (validation_service) em localhost.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_validation_service                     # modelo sintético, janelas 0 e 5 ms
+    python -m benchmarks.bench_validation_service --clientes 64 --requisicoes 2000 --janelas-ms 0 2 5 10
+    python -m benchmarks.bench_validation_service --modelo-real        # EmbeddingValidator de verdade
+    python -m benchmarks.bench_validation_service --url http://127.0.0.1:8080   # serviço já rodando
+
+O modelo sintético imita o custo do encode do sentence-transformer: um custo fixo por chamada
+(--custo-lote-ms) mais um custo por resposta (--custo-item-ms), então juntar requisições em
+lotes amortiza o custo fixo. A linha "sem lote" é a referência com uma resposta por chamada.
+Cada cliente é uma thread com sua Session (keep-alive); a latência p50/p99 é medida no cliente
+e os lotes vêm de GET /metricas.
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import requests
+
+from validation_service import ValidationService
+
+RESPOSTAS = [
+    "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+    "Olá! Encontrei seu exame de imagem para o próximo mês.",
+    "Bom dia! Seu ultrassom foi agendado e será processado em breve.",
+    "Olá, Jonas! Boa Tarde! Como posso ajudar?",
+]
+
+
+class SyntheticEmbeddingValidator:
+    """Mesma interface de EmbeddingValidator.calcular_similaridade_lote, com custo de tempo simulado."""
+
+    def __init__(self, custo_lote, custo_item):
+        self.custo_lote = custo_lote
+        self.custo_item = custo_item
+
+    def calcular_similaridade_lote(self, respostas, cenario=None):
+        time.sleep(self.custo_lote + self.custo_item * len(respostas))
+        return [{"nota": 4.0, "similaridades": [0.8]} for _ in respostas]
+
+
+def carga(url, clientes, requisicoes, usar_ia):
+    """Dispara `requisicoes` POST /validar divididos entre `clientes` threads; devolve latências e status."""
+    latencias, status = [], Counter()
+    trava = threading.Lock()
+    por_cliente = [requisicoes // clientes + (i < requisicoes % clientes) for i in range(clientes)]
+
+    def cliente(indice, quantidade):
+        locais, contagem = [], Counter()
+        with requests.Session() as sessao:
+            for n in range(quantidade):
+                payload = {"resposta": f"{RESPOSTAS[n % len(RESPOSTAS)]} ({indice}-{n})", "ia": usar_ia}
+                inicio = time.perf_counter()
+                resposta = sessao.post(f"{url}/validar", json=payload)
+                locais.append(time.perf_counter() - inicio)
+                contagem[resposta.status_code] += 1
+        with trava:
+            latencias.extend(locais)
+            status.update(contagem)
+
+    threads = [threading.Thread(target=cliente, args=(i, n)) for i, n in enumerate(por_cliente)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio, np.array(latencias), status
+
+
+def imprimir(rotulo, tempo, latencias, status, metricas):
+    p50, p99 = np.percentile(latencias, [50, 99]) * 1000
+    lotes = metricas["lotes"].get("embedding", {})
+    print(f"{rotulo:>12} {len(latencias) / tempo:>10.0f} {p50:>9.1f} {p99:>9.1f} "
+          f"{lotes.get('tamanho_medio_lote', 0):>11.1f} {dict(sorted(status.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Serviço já em execução (senão, um é iniciado aqui)")
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--janelas-ms", type=float, nargs="+", default=[0, 5])
+    parser.add_argument("--tamanho-fila", type=int, default=1024)
+    parser.add_argument("--custo-lote-ms", type=float, default=8.0)
+    parser.add_argument("--custo-item-ms", type=float, default=0.2)
+    parser.add_argument("--modelo-real", action="store_true", help="Usa EmbeddingValidator (sentence-transformers)")
+    parser.add_argument("--ia", action="store_true", help="Também consulta o ChatbotIAValidator (simulado)")
+    args = parser.parse_args()
+
+    print(f"{args.requisicoes} requisições, {args.clientes} clientes\n")
+    print(f"{'janela':>12} {'req/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'lote médio':>11} status")
+    if args.url:
+        tempo, latencias, status = carga(args.url, args.clientes, args.requisicoes, args.ia)
+        imprimir("externo", tempo, latencias, status, requests.get(f"{args.url}/metricas").json())
+        return
+
+    if args.modelo_real:
+        from embedding_validator import EmbeddingValidator
+
+        validador_embedding = EmbeddingValidator().warmup()
+    else:
+        validador_embedding = SyntheticEmbeddingValidator(args.custo_lote_ms / 1000, args.custo_item_ms / 1000)
+    validador_ia = None
+    if args.ia:
+        from chatbot.validate_chatbot import ChatbotIAValidator
+
+        validador_ia = ChatbotIAValidator(tamanho_lote=8)
+
+    # Referência: uma resposta por chamada ao modelo (tamanho_maximo_lote=1)
+    configuracoes = [("sem lote", 0, 1)] + [(f"{janela:g} ms", janela, 64) for janela in args.janelas_ms]
+    for rotulo, janela, tamanho_maximo_lote in configuracoes:
+        with ValidationService(validador_embedding, validador_ia, janela=janela / 1000,
+                               tamanho_maximo_lote=tamanho_maximo_lote, tamanho_fila=args.tamanho_fila) as servico:
+            tempo, latencias, status = carga(servico.url, args.clientes, args.requisicoes, args.ia)
+            imprimir(rotulo, tempo, latencias, status, servico.metricas())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compara get_average_word2vec (produto esparso) com a implementação original em laço.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.bench_word2vec
+    python -m benchmarks.bench_word2vec --docs 100000 --vocab 400000 --dim 50
+
+Os vetores e os documentos são sintéticos (distribuição de Zipf, como o vocabulário das
+avaliações), então o benchmark roda sem baixar o GloVe. Confere que as duas saídas coincidem.
+"""
+import argparse
+import time
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from training.training_embedding import get_average_word2vec
+
+
+def average_word2vec_loop(tokens_list, model, vector_size):
+    # Implementação anterior: lista de vetores + np.mean por documento
+    embeddings = []
+    for tokens in tokens_list:
+        word_vecs = [model[word] for word in tokens if word in model]
+        if len(word_vecs) == 0:
+            embeddings.append(np.zeros(vector_size))
+        else:
+            embeddings.append(np.mean(word_vecs, axis=0))
+    return np.array(embeddings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--vocab", type=int, default=400_000)
+    parser.add_argument("--dim", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens médios por documento")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    words = [f"w{i}" for i in range(args.vocab)]
+    model = KeyedVectors(vector_size=args.dim)
+    model.add_vectors(words, rng.normal(size=(args.vocab, args.dim)).astype(np.float32))
+
+    # A cauda da distribuição passa do tamanho do vocabulário e gera palavras fora do modelo,
+    # como os radicais do RSLP que o GloVe não conhece
+    lengths = rng.poisson(args.tokens, size=args.docs)
+    ranks = rng.zipf(1.2, size=int(lengths.sum())) - 1
+    flat = [f"w{r}" for r in ranks]
+    docs = []
+    offset = 0
+    for length in lengths:
+        docs.append(flat[offset:offset + length])
+        offset += length
+
+    start = time.perf_counter()
+    expected = average_word2vec_loop(docs, model, args.dim)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = get_average_word2vec(docs, model, vector_size=args.dim)
+    vectorized_time = time.perf_counter() - start
+
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
+    print(f"{args.docs} documentos, vocabulário {args.vocab}, dimensão {args.dim}")
+    print(f"laço original:  {loop_time:8.2f} s  ({args.docs / loop_time:10.0f} docs/s)")
+    print(f"vetorizado:     {vectorized_time:8.2f} s  ({args.docs / vectorized_time:10.0f} docs/s)")
+    print(f"speedup:        {loop_time / vectorized_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Suíte de benchmarks dos caminhos críticos, com baseline em JSON e detecção de regressão.
+
+Uso (a partir da pasta app/):
+    python -m benchmarks.suite                        # mede e compara com o baseline deste ambiente
+    python -m benchmarks.suite --salvar-baseline      # grava os números deste ambiente como baseline
+    python -m benchmarks.suite --casos train_model_bow validar_conversa --escala 0.5
+    python -m benchmarks.suite --saida resultados.json --limite 0.3
+
+Os dados vêm de benchmarks/synthetic.py (mesma semente, mesmos dados). Cada caso roda num
+processo Python novo, então o pico de RSS é o do caso e não o da suíte inteira. Para cada caso
+são registrados a vazão (itens/s), as latências p50/p95/p99 de cada chamada (ou de cada
+repetição, nos casos em lote) e o pico de RSS.
+
+Há regressão quando a vazão cai abaixo de (1 - limite) x baseline, a latência sobe acima de
+(1 + limite) x baseline ou o pico de RSS passa de (1 + limite_memoria) x baseline; nesse caso
+o comando sai com código 1. A latência comparada é o p99 nos casos com muitas chamadas
+cronometradas e a mediana nos casos em lote (poucas repetições: o p99 seria o pior valor e
+oscilaria demais). Casos sem as dependências instaladas (dados do NLTK, sentence-transformers)
+ficam como indisponíveis; isso também é regressão se o baseline tem números para o caso.
+
+Números de uma máquina não valem para outra: há um baseline por ambiente (sistema, arquitetura,
+núcleos e versão do Python) em benchmarks/baselines/, gravado com --salvar-baseline no próprio
+ambiente de destino. Sem baseline para o ambiente atual, ou com outra escala, não há comparação.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.synthetic import RESPOSTAS_BOT, gerar_avaliacoes, gerar_conversas, gerar_processados, gerar_vetores
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_BASELINES = os.path.join(APP_DIR, "benchmarks", "baselines")
+MARCADOR = "RESULTADO_BENCHMARK "
+# Abaixo disso a latência comparada é a mediana, e não o p99
+REPETICOES_MINIMAS_P99 = 20
+
+
+def _cronometrar_cada(funcao, itens):
+    """Latência de cada chamada funcao(item)."""
+    latencias = []
+    for item in itens:
+        inicio = time.perf_counter()
+        funcao(item)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def _repetir(funcao, repeticoes):
+    """Latência de cada repetição de funcao()."""
+    return _cronometrar_cada(lambda _: funcao(), range(repeticoes))
+
+
+# Cada caso recebe a escala e devolve (itens por chamada cronometrada, latências em segundos)
+
+def caso_pre_process_portuguese(escala):
+    from pre_processing.pre_processor import pre_process_portuguese
+
+    textos = gerar_avaliacoes(max(1, int(2_000 * escala)))["review_text"].tolist()
+    # Primeira chamada carrega stopwords, stemmer e tokenizador do NLTK
+    pre_process_portuguese(textos[0])
+    return 1, _cronometrar_cada(pre_process_portuguese, textos)
+
+
+def caso_load_df_processed(escala):
+    from pre_processing.pre_processor import load_df_processed, pre_process_portuguese
+
+    n = max(10, int(5_000 * escala))
+    pre_process_portuguese("aquecimento")
+    with tempfile.TemporaryDirectory() as pasta:
+        csv = os.path.join(pasta, "avaliacoes.csv")
+        gerar_avaliacoes(n).to_csv(csv, index=False)
+        return n, _repetir(lambda: load_df_processed(dataset_path=csv, use_cache=False), 5)
+
+
+def caso_train_model_bow(escala):
+    from training.training import train_model
+
+    df = gerar_processados(max(100, int(20_000 * escala)))
+    return len(df), _repetir(lambda: train_model(df), 5)
+
+
+def caso_train_model_embedding(escala):
+    from training.embedding_store import save_keyed_vectors
+    from training.training_embedding import train_model
+
+    df = gerar_processados(max(100, int(5_000 * escala)))
+    palavras = {palavra for texto in df["processed_text"] for palavra in texto.split()}
+    index_to_key, vetores = gerar_vetores(20_000, palavras=sorted(palavras))
+    with tempfile.TemporaryDirectory() as pasta:
+        # Mesmo formato de `python -m training.embedding_store convert`
+        caminho = os.path.join(pasta, "vetores")
+        save_keyed_vectors(SimpleNamespace(index_to_key=index_to_key, vectors=vetores), caminho)
+        return len(df), _repetir(lambda: train_model(df, embedding_path=caminho), 5)
+
+
+def caso_get_average_word2vec(escala):
+    from training.embedding_store import EmbeddingStore
+    from training.training_embedding import get_average_word2vec
+
+    textos = gerar_processados(max(100, int(50_000 * escala)))["processed_text"].tolist()
+    palavras = sorted({palavra for texto in textos for palavra in texto.split()})
+    vetores = EmbeddingStore(*reversed(gerar_vetores(100_000, palavras=palavras)))
+    return len(textos), _repetir(lambda: get_average_word2vec(textos, vetores, vector_size=vetores.vector_size), 7)
+
+
+def caso_calcular_similaridade(escala):
+    from embedding_validator import EmbeddingValidator
+
+    validator = EmbeddingValidator().warmup()
+    # Respostas distintas: cada chamada passa pelo modelo (sem acerto no cache)
+    respostas = [f"{RESPOSTAS_BOT[i % len(RESPOSTAS_BOT)].format(nome='Jonas')} ({i})"
+                 for i in range(max(1, int(200 * escala)))]
+    return 1, _cronometrar_cada(validator.calcular_similaridade, respostas)
+
+
+def caso_validar_conversa(escala):
+    from chatbot.mock_llm_server import MockLLMServer
+    from chatbot.validate_chatbot import ChatbotIAValidator
+
+    conversas = gerar_conversas(max(2, int(100 * escala)))
+    with MockLLMServer(latencia=0.002) as servidor:
+        validator = ChatbotIAValidator(api_key="teste", endpoint=servidor.url)
+        validator.validar_conversa(conversas[0])
+        latencias = _cronometrar_cada(validator.validar_conversa, conversas[1:])
+        validator.fechar()
+    return 1, latencias
+
+
+CASOS = {
+    "pre_process_portuguese": caso_pre_process_portuguese,
+    "load_df_processed": caso_load_df_processed,
+    "train_model_bow": caso_train_model_bow,
+    "train_model_embedding": caso_train_model_embedding,
+    "get_average_word2vec": caso_get_average_word2vec,
+    "calcular_similaridade": caso_calcular_similaridade,
+    "validar_conversa": caso_validar_conversa,
+}
+
+
+def pico_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _modulo_do_projeto(modulo):
+    raiz = (modulo or "").split(".")[0]
+    return bool(raiz) and (os.path.isdir(os.path.join(APP_DIR, raiz))
+                           or os.path.isfile(os.path.join(APP_DIR, f"{raiz}.py")))
+
+
+def executar_caso(nome, escala):
+    """Roda um caso neste processo e devolve o dict de métricas (ou {"indisponivel": motivo})."""
+    try:
+        itens, latencias = CASOS[nome](escala)
+    except (ImportError, LookupError, FileNotFoundError) as e:
+        if isinstance(e, ImportError) and _modulo_do_projeto(e.name):
+            # Import quebrado no próprio código, não dependência ausente
+            raise
+        # Dependência ausente: pacote não instalado, dados do NLTK ou modelo não baixados
+        # (a mensagem do NLTK começa com uma linha de asteriscos)
+        motivo = next((linha.strip() for linha in str(e).splitlines() if any(c.isalnum() for c in linha)), "")
+        return {"indisponivel": f"{type(e).__name__}: {motivo}"[:200]}
+    latencias = np.array(latencias)
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) * 1000
+    return {
+        "itens": itens * len(latencias),
+        "repeticoes": len(latencias),
+        "vazao": itens * len(latencias) / latencias.sum(),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "pico_rss_mb": pico_rss_mb(),
+    }
+
+
+def executar_em_subprocesso(nome, escala):
+    processo = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--executar-caso", nome, "--escala", str(escala)],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    for linha in reversed(processo.stdout.splitlines()):
+        if linha.startswith(MARCADOR):
+            return json.loads(linha[len(MARCADOR):])
+    erro = processo.stderr.strip().splitlines()
+    return {"erro": erro[-1] if erro else f"código de saída {processo.returncode}"}
+
+
+def ambiente():
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.machine(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+def chave_ambiente(amb):
+    """Identifica ambientes comparáveis: mesmo sistema, arquitetura, núcleos e Python (major.minor)."""
+    sistema = amb["plataforma"].split("-")[0].lower()
+    python = ".".join(amb["python"].split(".")[:2])
+    return f"{sistema}-{amb['processador']}-{amb['nucleos']}nucleos-py{python}"
+
+
+def caminho_baseline(amb=None):
+    return os.path.join(PASTA_BASELINES, f"{chave_ambiente(amb or ambiente())}.json")
+
+
+def comparar(casos, baseline, limite=0.25, limite_memoria=0.2):
+    """
+    Compara os resultados com o baseline.
+
+    Args:
+        casos (dict): Métricas por caso (ver executar_caso)
+        baseline (dict): Conteúdo de baseline.json
+        limite (float): Piora relativa tolerada na vazão e na latência (p99, ou mediana nos casos em lote)
+        limite_memoria (float): Aumento relativo tolerado no pico de RSS
+
+    Returns:
+        list: Descrição de cada regressão encontrada (vazia se não houver)
+    """
+    regressoes = []
+    for nome, atual in casos.items():
+        base = baseline.get("casos", {}).get(nome)
+        if base is None or "vazao" not in base:
+            continue
+        if "vazao" not in atual:
+            motivo = atual.get("indisponivel") or atual.get("erro", "")
+            regressoes.append(f"{nome}: sem resultado ({motivo}), mas o baseline tem números")
+            continue
+        if atual["vazao"] < base["vazao"] * (1 - limite):
+            regressoes.append(f"{nome}: vazão {atual['vazao']:.1f}/s < {base['vazao']:.1f}/s do baseline")
+        latencia = "p99_ms" if min(atual["repeticoes"], base["repeticoes"]) >= REPETICOES_MINIMAS_P99 else "p50_ms"
+        if atual[latencia] > base[latencia] * (1 + limite):
+            regressoes.append(f"{nome}: {latencia[:3]} {atual[latencia]:.2f} ms > "
+                              f"{base[latencia]:.2f} ms do baseline")
+        if atual["pico_rss_mb"] and base["pico_rss_mb"] and \
+                atual["pico_rss_mb"] > base["pico_rss_mb"] * (1 + limite_memoria):
+            regressoes.append(f"{nome}: pico de RSS {atual['pico_rss_mb']:.0f} MB > "
+                              f"{base['pico_rss_mb']:.0f} MB do baseline")
+    return regressoes
+
+
+def carregar_baseline(caminho, escala):
+    """Baseline de `caminho`, ou None (com aviso) se não existe ou não é comparável com esta execução."""
+    if not os.path.exists(caminho):
+        print(f"Aviso: sem baseline para este ambiente ({caminho}); comparação desativada. "
+              f"Grave um com --salvar-baseline")
+        return None
+    with open(caminho, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("escala") != escala:
+        print(f"Aviso: baseline gravado com escala {baseline.get('escala')}; comparação desativada")
+        return None
+    if chave_ambiente(baseline["ambiente"]) != chave_ambiente(ambiente()):
+        print(f"Aviso: baseline gravado em outro ambiente ({chave_ambiente(baseline['ambiente'])}); "
+              f"comparação desativada")
+        return None
+    return baseline
+
+
+def imprimir(casos, baseline):
+    print(f"{'caso':<24} {'vazão (itens/s)':>16} {'p50 (ms)':>10} {'p99 (ms)':>10} {'RSS (MB)':>9} {'vs baseline':>12}")
+    for nome, resultado in casos.items():
+        if "vazao" not in resultado:
+            print(f"{nome:<24} {resultado.get('indisponivel') or 'falhou: ' + resultado.get('erro', '')}")
+            continue
+        base = (baseline or {}).get("casos", {}).get(nome, {})
+        variacao = f"{resultado['vazao'] / base['vazao'] - 1:+.0%}" if "vazao" in base else "-"
+        rss = f"{resultado['pico_rss_mb']:.0f}" if resultado["pico_rss_mb"] else "-"
+        print(f"{nome:<24} {resultado['vazao']:>16,.1f} {resultado['p50_ms']:>10.2f} {resultado['p99_ms']:>10.2f} "
+              f"{rss:>9} {variacao:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--escala", type=float, default=1.0, help="Multiplica o tamanho dos dados de cada caso")
+    parser.add_argument("--baseline", default=None,
+                        help="Padrão: benchmarks/baselines/<ambiente>.json, o do ambiente atual")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados em --baseline")
+    parser.add_argument("--saida", default=None, help="Também grava os resultados neste JSON")
+    parser.add_argument("--limite", type=float, default=0.25, help="Piora tolerada na vazão e no p99 (0.25 = 25%%)")
+    parser.add_argument("--limite-memoria", type=float, default=0.2, help="Aumento tolerado no pico de RSS")
+    parser.add_argument("--executar-caso", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar_caso:
+        # Processo filho: um caso, resultado numa linha marcada (o caso pode imprimir outras coisas)
+        print(MARCADOR + json.dumps(executar_caso(args.executar_caso, args.escala)))
+        return
+
+    args.baseline = args.baseline or caminho_baseline()
+    baseline = None if args.salvar_baseline else carregar_baseline(args.baseline, args.escala)
+
+    casos = {}
+    for nome in args.casos:
+        print(f"Executando {nome}...", file=sys.stderr)
+        casos[nome] = executar_em_subprocesso(nome, args.escala)
+
+    resultado = {"ambiente": ambiente(), "escala": args.escala, "data": time.strftime("%Y-%m-%d"), "casos": casos}
+    imprimir(casos, baseline)
+    for caminho in filter(None, [args.saida, args.baseline if args.salvar_baseline else None]):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {caminho}")
+
+    falhas = [nome for nome, caso in casos.items() if "erro" in caso]
+    regressoes = comparar(casos, baseline, args.limite, args.limite_memoria) if baseline else []
+    if regressoes:
+        print("\nRegressões:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+    if falhas or regressoes:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Geradores determinísticos de dados sintéticos para os benchmarks (avaliações e conversas).
+
+A mesma semente gera sempre os mesmos dados, então os números de uma máquina são comparáveis
+entre execuções sem depender do B2W-Reviews01.csv nem de exportações reais do WhatsApp.
+"""
+import numpy as np
+import pandas as pd
+
+# Trechos por nota (1 a 5), combinados aleatoriamente em cada avaliação
+TRECHOS = {
+    1: ["produto chegou quebrado", "péssimo atendimento", "não recomendo de jeito nenhum",
+        "entrega atrasou mais de um mês", "veio com defeito e a loja não troca"],
+    2: ["qualidade ruim", "não funcionou como esperado", "material fraco",
+        "demorou para chegar", "a cor é diferente da foto"],
+    3: ["produto razoável", "cumpre o que promete", "preço justo mas nada demais",
+        "entrega no prazo", "esperava um pouco mais"],
+    4: ["bom produto", "chegou antes do prazo", "boa qualidade pelo preço",
+        "recomendo", "funciona bem no dia a dia"],
+    5: ["produto excelente", "superou minhas expectativas", "entrega muito rápida",
+        "ótima qualidade, recomendo a todos", "comprarei novamente com certeza"],
+}
+CONECTORES = [". ", ", ", " e ", "! ", "... "]
+# Proporção das notas parecida com a do dataset da B2W (mais avaliações positivas)
+PROPORCAO_NOTAS = [0.2, 0.06, 0.12, 0.25, 0.37]
+
+RESPOSTAS_BOT = [
+    "Olá, {nome}! Boa Tarde! Como posso ajudar?",
+    "{nome}, você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+    "Encontrei um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. Seu laudo está previsto para 03/02/2025.",
+    "Identifiquei um exame ultrassonográfico do dia 31 de janeiro deste ano. O resultado será liberado em 03/02.",
+    "Olá! Encontrei seu exame de imagem para o próximo mês.",
+    "Posso ajudar em algo mais?",
+]
+MENSAGENS_PACIENTE = ["olá", "gostaria de listar meus exames", "quando sai o laudo?", "obrigado", "ok"]
+REMETENTE_BOT = "Futurotec Homologação"
+
+
+def gerar_avaliacoes(n, semente=42):
+    """
+    Avaliações no formato do CSV da B2W.
+
+    Returns:
+        pd.DataFrame: Colunas overall_rating (1-5) e review_text
+    """
+    rng = np.random.default_rng(semente)
+    notas = rng.choice(np.arange(1, 6), size=n, p=PROPORCAO_NOTAS)
+    textos = []
+    for nota in notas:
+        # Maioria dos trechos da própria nota, alguns das vizinhas (avaliações misturadas)
+        trechos = []
+        for _ in range(rng.integers(1, 5)):
+            origem = int(np.clip(nota + rng.choice([-1, 0, 0, 0, 1]), 1, 5))
+            trechos.append(TRECHOS[origem][rng.integers(len(TRECHOS[origem]))])
+        texto = trechos[0]
+        for trecho in trechos[1:]:
+            texto += CONECTORES[rng.integers(len(CONECTORES))] + trecho
+        textos.append(texto.capitalize())
+    return pd.DataFrame({"overall_rating": notas.astype("int8"), "review_text": textos})
+
+
+def gerar_processados(n, semente=42):
+    """
+    Avaliações já no formato de load_df_processed (sentiment, processed_text), sem passar pelo NLTK.
+
+    O texto processado imita a saída do pré-processamento: minúsculas, sem pontuação nem palavras
+    curtas, e cada palavra cortada nos 6 primeiros caracteres no lugar do radical.
+    """
+    df = gerar_avaliacoes(n, semente)
+    processados = []
+    for texto in df["review_text"]:
+        palavras = "".join(c if c.isalpha() or c.isspace() else " " for c in texto.lower()).split()
+        processados.append(" ".join(palavra[:6] for palavra in palavras if len(palavra) >= 3))
+    return pd.DataFrame({"sentiment": df["overall_rating"], "processed_text": processados})
+
+
+def gerar_conversa(n_mensagens=10, semente=42, nome="Paciente"):
+    """Exportação do WhatsApp alternando paciente e chatbot, no formato lido por iterar_mensagens."""
+    rng = np.random.default_rng(semente)
+    linhas = []
+    for i in range(n_mensagens):
+        minuto = 26 + i
+        hora = f"{15 + minuto // 60}:{minuto % 60:02d}"
+        if i % 2 == 0:
+            remetente, texto = nome, MENSAGENS_PACIENTE[rng.integers(len(MENSAGENS_PACIENTE))]
+        else:
+            remetente, texto = REMETENTE_BOT, RESPOSTAS_BOT[rng.integers(len(RESPOSTAS_BOT))].format(nome=nome)
+        linhas.append(f"[{hora}, 06/02/2025] {remetente}: {texto}")
+    return "\n".join(linhas)
+
+
+def gerar_conversas(n, n_mensagens=10, semente=42):
+    """`n` conversas diferentes (nomes e sementes distintos), para não repetir respostas entre elas."""
+    return [gerar_conversa(n_mensagens, semente + i, nome=f"Paciente {i}") for i in range(n)]
+
+
+def gerar_vetores(n_palavras, dimensao=50, semente=42, palavras=()):
+    """
+    Vetores de palavras aleatórios no formato do EmbeddingStore (index_to_key, vectors).
+
+    As `palavras` informadas vêm primeiro no vocabulário; o resto é completado com termoN.
+    """
+    rng = np.random.default_rng(semente)
+    index_to_key = list(dict.fromkeys(palavras))
+    index_to_key += [f"termo{i}" for i in range(max(0, n_palavras - len(index_to_key)))]
+    vetores = rng.normal(size=(len(index_to_key), dimensao)).astype(np.float32)
+    return index_to_key, vetores
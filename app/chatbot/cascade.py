@@ -0,0 +1,330 @@
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List
+
+try:
+    from validate_chatbot import CONFIANCA_MINIMA
+except ImportError:
+    # Importado a partir de app/, como chatbot.cascade
+    from chatbot.validate_chatbot import CONFIANCA_MINIMA
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+
+# 31/01/2025, 31-01-25, 31.01 (ano opcional)
+_DATA_NUMERICA = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{4}|\d{2}))?\b")
+# 31 de janeiro, 1o de fevereiro de 2025 (texto já sem acentos; "1º" vira "1o")
+_DATA_EXTENSO = re.compile(
+    r"\b(\d{1,2})o?\s+de\s+(" + "|".join(MESES) + r")(?:\s+de\s+(\d{4}))?\b"
+)
+
+# Formas de escrever cada tipo de exame (texto sem acentos e em minúsculas)
+PADROES_EXAME = {
+    "ultrassonografia": re.compile(r"\b(?:ultra[\s-]?s{1,2}(?:om|onogra\w*)|usg|ecografia)\b"),
+}
+
+# Palavras que indicam a que data uma data citada se refere (texto sem acentos e em minúsculas)
+PALAVRAS_DATA = {
+    "data_realizacao": re.compile(r"\b(?:realiz\w*|feit[oa]s?|fez|coletad[oa]s?)\b"),
+    "data_laudo": re.compile(r"\b(?:laudos?|resultados?|liberad[oa]s?|previst[oa]s?|pront[oa]s?)\b"),
+}
+
+ESTAGIOS = ("filtro", "regras", "embedding", "ia")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos, para comparar variações de escrita."""
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def encontrar_datas(texto: str) -> set:
+    """
+    Datas citadas no texto (já normalizado), como (dia, mês, ano ou None).
+
+    Reconhece as formas numéricas (31/01/2025, 03/02) e por extenso (31 de janeiro de 2025).
+    """
+    return {data for _, _, data in _datas_com_posicao(texto)}
+
+
+def _datas_com_posicao(texto):
+    """(início, fim, data) de cada data citada, na ordem do texto."""
+    datas = []
+    for m in _DATA_NUMERICA.finditer(texto):
+        dia, mes, ano = m.groups()
+        datas.append((m.start(), m.end(), (int(dia), int(mes), _ano_completo(ano))))
+    for m in _DATA_EXTENSO.finditer(texto):
+        dia, mes, ano = m.groups()
+        datas.append((m.start(), m.end(), (int(dia), MESES[mes], _ano_completo(ano))))
+    return sorted(datas)
+
+
+def _mesma_data(citada, esperada):
+    # Datas sem ano valem para qualquer ano
+    return citada == esperada or (citada[2] is None and citada[:2] == esperada[:2])
+
+
+def _ano_completo(ano):
+    if not ano:
+        return None
+    ano = int(ano)
+    return ano + 2000 if ano < 100 else ano
+
+
+def data_esperada(valor: str):
+    """
+    A data (dia, mês, ano) de um campo "data_*" das informações esperadas.
+
+    Raises:
+        ValueError: Se o valor não tiver exatamente uma data
+    """
+    datas = encontrar_datas(normalizar(valor))
+    if len(datas) != 1:
+        raise ValueError(f"Esperada uma única data (dd/mm/aaaa), encontrado: {valor!r}")
+    return next(iter(datas))
+
+
+def data_citada(datas: set, esperada: str) -> bool:
+    """
+    Se a data esperada (dd/mm/aaaa) está entre as citadas; datas sem ano valem para qualquer ano.
+    Um valor esperado sem uma data reconhecível nunca é considerado citado.
+    """
+    try:
+        dia, mes, ano = data_esperada(esperada)
+    except ValueError:
+        return False
+    return (dia, mes, ano) in datas or (dia, mes, None) in datas
+
+
+def datas_trocadas(resposta: str, informacoes_esperadas: Dict[str, str]) -> bool:
+    """
+    Se alguma data aparece associada ao campo errado (ex: realização e laudo invertidos).
+
+    Cada data citada é atribuída ao campo da última palavra indicativa (PALAVRAS_DATA) entre
+    a data anterior e ela ("realizado em 31/01, laudo em 03/02"). Datas sem palavra indicativa
+    não são atribuídas a nenhum campo.
+    """
+    texto = normalizar(resposta)
+    inicio_trecho = 0
+    for inicio, fim, data in _datas_com_posicao(texto):
+        trecho = texto[inicio_trecho:inicio]
+        inicio_trecho = fim
+        indicacoes = [
+            (m.start(), campo) for campo, padrao in PALAVRAS_DATA.items()
+            if campo in informacoes_esperadas for m in padrao.finditer(trecho)
+        ]
+        if not indicacoes:
+            continue
+        _, campo = max(indicacoes)
+        if not _mesma_data(data, data_esperada(informacoes_esperadas[campo])):
+            return True
+    return False
+
+
+def exame_citado(texto: str, tipo_exame: str) -> bool:
+    esperado = normalizar(tipo_exame)
+    padrao = PADROES_EXAME.get(esperado)
+    if padrao is not None:
+        return padrao.search(texto) is not None
+    return re.search(rf"\b{re.escape(esperado)}\b", texto) is not None
+
+
+def campos_presentes(resposta: str, informacoes_esperadas: Dict[str, str]) -> Dict[str, bool]:
+    """
+    Quais informações esperadas aparecem na resposta, aceitando variações de formato.
+
+    Campos "data_*" são comparados como datas, "tipo_exame" pelas formas conhecidas do exame
+    e os demais como texto normalizado.
+
+    Returns:
+        dict: {campo: encontrado}
+    """
+    texto = normalizar(resposta)
+    datas = encontrar_datas(texto)
+    presentes = {}
+    for campo, valor in informacoes_esperadas.items():
+        if campo.startswith("data"):
+            presentes[campo] = data_citada(datas, valor)
+        elif campo == "tipo_exame":
+            presentes[campo] = exame_citado(texto, valor)
+        else:
+            presentes[campo] = normalizar(valor) in texto
+    return presentes
+
+
+def contradiz(resposta: str, informacoes_esperadas: Dict[str, str], presentes: Dict[str, bool]) -> bool:
+    """
+    Se a resposta pode estar errada em alguma informação esperada, e não só omiti-la.
+
+    Só datas podem faltar sem contradição, e desde que a resposta não cite nenhuma data
+    diferente das esperadas nem as troque de campo (ver datas_trocadas); qualquer outro campo
+    ausente conta como contradição.
+    """
+    if not all(encontrado for campo, encontrado in presentes.items() if not campo.startswith("data")):
+        return True
+    esperadas = {data_esperada(valor) for campo, valor in informacoes_esperadas.items() if campo.startswith("data")}
+    if any(not any(_mesma_data(data, e) for e in esperadas) for data in encontrar_datas(normalizar(resposta))):
+        return True
+    return datas_trocadas(resposta, informacoes_esperadas)
+
+
+class ValidationCascade:
+    """
+    Validação em cascata: cada resposta para no primeiro estágio que consegue decidir.
+
+    1. filtro: respostas que não falam de exame (mesmo critério de validar_resposta)
+    2. regras: todas as informações esperadas encontradas por expressões regulares
+       (com datas e nomes de exame normalizados), sem datas trocadas de campo -> válida,
+       sem chamar modelo
+    3. embedding: similaridade com as referências abaixo de `limiar_rejeicao` -> inválida;
+       acima de `limiar_aceite` -> válida, só se a resposta não contradiz nenhuma informação
+       esperada (ver `contradiz`), senão segue para a IA
+    4. ia: só as respostas ambíguas vão para o ChatbotIAValidator (em lotes, se configurado)
+
+    Os resultados têm o formato de validar_resposta, com a chave extra "estagio".
+    """
+
+    def __init__(self, validador_ia, validador_embedding=None, cenario=None,
+                 limiar_aceite=0.85, limiar_rejeicao=0.40, confianca_regras=0.95):
+        """
+        Args:
+            validador_ia: ChatbotIAValidator usado no último estágio (fornece também as informações esperadas)
+            validador_embedding: EmbeddingValidator do estágio de embedding (None = estágio desligado)
+            cenario: Cenário do EmbeddingValidator a comparar (None = o padrão dele)
+            limiar_aceite: Similaridade de cosseno a partir da qual a resposta é aceita sem IA; é
+                também a confiança do veredito, então não pode ficar abaixo de CONFIANCA_MINIMA
+            limiar_rejeicao: Similaridade abaixo da qual a resposta é rejeitada sem IA (confiança
+                do veredito: 1 - similaridade)
+            confianca_regras: Confiança atribuída às respostas resolvidas pelas regras
+        """
+        if limiar_rejeicao > limiar_aceite:
+            raise ValueError("limiar_rejeicao deve ser menor ou igual a limiar_aceite")
+        if limiar_aceite < CONFIANCA_MINIMA:
+            # Aceita com confiança abaixo da mínima sairia com resultado_geral False
+            raise ValueError(f"limiar_aceite deve ser pelo menos {CONFIANCA_MINIMA} (a confiança mínima do veredito)")
+        for campo, valor in validador_ia.informacoes_esperadas.items():
+            if campo.startswith("data"):
+                try:
+                    data_esperada(valor)
+                except ValueError as e:
+                    raise ValueError(f"informacoes_esperadas[{campo!r}]: {e}") from None
+        self.validador_ia = validador_ia
+        self.validador_embedding = validador_embedding
+        self.cenario = cenario
+        self.limiar_aceite = limiar_aceite
+        self.limiar_rejeicao = limiar_rejeicao
+        self.confianca_regras = confianca_regras
+        self.metricas = {estagio: {"entradas": 0, "resolvidas": 0, "tempo": 0.0} for estagio in ESTAGIOS}
+
+    @property
+    def informacoes_esperadas(self):
+        return self.validador_ia.informacoes_esperadas
+
+    def validar_conversa(self, texto_conversa: str) -> List[Dict[str, Any]]:
+        return self.validar_respostas(self.validador_ia.extrair_mensagens_chatbot(texto_conversa))
+
+    def validar_respostas(self, respostas: List[str]) -> List[Dict[str, Any]]:
+        """Valida as respostas passando pelos estágios; devolve os resultados na ordem de entrada."""
+        resultados = [None] * len(respostas)
+        pendentes = list(range(len(respostas)))
+
+        def filtro(indices):
+            resolvidos = {}
+            for i in indices:
+                if not self.validador_ia._relevante(respostas[i]):
+                    resolvidos[i] = self.validador_ia._resultado_irrelevante(respostas[i])
+                    resolvidos[i]["estagio"] = "filtro"
+            return resolvidos
+
+        pendentes = self._estagio("filtro", pendentes, filtro, resultados)
+
+        presentes = {}
+
+        def regras(indices):
+            resolvidos = {}
+            for i in indices:
+                presentes[i] = campos_presentes(respostas[i], self.informacoes_esperadas)
+                if all(presentes[i].values()) and not datas_trocadas(respostas[i], self.informacoes_esperadas):
+                    veredito = self._veredito(presentes[i], True, self.confianca_regras,
+                                              "Validação por regras: todas as informações esperadas encontradas.")
+                    resolvidos[i] = self._resultado(respostas[i], veredito, "regras")
+            return resolvidos
+
+        pendentes = self._estagio("regras", pendentes, regras, resultados)
+
+        if self.validador_embedding is not None:
+            pendentes = self._estagio("embedding", pendentes, lambda indices: self._por_embedding(
+                respostas, indices, presentes
+            ), resultados)
+
+        def ia(indices):
+            vereditos = self.validador_ia.consultar_ia_lote([respostas[i] for i in indices])
+            return {i: self._resultado(respostas[i], veredito, "ia") for i, veredito in zip(indices, vereditos)}
+
+        self._estagio("ia", pendentes, ia, resultados)
+        return resultados
+
+    def _estagio(self, nome, indices, resolver, resultados):
+        """Roda um estágio sobre `indices`, guarda os resolvidos e devolve os que continuam pendentes."""
+        if not indices:
+            return indices
+        inicio = time.perf_counter()
+        resolvidos = resolver(indices)
+        metricas = self.metricas[nome]
+        metricas["tempo"] += time.perf_counter() - inicio
+        metricas["entradas"] += len(indices)
+        metricas["resolvidas"] += len(resolvidos)
+        for i, resultado in resolvidos.items():
+            resultados[i] = resultado
+        return [i for i in indices if i not in resolvidos]
+
+    def _por_embedding(self, respostas, indices, presentes):
+        avaliacoes = self.validador_embedding.calcular_similaridade_lote(
+            [respostas[i] for i in indices], cenario=self.cenario
+        )
+        resolvidos = {}
+        for i, avaliacao in zip(indices, avaliacoes):
+            similaridade = float(max(avaliacao["similaridades"]))
+            if similaridade >= self.limiar_aceite:
+                # Similaridade alta não garante os dados certos (uma data trocada quase não muda o embedding)
+                if contradiz(respostas[i], self.informacoes_esperadas, presentes[i]):
+                    continue
+                correta, confianca = True, similaridade
+            elif similaridade < self.limiar_rejeicao:
+                # Confiança no veredito (inválida), não na semelhança
+                correta, confianca = False, 1 - similaridade
+            else:
+                continue
+            veredito = self._veredito(
+                presentes[i], correta, confianca,
+                f"Validação por similaridade com as referências ({similaridade:.2f})."
+            )
+            resolvidos[i] = self._resultado(respostas[i], veredito, "embedding")
+        return resolvidos
+
+    def _veredito(self, presentes, correta, confianca, observacoes):
+        # Mesmo formato do veredito da IA
+        veredito = {f"{campo}_presente": encontrado for campo, encontrado in presentes.items()}
+        veredito.update({"informacoes_corretas": correta, "confianca": confianca, "observacoes": observacoes})
+        return veredito
+
+    def _resultado(self, resposta, veredito, estagio):
+        resultado = self.validador_ia._montar_resultado(resposta, veredito)
+        resultado["estagio"] = estagio
+        return resultado
+
+    def estatisticas(self):
+        """
+        Por estágio: mensagens que chegaram, quantas ele resolveu, o tempo total (s) e a
+        latência média por mensagem que chegou ao estágio (ms).
+        """
+        return {
+            estagio: {
+                **metricas,
+                "latencia_media_ms": 1000 * metricas["tempo"] / metricas["entradas"] if metricas["entradas"] else 0.0,
+            }
+            for estagio, metricas in self.metricas.items()
+        }
@@ -0,0 +1,139 @@
+"""
+Servidor HTTP local que imita a API de chat (formato OpenAI), para testes e benchmarks sem rede.
+
+Uso:
+    with MockLLMServer(falhas=[(429, {"Retry-After": "0"})], latencia=0.05) as servidor:
+        validator = ChatbotIAValidator(api_key="teste", endpoint=servidor.url)
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VEREDITO_PADRAO = {
+    "tipo_exame_presente": True,
+    "data_realizacao_presente": True,
+    "data_laudo_presente": True,
+    "informacoes_corretas": True,
+    "confianca": 0.9,
+    "observacoes": "Resposta do servidor de teste."
+}
+
+
+
+def responder_padrao(payload):
+    """VEREDITO_PADRAO para prompts de uma resposta; um item por "indice" para prompts em lote."""
+    prompt = payload["messages"][-1]["content"]
+    if '"resultados"' in prompt:
+        indices = re.findall(r'"indice": (\d+)', prompt)
+        return {"resultados": [{"indice": int(i), **VEREDITO_PADRAO} for i in indices]}
+    return VEREDITO_PADRAO
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas; sem isso o Nagle + ACK atrasado somam ~40 ms por chamada
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.mock.registrar_conexao()
+
+    def do_POST(self):
+        mock = self.server.mock
+        tamanho = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(tamanho) or b"{}")
+        falha = mock.registrar_requisicao(payload)
+        if mock.latencia:
+            time.sleep(mock.latencia)
+
+        if falha is not None:
+            status, cabecalhos = falha
+            corpo = json.dumps({"error": {"message": f"falha simulada {status}"}}).encode("utf-8")
+        else:
+            status, cabecalhos = 200, {}
+            conteudo = mock.responder(payload)
+            corpo = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": json.dumps(conteudo)}}]
+            }).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição no terminal
+        pass
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cliente que desistiu por timeout fecha a conexão antes da resposta: esperado nos testes
+        pass
+
+
+class MockLLMServer:
+    """
+    Servidor de teste em uma thread, numa porta livre de 127.0.0.1.
+
+    Args:
+        falhas (list): Respostas de erro (status, cabeçalhos) devolvidas, em ordem, antes das de sucesso
+        latencia (float): Segundos de espera por requisição, para simular a latência da API
+        responder (callable): Recebe o payload da requisição e devolve o dict do veredito
+            (padrão: responder_padrao)
+    """
+
+    def __init__(self, falhas=None, latencia=0.0, responder=None):
+        self.falhas = list(falhas or [])
+        self.latencia = latencia
+        self.responder = responder or responder_padrao
+        self.requisicoes = 0
+        self.conexoes = 0
+        self.payloads = []
+        self._trava = threading.Lock()
+        self._servidor = None
+        self._thread = None
+
+    def registrar_conexao(self):
+        with self._trava:
+            self.conexoes += 1
+
+    def registrar_requisicao(self, payload):
+        """Conta a requisição e devolve a próxima falha programada (ou None)."""
+        with self._trava:
+            self.requisicoes += 1
+            self.payloads.append(payload)
+            return self.falhas.pop(0) if self.falhas else None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/v1/chat/completions"
+
+    def iniciar(self):
+        self._servidor = _Servidor(("127.0.0.1", 0), _Handler)
+        self._servidor.mock = self
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._thread.join()
+            self._servidor = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
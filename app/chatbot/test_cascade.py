@@ -0,0 +1,129 @@
+import unittest
+
+from cascade import ValidationCascade, campos_presentes, data_citada, datas_trocadas
+from mock_llm_server import MockLLMServer
+from validate_chatbot import ChatbotIAValidator
+
+INFORMACOES = {"tipo_exame": "ULTRASSONOGRAFIA", "data_realizacao": "31/01/2025", "data_laudo": "03/02/2025"}
+
+
+class FakeEmbeddingValidator:
+    """Similaridade fixa por resposta, no formato de EmbeddingValidator.calcular_similaridade_lote."""
+    def __init__(self, similaridades):
+        self.similaridades = similaridades
+        self.chamadas = 0
+
+    def calcular_similaridade_lote(self, respostas, cenario=None):
+        self.chamadas += 1
+        return [{"similaridades": [self.similaridades.get(r, 0.6), 0.1]} for r in respostas]
+
+
+class TestCamposPresentes(unittest.TestCase):
+    def test_normalized_variants(self):
+        """Testa datas por extenso, sem ano e nomes alternativos do exame."""
+        variacoes = [
+            "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+            "Identifiquei um exame ultrassonográfico do dia 31 de janeiro deste ano. O resultado será liberado em 03/02.",
+            "Seu ultrassom foi feito dia 31/01 e o resultado do exame sai após o dia 3 de fevereiro de 2025.",
+            "Exame de ultra-som em 31.01.25, laudo em 03-02-2025.",
+        ]
+        for resposta in variacoes:
+            self.assertEqual(campos_presentes(resposta, INFORMACOES),
+                             {"tipo_exame": True, "data_realizacao": True, "data_laudo": True}, resposta)
+
+    def test_missing_or_wrong_fields(self):
+        presentes = campos_presentes("Seu exame de tomografia foi em 30/01/2025, laudo em 03/02/2024.", INFORMACOES)
+        self.assertEqual(presentes, {"tipo_exame": False, "data_realizacao": False, "data_laudo": False})
+        presentes = campos_presentes("Ultrassom feito no final de janeiro, laudo dia 3 de fevereiro.", INFORMACOES)
+        self.assertEqual(presentes, {"tipo_exame": True, "data_realizacao": False, "data_laudo": True})
+
+
+    def test_swapped_dates(self):
+        """Testa se datas de realização e laudo invertidas são detectadas pelas palavras próximas."""
+        trocadas = "Exame de ultrassom realizado em 03/02/2025, laudo previsto para 31/01/2025."
+        self.assertTrue(all(campos_presentes(trocadas, INFORMACOES).values()))
+        self.assertTrue(datas_trocadas(trocadas, INFORMACOES))
+        corretas = [
+            "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+            "Identifiquei um exame ultrassonográfico do dia 31 de janeiro deste ano. O resultado será liberado em 03/02.",
+            "Seu ultrassom foi feito dia 31/01 e o resultado do exame sai após o dia 3 de fevereiro de 2025.",
+            "Exame de ultra-som em 31.01.25, laudo em 03-02-2025.",
+        ]
+        for resposta in corretas:
+            self.assertFalse(datas_trocadas(resposta, INFORMACOES), resposta)
+
+
+class TestValidationCascade(unittest.TestCase):
+    def test_stages_resolve_in_order(self):
+        respostas = [
+            "Olá! Como posso ajudar?",                                                        # filtro
+            "Seu exame de ultrassom foi em 31 de janeiro; laudo em 03/02.",                   # regras
+            "Seu exame de ultrassom está pronto, o laudo sai em 03/02.",                      # embedding (aceita)
+            "Não encontrei nenhum exame no seu cadastro.",                                    # embedding (rejeita)
+            "Você fez um exame no fim de janeiro e o resultado sai em breve.",                # ia
+        ]
+        embedding = FakeEmbeddingValidator({respostas[2]: 0.93, respostas[3]: 0.2})
+        with MockLLMServer() as servidor:
+            ia = ChatbotIAValidator(api_key="teste", endpoint=servidor.url, informacoes_esperadas=INFORMACOES)
+            cascata = ValidationCascade(ia, embedding)
+            resultados = cascata.validar_respostas(respostas)
+            ia.fechar()
+
+        self.assertEqual([r["estagio"] for r in resultados], ["filtro", "regras", "embedding", "embedding", "ia"])
+        self.assertEqual([r["resultado_geral"] for r in resultados], [False, True, True, False, True])
+        self.assertEqual(servidor.requisicoes, 1)
+        self.assertEqual(embedding.chamadas, 1)
+        estatisticas = cascata.estatisticas()
+        self.assertEqual({e: m["resolvidas"] for e, m in estatisticas.items()},
+                         {"filtro": 1, "regras": 1, "embedding": 2, "ia": 1})
+        self.assertEqual(estatisticas["ia"]["entradas"], 1)
+        self.assertGreater(estatisticas["ia"]["latencia_media_ms"], 0)
+
+    def test_embedding_confidence_and_lowered_threshold(self):
+        """A confiança é no veredito: alta para aceites e para rejeições bem abaixo do limiar."""
+        respostas = ["Seu exame de ultrassom está pronto, o laudo sai em 03/02.", "Não encontrei nenhum exame."]
+        ia = ChatbotIAValidator(informacoes_esperadas=INFORMACOES)
+        cascata = ValidationCascade(ia, FakeEmbeddingValidator({respostas[0]: 0.81, respostas[1]: 0.1}),
+                                    limiar_aceite=0.8)
+        aceita, rejeitada = cascata.validar_respostas(respostas)
+        self.assertEqual([aceita["estagio"], rejeitada["estagio"]], ["embedding", "embedding"])
+        self.assertTrue(aceita["resultado_geral"])
+        self.assertAlmostEqual(aceita["validacao_ia"]["confianca"], 0.81)
+        self.assertFalse(rejeitada["resultado_geral"])
+        self.assertAlmostEqual(rejeitada["validacao_ia"]["confianca"], 0.9)
+        with self.assertRaisesRegex(ValueError, "limiar_aceite"):
+            ValidationCascade(ia, limiar_aceite=0.7, limiar_rejeicao=0.3)
+
+    def test_embedding_does_not_accept_contradictions(self):
+        """Similaridade alta com data errada ou exame ausente vai para a IA em vez de ser aceita."""
+        respostas = [
+            "Seu exame de ultrassom foi em 30/01/2025; laudo em 03/02.",
+            "Seu exame de imagem está pronto, confira os detalhes.",
+            "Seu exame de ultrassom foi dia 31 de janeiro, confira os detalhes.",
+        ]
+        embedding = FakeEmbeddingValidator({resposta: 0.95 for resposta in respostas})
+        ia = ChatbotIAValidator(informacoes_esperadas=INFORMACOES)
+        resultados = ValidationCascade(ia, embedding).validar_respostas(respostas)
+        self.assertEqual([r["estagio"] for r in resultados], ["ia", "ia", "embedding"])
+
+    def test_swapped_dates_go_to_ia(self):
+        respostas = ["Exame de ultrassom realizado em 03/02/2025, laudo previsto para 31/01/2025."]
+        ia = ChatbotIAValidator(informacoes_esperadas=INFORMACOES)
+        cascata = ValidationCascade(ia, FakeEmbeddingValidator({respostas[0]: 0.97}))
+        self.assertEqual(cascata.validar_respostas(respostas)[0]["estagio"], "ia")
+
+    def test_invalid_expected_date(self):
+        self.assertFalse(data_citada({(31, 1, 2025)}, "final de janeiro"))
+        ia = ChatbotIAValidator(informacoes_esperadas={**INFORMACOES, "data_laudo": "03/02 ou 04/02"})
+        with self.assertRaisesRegex(ValueError, "data_laudo"):
+            ValidationCascade(ia)
+
+    def test_without_embedding_stage(self):
+        ia = ChatbotIAValidator(informacoes_esperadas=INFORMACOES)
+        resultados = ValidationCascade(ia).validar_respostas(["exame de imagem pronto"])
+        self.assertEqual(resultados[0]["estagio"], "ia")
+        self.assertIn("simulada", resultados[0]["observacoes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
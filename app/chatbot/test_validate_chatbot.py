@@ -0,0 +1,217 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from mock_llm_server import MockLLMServer
+from validate_chatbot import ChatbotIAValidator, RateLimiter
+from verdict_cache import VerdictCache
+
+RESPOSTA = "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025."
+
+
+def criar_validator(servidor, **kwargs):
+    esperas = []
+    validator = ChatbotIAValidator(api_key="teste", endpoint=servidor.url, dormir=esperas.append, **kwargs)
+    return validator, esperas
+
+
+class TestConsultaApi(unittest.TestCase):
+    def test_session_keeps_connection_alive(self):
+        """Testa se chamadas seguidas reaproveitam a mesma conexão TCP."""
+        with MockLLMServer() as servidor:
+            validator, _ = criar_validator(servidor)
+            for _ in range(3):
+                self.assertTrue(validator.consultar_ia(RESPOSTA)["informacoes_corretas"])
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 3)
+        self.assertEqual(servidor.conexoes, 1)
+
+    def test_retries_on_429_honoring_retry_after(self):
+        """Testa se 429/503 são repetidos e se o Retry-After do servidor define a espera."""
+        falhas = [(429, {"Retry-After": "2"}), (503, {})]
+        with MockLLMServer(falhas=falhas) as servidor:
+            validator, esperas = criar_validator(servidor, espera_base=0.1)
+            resultado = validator.consultar_ia(RESPOSTA)
+            validator.fechar()
+        self.assertTrue(resultado["informacoes_corretas"])
+        self.assertEqual(servidor.requisicoes, 3)
+        self.assertEqual(esperas[0], 2.0)
+        self.assertTrue(0 <= esperas[1] <= 0.2)
+
+    def test_gives_up_after_max_attempts(self):
+        """Testa se, esgotadas as tentativas, o erro vira o veredito de falha sem nova chamada."""
+        with MockLLMServer(falhas=[(500, {})] * 5) as servidor:
+            validator, esperas = criar_validator(servidor, max_tentativas=3)
+            resultado = validator.consultar_ia(RESPOSTA)
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 3)
+        self.assertEqual(len(esperas), 2)
+        self.assertEqual(resultado["confianca"], 0.0)
+        self.assertIn("500", resultado["observacoes"])
+
+    def test_client_error_is_not_retried(self):
+        """Testa se erros do cliente (ex: 401) falham na hora."""
+        with MockLLMServer(falhas=[(401, {})]) as servidor:
+            validator, esperas = criar_validator(servidor)
+            resultado = validator.consultar_ia(RESPOSTA)
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 1)
+        self.assertEqual(esperas, [])
+        self.assertFalse(resultado["informacoes_corretas"])
+
+    def test_read_timeout(self):
+        """Testa se o timeout de leitura interrompe uma API lenta."""
+        with MockLLMServer(latencia=0.5) as servidor:
+            validator, esperas = criar_validator(servidor, timeout=(1, 0.1), max_tentativas=2)
+            resultado = validator.consultar_ia(RESPOSTA)
+            validator.fechar()
+        self.assertEqual(len(esperas), 1)
+        self.assertEqual(resultado["confianca"], 0.0)
+
+    def test_verdict_cache_skips_repeated_calls(self):
+        """Testa se respostas repetidas (com outros espaços) usam o cache e se erros não são guardados."""
+        with MockLLMServer(falhas=[(401, {})]) as servidor:
+            validator, _ = criar_validator(servidor, cache=VerdictCache())
+            self.assertEqual(validator.consultar_ia(RESPOSTA)["confianca"], 0.0)
+            for _ in range(3):
+                self.assertTrue(validator.consultar_ia(RESPOSTA + "  ")["informacoes_corretas"])
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 2)
+        self.assertEqual(validator.cache.estatisticas()["acertos"], 2)
+        self.assertEqual(servidor.payloads[-1]["model"], "gpt-4")
+
+    def test_prompt_change_invalidates_cache_key(self):
+        validator = ChatbotIAValidator(api_key="teste", cache=VerdictCache())
+        chave = validator._chave_cache(RESPOSTA)
+        validator.template_prompt += "\nResponda em português."
+        self.assertNotEqual(validator._chave_cache(RESPOSTA), chave)
+
+
+class TestValidacaoEmLote(unittest.TestCase):
+    def test_batches_respect_size_and_map_back(self):
+        """Testa se 5 respostas viram 2 chamadas (lotes de 3) e se os resultados voltam no lugar certo."""
+        mensagens = [f"Seu exame {i} de ULTRASSONOGRAFIA está pronto" for i in range(5)]
+        with MockLLMServer() as servidor:
+            validator, _ = criar_validator(servidor, tamanho_lote=3, cache=VerdictCache())
+            resultados = validator.validar_conversa(conversa("Olá!", *mensagens))
+            # Segunda vez: tudo vem do cache
+            validator.validar_respostas(mensagens)
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 2)
+        self.assertEqual([r["mensagem_original"] for r in resultados], ["Olá!"] + mensagens)
+        self.assertFalse(resultados[0]["relevante"])
+        self.assertTrue(all(r["resultado_geral"] for r in resultados[1:]))
+        self.assertNotIn("indice", resultados[1]["validacao_ia"])
+        self.assertEqual(validator.cache.estatisticas()["acertos"], 5)
+
+    def test_token_budget_splits_batches(self):
+        validator = ChatbotIAValidator(tamanho_lote=10, max_tokens_lote=1000)
+        lotes = validator._dividir_lotes(["exame " + "x" * 400] * 2 + ["exame curto"] * 3)
+        self.assertTrue(all(validator._estimar_tokens_lote(lote) <= 1000 for lote in lotes))
+        self.assertEqual(sum(len(lote) for lote in lotes), 5)
+        self.assertGreater(len(lotes), 1)
+
+    def test_falls_back_when_batch_output_is_invalid(self):
+        """Testa se uma saída em lote sem todos os índices faz cada mensagem ser validada sozinha."""
+        def responder(payload):
+            if '"resultados"' in payload["messages"][1]["content"]:
+                return {"resultados": [{"indice": 0, "confianca": 0.9}]}
+            return {"informacoes_corretas": True, "confianca": 0.85, "observacoes": "individual"}
+
+        mensagens = [f"exame {i}" for i in range(3)]
+        with MockLLMServer(responder=responder) as servidor:
+            validator, _ = criar_validator(servidor, tamanho_lote=3)
+            vereditos = validator.consultar_ia_lote(mensagens)
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 4)
+        self.assertEqual([v["observacoes"] for v in vereditos], ["individual"] * 3)
+
+    def test_batch_api_error_gives_independent_verdicts(self):
+        mensagens = [f"exame {i}" for i in range(3)]
+        with MockLLMServer(falhas=[(401, {})]) as servidor:
+            validator, _ = criar_validator(servidor, tamanho_lote=3)
+            vereditos = validator.consultar_ia_lote(mensagens)
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 1)
+        self.assertFalse(any(v["informacoes_corretas"] for v in vereditos))
+        vereditos[0]["observacoes"] = "alterado"
+        self.assertNotEqual(vereditos[1]["observacoes"], "alterado")
+
+    def test_async_batches(self):
+        mensagens = [f"exame {i} de ULTRASSONOGRAFIA" for i in range(8)]
+        with MockLLMServer() as servidor:
+            validator, _ = criar_validator(servidor, tamanho_lote=4)
+            resultados = validator.validar_conversas([conversa(*mensagens[:5]), conversa(*mensagens[5:])])
+            validator.fechar()
+        self.assertEqual(servidor.requisicoes, 2)
+        self.assertEqual([len(r) for r in resultados], [5, 3])
+        self.assertEqual(resultados[1][2]["mensagem_original"], mensagens[7])
+
+
+class TestCalcularEspera(unittest.TestCase):
+    def setUp(self):
+        self.validator = ChatbotIAValidator(espera_base=0.5, espera_maxima=10.0)
+
+    def test_exponential_backoff_with_jitter(self):
+        for tentativa in range(6):
+            espera = self.validator._calcular_espera(tentativa)
+            self.assertTrue(0 <= espera <= min(10.0, 0.5 * 2 ** tentativa))
+
+    def test_retry_after_formats(self):
+        self.assertEqual(self.validator._calcular_espera(0, "3"), 3.0)
+        self.assertEqual(self.validator._calcular_espera(0, "120"), 10.0)
+        data = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=5), usegmt=True)
+        self.assertTrue(3 <= self.validator._calcular_espera(0, data) <= 5)
+        # Valor inválido cai no backoff exponencial
+        self.assertTrue(0 <= self.validator._calcular_espera(1, "amanhã") <= 1.0)
+
+
+def conversa(*mensagens):
+    linhas = ["[15:26, 06/02/2025] Jonas: olá"]
+    linhas += [f"[15:27, 06/02/2025] Futurotec Homologação: {m}" for m in mensagens]
+    return "\n".join(linhas)
+
+
+class TestValidacaoConcorrente(unittest.TestCase):
+    def test_results_keep_message_order(self):
+        """Testa se as respostas voltam na ordem original mesmo terminando fora de ordem."""
+        def responder(payload):
+            prompt = payload["messages"][1]["content"]
+            numero = int(prompt.split("mensagem ")[1].split(" ")[0])
+            # As primeiras mensagens demoram mais
+            time.sleep(0.05 * (6 - numero))
+            return {"informacoes_corretas": True, "confianca": 0.9, "observacoes": f"resposta {numero}"}
+
+        mensagens = [f"exame mensagem {i} de ULTRASSONOGRAFIA" for i in range(6)]
+        conversas = [conversa(*mensagens[:4]), conversa("Olá! Como posso ajudar?", *mensagens[4:])]
+        with MockLLMServer(responder=responder) as servidor:
+            validator, _ = criar_validator(servidor)
+            inicio = time.perf_counter()
+            resultados = validator.validar_conversas(conversas, max_concorrencia=6)
+            duracao = time.perf_counter() - inicio
+            validator.fechar()
+
+        self.assertEqual([len(r) for r in resultados], [4, 3])
+        self.assertFalse(resultados[1][0]["relevante"])
+        relevantes = resultados[0] + resultados[1][1:]
+        self.assertEqual([r["observacoes"] for r in relevantes], [f"resposta {i}" for i in range(6)])
+        # Em série seriam 1,05 s; em paralelo, ~ a mais lenta (0,3 s)
+        self.assertLess(duracao, 0.9)
+
+    def test_rate_limiter(self):
+        """Testa o balde de requisições e o de tokens com um relógio controlado."""
+        agora = [0.0]
+        limitador = RateLimiter(requisicoes_por_minuto=60, tokens_por_minuto=600, relogio=lambda: agora[0])
+        # Balde começa cheio: 60 requisições sem espera
+        self.assertEqual([limitador.reservar() for _ in range(60)], [0.0] * 60)
+        self.assertAlmostEqual(limitador.reservar(), 1.0)
+        self.assertAlmostEqual(limitador.reservar(), 2.0)
+        agora[0] = 10.0
+        # 10 s repõem 10 requisições (8 livres após as 2 emprestadas); tokens: 600 - 0 ainda disponíveis
+        self.assertEqual(limitador.reservar(tokens=300), 0.0)
+        self.assertAlmostEqual(limitador.reservar(tokens=400), 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from verdict_cache import VerdictCache
+
+INFORMACOES = {"tipo_exame": "ULTRASSONOGRAFIA", "data_realizacao": "31/01/2025", "data_laudo": "03/02/2025"}
+
+
+class TestVerdictCache(unittest.TestCase):
+    def test_key_components(self):
+        """Testa se modelo, versão do prompt e informações esperadas mudam a chave, e espaços não."""
+        cache = VerdictCache()
+        chave = cache.chave("gpt-4", 1, INFORMACOES, "Seu exame  está pronto")
+        self.assertEqual(chave, cache.chave("gpt-4", 1, dict(reversed(list(INFORMACOES.items()))),
+                                            " Seu exame está pronto\n"))
+        self.assertNotEqual(chave, cache.chave("gpt-4o", 1, INFORMACOES, "Seu exame está pronto"))
+        self.assertNotEqual(chave, cache.chave("gpt-4", 2, INFORMACOES, "Seu exame está pronto"))
+        self.assertNotEqual(chave, cache.chave("gpt-4", 1, {**INFORMACOES, "data_laudo": "04/02/2025"},
+                                               "Seu exame está pronto"))
+
+    def test_ttl_and_lru_eviction(self):
+        """Testa a expiração por TTL e a remoção dos menos usados ao passar do tamanho máximo."""
+        agora = [0.0]
+        cache = VerdictCache(ttl=100, tamanho_maximo=2, relogio=lambda: agora[0])
+        cache.guardar("a", {"confianca": 0.9})
+        agora[0] = 1
+        cache.guardar("b", {"confianca": 0.8})
+        agora[0] = 2
+        self.assertEqual(cache.obter("a"), {"confianca": 0.9})  # "a" passa a ser o mais recente
+        cache.guardar("c", {"confianca": 0.7})
+        self.assertIsNone(cache.obter("b"))
+        self.assertEqual(len(cache), 2)
+        agora[0] = 150
+        self.assertIsNone(cache.obter("a"))
+        self.assertEqual(cache.estatisticas()["expirados"], 1)
+        self.assertEqual(cache.estatisticas()["removidos"], 1)
+        self.assertEqual((cache.acertos, cache.faltas), (1, 2))
+
+    def test_persists_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            caminho = os.path.join(tmpdir, "vereditos.sqlite")
+            cache = VerdictCache(caminho)
+            cache.guardar("a", {"observacoes": "ação válida"})
+            cache.fechar()
+            reaberto = VerdictCache(caminho)
+            self.assertEqual(reaberto.obter("a"), {"observacoes": "ação válida"})
+            self.assertEqual(len(reaberto), 1)
+            reaberto.fechar()
+
+
+if __name__ == '__main__':
+    unittest.main()
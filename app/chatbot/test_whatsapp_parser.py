@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from validate_chatbot import ChatbotIAValidator
+from whatsapp_parser import abrir_exportacao, iterar_mensagens
+
+CONVERSA = """Mensagens e chamadas são protegidas com a criptografia de ponta a ponta.
+[15:26, 06/02/2025] Jonas: olá
+[15:26, 06/02/2025] Futurotec Homologação: Olá, Jonas! Boa Tarde! Como posso ajudar?
+[15:27, 06/02/2025] Jonas: gostaria de listar meus exames
+[15:27:30, 06/02/2025] Futurotec Homologação: Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025.
+O laudo está previsto para 03/02/2025.
+
+Deseja saber mais?
+\u200e[15:28, 06/02/2025] Atendente Humano: Posso ajudar: é só chamar.
+"""
+
+
+class TestWhatsAppParser(unittest.TestCase):
+    def test_headers_and_continuation_lines(self):
+        mensagens = list(iterar_mensagens(CONVERSA))
+        self.assertEqual([m["remetente"] for m in mensagens],
+                         ["Jonas", "Futurotec Homologação", "Jonas", "Futurotec Homologação", "Atendente Humano"])
+        self.assertEqual(mensagens[3]["texto"], "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025.\n"
+                                                "O laudo está previsto para 03/02/2025.\n\nDeseja saber mais?")
+        self.assertEqual((mensagens[3]["hora"], mensagens[3]["data"]), ("15:27:30", "06/02/2025"))
+        self.assertEqual(mensagens[4]["texto"], "Posso ajudar: é só chamar.")
+        self.assertEqual([m["do_bot"] for m in mensagens], [False, True, False, True, False])
+
+    def test_configurable_bot_senders(self):
+        mensagens = iterar_mensagens(CONVERSA, remetentes_bot={"Atendente Humano"}, apenas_bot=True)
+        self.assertEqual([m["texto"] for m in mensagens], ["Posso ajudar: é só chamar."])
+
+    def test_file_and_mmap_sources(self):
+        """Testa se arquivo texto, binário e mmap geram as mesmas mensagens que a string."""
+        esperado = list(iterar_mensagens(CONVERSA))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            caminho = os.path.join(tmpdir, "conversa.txt")
+            with open(caminho, "w", encoding="utf-8", newline="\r\n") as f:
+                f.write(CONVERSA)
+            with open(caminho, encoding="utf-8") as f:
+                self.assertEqual(list(iterar_mensagens(f)), esperado)
+            with abrir_exportacao(caminho) as mapa:
+                self.assertEqual(list(iterar_mensagens(mapa)), esperado)
+            vazio = os.path.join(tmpdir, "vazio.txt")
+            open(vazio, "w").close()
+            with abrir_exportacao(vazio) as arquivo:
+                self.assertEqual(list(iterar_mensagens(arquivo)), [])
+
+    def test_validator_uses_parser(self):
+        validator = ChatbotIAValidator()
+        self.assertEqual(len(validator.extrair_mensagens_chatbot(CONVERSA)), 2)
+        resultados = list(validator.validar_exportacao(CONVERSA, tamanho_bloco=1))
+        self.assertEqual([r["relevante"] for r in resultados], [False, True])
+        self.assertTrue(resultados[1]["resultado_geral"])
+        self.assertEqual(resultados[1]["hora"], "15:27:30")
+
+
+if __name__ == '__main__':
+    unittest.main()
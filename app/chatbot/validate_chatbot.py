@@ -1,22 +1,133 @@
+import hashlib
 import re
 import json
-import requests
-from typing import List, Dict, Any, Tuple
+import random
+import threading
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Iterator, Tuple
+
+try:
+    from whatsapp_parser import REMETENTES_BOT_PADRAO, iterar_mensagens
+except ImportError:
+    # Importado a partir de app/ (ex: python -m benchmarks...), como chatbot.validate_chatbot
+    from chatbot.whatsapp_parser import REMETENTES_BOT_PADRAO, iterar_mensagens
+
+# Status HTTP que valem nova tentativa: limite de taxa e falhas transitórias do servidor
+STATUS_RETENTATIVA = frozenset({429, 500, 502, 503, 504})
+
+# Confiança mínima do veredito para que uma resposta com as informações corretas seja aprovada
+CONFIANCA_MINIMA = 0.8
+
+# Início das observações de um veredito montado a partir de um erro da API (ver _veredito_erro)
+PREFIXO_ERRO_API = "Erro na consulta à API"
+
+# Tokens reservados para o JSON de resposta da IA ao estimar o custo de uma chamada
+TOKENS_RESPOSTA_IA = 150
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token), suficiente para o limitador de taxa."""
+    return len(texto) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Limita requisições e tokens por minuto, como as cotas das APIs de LLM.
+
+    Cada limite é um balde de fichas que se reabastece continuamente (limite / 60 por segundo)
+    e começa cheio. Cada chamada reserva sua parte e recebe o tempo de espera até o balde cobrir
+    a reserva; reservas feitas primeiro são atendidas primeiro. É seguro entre threads e não
+    depende de um event loop específico.
+    """
+
+    def __init__(self, requisicoes_por_minuto=None, tokens_por_minuto=None, relogio=time.monotonic):
+        """
+        Args:
+            requisicoes_por_minuto (float): Limite de requisições (None = sem limite)
+            tokens_por_minuto (float): Limite de tokens de prompt + resposta (None = sem limite)
+            relogio (callable): Fonte de tempo em segundos (substituível nos testes)
+        """
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        agora = relogio()
+        limites = {"requisicoes": requisicoes_por_minuto, "tokens": tokens_por_minuto}
+        # Por balde: [capacidade, reabastecimento por segundo, nível atual, instante do nível]
+        self._baldes = {
+            nome: [limite, limite / 60, limite, agora]
+            for nome, limite in limites.items()
+            if limite is not None
+        }
+
+    def reservar(self, tokens=0) -> float:
+        """Reserva uma requisição com `tokens` tokens e devolve quantos segundos esperar antes de enviá-la."""
+        custos = {"requisicoes": 1, "tokens": tokens}
+        espera = 0.0
+        with self._trava:
+            agora = self._relogio()
+            for nome, balde in self._baldes.items():
+                capacidade, taxa, nivel, instante = balde
+                nivel = min(capacidade, nivel + (agora - instante) * taxa) - custos[nome]
+                balde[2], balde[3] = nivel, agora
+                # Nível negativo = fichas emprestadas do futuro; espera até serem repostas
+                espera = max(espera, -nivel / taxa)
+        return espera
+
+    async def aguardar(self, tokens=0):
+        espera = self.reservar(tokens)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
 
 class ChatbotIAValidator:
-    def __init__(self, api_key=None, endpoint=None):
+    def __init__(self, api_key=None, endpoint=None, informacoes_esperadas=None,
+                 timeout=(3.05, 30), max_tentativas=5, espera_base=0.5, espera_maxima=30.0,
+                 tamanho_pool=10, dormir=time.sleep, modelo="gpt-4", cache=None,
+                 tamanho_lote=1, max_tokens_lote=4000, remetentes_bot=REMETENTES_BOT_PADRAO):
         """
         Inicializa o validador usando IA para comparar respostas.
         
         Args:
             api_key: Chave da API (OpenAI, Azure, Claude, etc.)
             endpoint: Endpoint da API (opcional, caso não use OpenAI padrão)
+            informacoes_esperadas: Campos esperados do cenário validado (as chaves usadas em template_prompt), ex:
+                ReferenceRegistry.carregar("datasets/cenarios.json").informacoes_esperadas["ultrassonografia"]
+            timeout: Timeout em segundos, (conexão, leitura) ou um único número para os dois
+            max_tentativas: Tentativas por mensagem em 429/5xx e erros de conexão (1 = sem retentativa)
+            espera_base: Espera da primeira retentativa; dobra a cada tentativa (com jitter)
+            espera_maxima: Teto da espera, inclusive quando o servidor pede mais via Retry-After
+            tamanho_pool: Conexões mantidas abertas (keep-alive) pela sessão
+            dormir: Função de espera entre tentativas (substituível nos testes)
+            modelo: Modelo de IA usado na API
+            cache: VerdictCache com os vereditos já obtidos (None = sempre chama a API), ex:
+                VerdictCache("vereditos.sqlite", ttl=7 * 24 * 3600)
+            tamanho_lote: Respostas por chamada à API (1 = uma chamada por resposta); acima de 1,
+                validar_conversa e validar_conversas enviam até esse número de respostas num só prompt
+            max_tokens_lote: Orçamento estimado (prompt + resposta da IA) de cada chamada em lote
+            remetentes_bot: Nomes de remetente do chatbot nas conversas exportadas do WhatsApp
         """
         self.api_key = api_key
         self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_tentativas = max(1, max_tentativas)
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.tamanho_pool = tamanho_pool
+        self._dormir = dormir
+        self._sessao = None
+        self._trava_sessao = threading.Lock()
+        self.modelo = modelo
+        self.cache = cache
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.max_tokens_lote = max_tokens_lote
+        self.remetentes_bot = frozenset(remetentes_bot)
         
         # Informações esperadas e restrições para validação
-        self.informacoes_esperadas = {
+        self.informacoes_esperadas = informacoes_esperadas or {
             "tipo_exame": "ULTRASSONOGRAFIA",
             "data_realizacao": "31/01/2025",
             "data_laudo": "03/02/2025",
@@ -46,45 +157,120 @@ class ChatbotIAValidator:
             "observacoes": string
         }}
         """
+
+        # Prompt para validar várias respostas numa só chamada (tamanho_lote > 1)
+        self.template_prompt_lote = """
+        Você é um validador de respostas de chatbot especializado em informações médicas. 
+        Analise CADA resposta da lista abaixo, de forma independente, e verifique se ela contém 
+        todas as informações essenciais sobre o exame médico, independentemente de variações na formulação.
+        
+        Respostas a analisar (lista JSON de objetos com "indice" e "resposta"): 
+        {respostas}
+        
+        Informações que devem estar presentes em cada resposta:
+        - Tipo de exame: {tipo_exame}
+        - Data de realização: {data_realizacao}
+        - Data prevista para o laudo: {data_laudo}
+        
+        Retorne APENAS um objeto JSON com exatamente um item em "resultados" para cada resposta:
+        {{
+            "resultados": [
+                {{
+                    "indice": int (o mesmo da resposta analisada),
+                    "tipo_exame_presente": bool,
+                    "data_realizacao_presente": bool,
+                    "data_laudo_presente": bool,
+                    "informacoes_corretas": bool,
+                    "confianca": float (entre 0 e 1),
+                    "observacoes": string
+                }}
+            ]
+        }}
+        """
     
     def extrair_mensagens_chatbot(self, texto_conversa: str) -> List[str]:
         """Extrai apenas as mensagens do chatbot de uma conversa do WhatsApp."""
-        mensagens = []
-        linhas = texto_conversa.strip().split('\n')
-        
-        for linha in linhas:
-            if "Futurotec Homologação:" in linha:
-                # Extrai a mensagem após o prefixo
-                prefixo, _, mensagem = linha.partition(': ')
-                if mensagem.strip():
-                    mensagens.append(mensagem.strip())
-        
-        return mensagens
+        return list(self.iterar_mensagens_chatbot(texto_conversa))
+
+    def iterar_mensagens_chatbot(self, origem) -> Iterator[str]:
+        """
+        Gera as mensagens do chatbot (inclusive as de várias linhas) sem carregar a conversa inteira.
+
+        Args:
+            origem: Texto da conversa, arquivo aberto ou mmap (ver whatsapp_parser.abrir_exportacao)
+        """
+        for mensagem in iterar_mensagens(origem, self.remetentes_bot, apenas_bot=True):
+            if mensagem["texto"]:
+                yield mensagem["texto"]
     
     def consultar_ia(self, resposta: str) -> Dict[str, Any]:
         """
         Consulta modelo de IA para validar a resposta.
         
         Este exemplo usa a API da OpenAI, mas pode ser adaptado para outras.
+        Com um VerdictCache configurado, respostas já validadas não chamam a API de novo.
         """
+        veredito = self._buscar_cache(resposta)
+        if veredito is not None:
+            return veredito
+        return self._consultar_e_guardar(resposta)
+
+    def _buscar_cache(self, resposta: str):
+        # Vereditos simulados (sem api_key) são baratos e não passam pelo cache
+        if self.cache is None or not self.api_key:
+            return None
+        return self.cache.obter(self._chave_cache(resposta))
+
+    @property
+    def versao_prompt(self) -> str:
+        """Hash dos templates de prompt: qualquer mudança no texto invalida os vereditos em cache."""
+        templates = json.dumps([self.template_prompt, self.template_prompt_lote], ensure_ascii=False)
+        return hashlib.sha256(templates.encode("utf-8")).hexdigest()[:16]
+
+    def _chave_cache(self, resposta: str) -> str:
+        return self.cache.chave(self.modelo, self.versao_prompt, self.informacoes_esperadas, resposta)
+
+    def _consultar_e_guardar(self, resposta: str) -> Dict[str, Any]:
+        """Chama a API (sem olhar o cache) e guarda o veredito se a chamada deu certo."""
         if not self.api_key:
             # Simulação da resposta da IA para testes sem API
             # Em produção, substitua pela chamada real à API
             return self._simular_resposta_ia(resposta)
-        
-        prompt = self.template_prompt.format(
-            resposta=resposta,
-            **self.informacoes_esperadas
-        )
-        
-        # Estrutura para OpenAI API - adapte para outras APIs conforme necessário
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
+
+        try:
+            veredito = self._chamar_api(resposta)
+        except Exception as e:
+            # Erros não vão para o cache: a próxima execução tenta de novo
+            print(f"Erro ao consultar a API: {e}")
+            return self._veredito_erro(e)
+        if self.cache is not None:
+            self.cache.guardar(self._chave_cache(resposta), veredito)
+        return veredito
+
+    @staticmethod
+    def _veredito_erro(erro: Exception) -> Dict[str, Any]:
+        return {
+            "tipo_exame_presente": False,
+            "data_realizacao_presente": False,
+            "data_laudo_presente": False,
+            "informacoes_corretas": False,
+            "confianca": 0.0,
+            "observacoes": f"{PREFIXO_ERRO_API}: {str(erro)}"
         }
-        
+
+    def _chamar_api(self, resposta: str) -> Dict[str, Any]:
+        """Uma chamada à API; levanta exceção em erro HTTP, de rede ou de formato da resposta."""
+        prompt = self._montar_prompt(resposta)
+        veredito = self._enviar_prompt(prompt)
+        if not isinstance(veredito, dict):
+            raise ValueError(f"Resposta da IA não é um objeto JSON: {json.dumps(veredito)[:200]}")
+        return veredito
+
+    def _enviar_prompt(self, prompt: str) -> Any:
+        """Envia o prompt e devolve o JSON gerado pela IA (já decodificado)."""
+        # Estrutura para OpenAI API - adapte para outras APIs conforme necessário
         data = {
-            "model": "gpt-4",  # ou outro modelo adequado
+            "model": self.modelo,
             "messages": [
                 {"role": "system", "content": "Você é um assistente especializado em validação de dados médicos."},
                 {"role": "user", "content": prompt}
@@ -93,26 +279,190 @@ class ChatbotIAValidator:
             "response_format": {"type": "json_object"}  # solicita resposta em JSON
         }
         
+        endpoint = self.endpoint or "https://api.openai.com/v1/chat/completions"
+        result = self._post_com_retentativas(endpoint, data)
+        
+        # Extrair o conteúdo da resposta - adapte conforme a API
+        content = result["choices"][0]["message"]["content"]
+        return json.loads(content)
+
+    def consultar_ia_lote(self, respostas: List[str]) -> List[Dict[str, Any]]:
+        """
+        Valida várias respostas com até `tamanho_lote` delas por chamada à API.
+
+        Respostas repetidas são enviadas uma vez só e as que estão no cache não são enviadas.
+
+        Returns:
+            list: Um veredito (no formato de consultar_ia) por resposta, na ordem de entrada
+        """
+        vereditos, pendentes = self._vereditos_do_cache(respostas)
+        for lote in self._dividir_lotes(pendentes):
+            vereditos.update(zip(lote, self._consultar_lote_e_guardar(lote)))
+        return [vereditos[resposta] for resposta in respostas]
+
+    def _vereditos_do_cache(self, respostas: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        vereditos = {}
+        pendentes = []
+        for resposta in dict.fromkeys(respostas):
+            veredito = self._buscar_cache(resposta)
+            if veredito is None:
+                pendentes.append(resposta)
+            else:
+                vereditos[resposta] = veredito
+        return vereditos, pendentes
+
+    def _custo_tokens(self, resposta: str) -> int:
+        # Tokens da resposta dentro da lista do prompt mais os do veredito que a IA vai gerar
+        return estimar_tokens(json.dumps(resposta, ensure_ascii=False)) + TOKENS_RESPOSTA_IA
+
+    def _estimar_tokens_lote(self, lote: List[str]) -> int:
+        return estimar_tokens(self._montar_prompt_lote([])) + sum(self._custo_tokens(r) for r in lote)
+
+    def _dividir_lotes(self, respostas: List[str]) -> List[List[str]]:
+        """Agrupa as respostas em lotes de até tamanho_lote que caibam em max_tokens_lote."""
+        base = estimar_tokens(self._montar_prompt_lote([]))
+        lotes = []
+        atual, tokens = [], base
+        for resposta in respostas:
+            custo = self._custo_tokens(resposta)
+            if atual and (len(atual) >= self.tamanho_lote or tokens + custo > self.max_tokens_lote):
+                lotes.append(atual)
+                atual, tokens = [], base
+            # Uma resposta maior que o orçamento vai sozinha
+            atual.append(resposta)
+            tokens += custo
+        if atual:
+            lotes.append(atual)
+        return lotes
+
+    def _montar_prompt_lote(self, respostas: List[str]) -> str:
+        itens = json.dumps(
+            [{"indice": i, "resposta": resposta} for i, resposta in enumerate(respostas)],
+            ensure_ascii=False, indent=1
+        )
+        return self.template_prompt_lote.format(respostas=itens, **self.informacoes_esperadas)
+
+    def _consultar_lote_e_guardar(self, lote: List[str]) -> List[Dict[str, Any]]:
+        """
+        Uma chamada para o lote inteiro. Se a saída da IA não tiver o formato esperado, valida
+        mensagem a mensagem; se a API falhar (rede/HTTP), todas recebem o veredito de erro.
+        """
+        if len(lote) == 1 or not self.api_key:
+            return [self._consultar_e_guardar(resposta) for resposta in lote]
+
+        import requests
+
         try:
-            endpoint = self.endpoint or "https://api.openai.com/v1/chat/completions"
-            response = requests.post(endpoint, headers=headers, json=data)
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extrair o conteúdo da resposta - adapte conforme a API
-            content = result["choices"][0]["message"]["content"]
-            return json.loads(content)
-        except Exception as e:
+            vereditos = self._chamar_api_lote(lote)
+        except requests.RequestException as e:
             print(f"Erro ao consultar a API: {e}")
-            return {
-                "tipo_exame_presente": False,
-                "data_realizacao_presente": False,
-                "data_laudo_presente": False,
-                "informacoes_corretas": False,
-                "confianca": 0.0,
-                "observacoes": f"Erro na consulta à API: {str(e)}"
-            }
+            # Um dict por mensagem: quem monta os resultados altera cada um (ver _validar_bloco)
+            return [self._veredito_erro(e) for _ in lote]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Aviso: resposta em lote inválida ({e}); validando as {len(lote)} mensagens uma a uma")
+            return [self._consultar_e_guardar(resposta) for resposta in lote]
+        if self.cache is not None:
+            for resposta, veredito in zip(lote, vereditos):
+                self.cache.guardar(self._chave_cache(resposta), veredito)
+        return vereditos
+
+    def _chamar_api_lote(self, lote: List[str]) -> List[Dict[str, Any]]:
+        """Valida o lote numa chamada; levanta ValueError se faltar ou sobrar algum índice."""
+        saida = self._enviar_prompt(self._montar_prompt_lote(lote))
+        por_indice = {}
+        for item in saida["resultados"]:
+            if not isinstance(item, dict):
+                raise ValueError(f"Item de resultado não é um objeto: {item!r}")
+            item = dict(item)
+            por_indice[int(item.pop("indice"))] = item
+        if sorted(por_indice) != list(range(len(lote))):
+            raise ValueError(f"Índices {sorted(por_indice)} não correspondem às {len(lote)} respostas")
+        return [por_indice[i] for i in range(len(lote))]
     
+    def _montar_prompt(self, resposta: str) -> str:
+        return self.template_prompt.format(
+            resposta=resposta,
+            **self.informacoes_esperadas
+        )
+
+    @property
+    def sessao(self):
+        """Sessão HTTP com pool de conexões keep-alive, criada na primeira chamada à API."""
+        # Trava: nas validações concorrentes várias threads podem chegar aqui ao mesmo tempo
+        with self._trava_sessao:
+            if self._sessao is None:
+                # Importado aqui: só é necessário quando há chamada real à API
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                sessao = requests.Session()
+                # As retentativas são feitas em _post_com_retentativas, não pelo urllib3
+                adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.tamanho_pool, max_retries=0)
+                sessao.mount("https://", adaptador)
+                sessao.mount("http://", adaptador)
+                sessao.headers.update({
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}"
+                })
+                self._sessao = sessao
+            return self._sessao
+
+    def fechar(self):
+        """Fecha as conexões abertas da sessão."""
+        if self._sessao is not None:
+            self._sessao.close()
+            self._sessao = None
+
+    def _calcular_espera(self, tentativa: int, retry_after: str = None) -> float:
+        """
+        Segundos a esperar antes da próxima tentativa.
+
+        Args:
+            tentativa: Índice da tentativa que falhou (0 = primeira)
+            retry_after: Valor do cabeçalho Retry-After, em segundos ou data HTTP
+
+        Returns:
+            float: O Retry-After quando válido; senão backoff exponencial com jitter
+            ("full jitter": uniforme entre 0 e espera_base * 2^tentativa). Sempre limitado a espera_maxima.
+        """
+        if retry_after:
+            try:
+                espera = float(retry_after)
+            except ValueError:
+                try:
+                    data = parsedate_to_datetime(retry_after)
+                    espera = (data - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    espera = None
+            if espera is not None:
+                return min(max(0.0, espera), self.espera_maxima)
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** tentativa))
+
+    def _post_com_retentativas(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST na API reaproveitando a sessão, com retentativas em 429/5xx e erros de conexão.
+
+        Levanta a exceção da última tentativa (requests.HTTPError, ConnectionError ou Timeout).
+        """
+        import requests
+
+        for tentativa in range(self.max_tentativas):
+            ultima = tentativa == self.max_tentativas - 1
+            try:
+                response = self.sessao.post(endpoint, json=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if ultima:
+                    raise
+                espera = self._calcular_espera(tentativa)
+            else:
+                if response.status_code not in STATUS_RETENTATIVA or ultima:
+                    response.raise_for_status()
+                    return response.json()
+                espera = self._calcular_espera(tentativa, response.headers.get("Retry-After"))
+                # Devolve a conexão ao pool antes de esperar
+                response.close()
+            self._dormir(espera)
+
     def _simular_resposta_ia(self, resposta: str) -> Dict[str, Any]:
         """
         Simula a resposta da IA para testes sem API.
@@ -160,20 +510,31 @@ class ChatbotIAValidator:
         """Valida uma única resposta usando IA."""
         # Primeiro faz uma validação rápida para ver se a mensagem contém "exame"
         # Isso economiza chamadas à API para mensagens irrelevantes
-        if "exame" not in resposta.lower():
-            return {
-                "mensagem_original": resposta,
-                "relevante": False,
-                "validacao_ia": None,
-                "resultado_geral": False,
-                "observacoes": "Mensagem não relacionada a exames."
-            }
+        if not self._relevante(resposta):
+            return self._resultado_irrelevante(resposta)
         
         # Consulta a IA para validar a resposta
         validacao_ia = self.consultar_ia(resposta)
-        
+        return self._montar_resultado(resposta, validacao_ia)
+
+    @staticmethod
+    def _relevante(resposta: str) -> bool:
+        return "exame" in resposta.lower()
+
+    @staticmethod
+    def _resultado_irrelevante(resposta: str) -> Dict[str, Any]:
+        return {
+            "mensagem_original": resposta,
+            "relevante": False,
+            "validacao_ia": None,
+            "resultado_geral": False,
+            "observacoes": "Mensagem não relacionada a exames."
+        }
+
+    @staticmethod
+    def _montar_resultado(resposta: str, validacao_ia: Dict[str, Any]) -> Dict[str, Any]:
         # Determina o resultado geral
-        resultado_geral = validacao_ia.get("informacoes_corretas", False) and validacao_ia.get("confianca", 0) >= 0.8
+        resultado_geral = validacao_ia.get("informacoes_corretas", False) and validacao_ia.get("confianca", 0) >= CONFIANCA_MINIMA
         
         return {
             "mensagem_original": resposta,
@@ -186,9 +547,154 @@ class ChatbotIAValidator:
     def validar_conversa(self, texto_conversa: str) -> List[Dict[str, Any]]:
         """Valida todas as mensagens do chatbot em uma conversa."""
         mensagens = self.extrair_mensagens_chatbot(texto_conversa)
-        resultados = [self.validar_resposta(msg) for msg in mensagens]
+        resultados = self.validar_respostas(mensagens)
         return resultados
 
+    def validar_exportacao(self, origem, tamanho_bloco: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Valida uma exportação do WhatsApp de qualquer tamanho, com memória constante.
+
+        As mensagens do chatbot são lidas aos blocos de `tamanho_bloco` e cada bloco passa por
+        validar_respostas (em lotes na API, se tamanho_lote > 1).
+
+        Args:
+            origem: Texto da conversa, arquivo aberto ou mmap (ver whatsapp_parser.abrir_exportacao)
+
+        Yields:
+            dict: Resultado de validar_resposta, com "data", "hora" e "remetente" da mensagem
+        """
+        bloco = []
+        mensagens = iterar_mensagens(origem, self.remetentes_bot, apenas_bot=True)
+        for mensagem in mensagens:
+            if mensagem["texto"]:
+                bloco.append(mensagem)
+            if len(bloco) >= tamanho_bloco:
+                yield from self._validar_bloco(bloco)
+                bloco = []
+        if bloco:
+            yield from self._validar_bloco(bloco)
+
+    def _validar_bloco(self, mensagens):
+        resultados = self.validar_respostas([mensagem["texto"] for mensagem in mensagens])
+        for mensagem, resultado in zip(mensagens, resultados):
+            resultado.update(data=mensagem["data"], hora=mensagem["hora"], remetente=mensagem["remetente"])
+            yield resultado
+
+    def validar_respostas(self, respostas: List[str]) -> List[Dict[str, Any]]:
+        """Valida várias respostas, em lotes de até tamanho_lote por chamada quando configurado."""
+        if self.tamanho_lote <= 1:
+            return [self.validar_resposta(resposta) for resposta in respostas]
+        relevantes = [resposta for resposta in respostas if self._relevante(resposta)]
+        vereditos = dict(zip(relevantes, self.consultar_ia_lote(relevantes)))
+        return self._resultados_com_vereditos(respostas, vereditos)
+
+    def _resultados_com_vereditos(self, respostas: List[str], vereditos: Dict[str, Dict[str, Any]]):
+        return [
+            self._montar_resultado(resposta, vereditos[resposta]) if self._relevante(resposta)
+            else self._resultado_irrelevante(resposta)
+            for resposta in respostas
+        ]
+
+    async def validar_resposta_async(self, resposta: str, semaforo=None, limitador=None) -> Dict[str, Any]:
+        """
+        Versão assíncrona de validar_resposta: a chamada à IA roda numa thread (asyncio.to_thread).
+
+        Args:
+            resposta: Mensagem do chatbot
+            semaforo: asyncio.Semaphore que limita as chamadas simultâneas (opcional)
+            limitador: RateLimiter aplicado antes de cada chamada real à API (opcional)
+        """
+        if not self._relevante(resposta):
+            return self._resultado_irrelevante(resposta)
+        # Acertos do cache não ocupam vaga de concorrência nem cota da API
+        validacao_ia = self._buscar_cache(resposta)
+        if validacao_ia is None:
+            async with semaforo or nullcontext():
+                # Sem api_key a resposta é simulada: não consome cota
+                if limitador is not None and self.api_key:
+                    await limitador.aguardar(estimar_tokens(self._montar_prompt(resposta)) + TOKENS_RESPOSTA_IA)
+                validacao_ia = await asyncio.to_thread(self._consultar_e_guardar, resposta)
+        return self._montar_resultado(resposta, validacao_ia)
+
+    async def consultar_ia_lote_async(self, respostas: List[str], semaforo=None,
+                                      limitador=None) -> List[Dict[str, Any]]:
+        """Como consultar_ia_lote, com os lotes enviados em paralelo (cada lote ocupa uma vaga do semáforo)."""
+        vereditos, pendentes = self._vereditos_do_cache(respostas)
+
+        async def consultar(lote):
+            async with semaforo or nullcontext():
+                if limitador is not None and self.api_key:
+                    await limitador.aguardar(self._estimar_tokens_lote(lote))
+                return await asyncio.to_thread(self._consultar_lote_e_guardar, lote)
+
+        lotes = self._dividir_lotes(pendentes)
+        for lote, resultado in zip(lotes, await asyncio.gather(*(consultar(lote) for lote in lotes))):
+            vereditos.update(zip(lote, resultado))
+        return [vereditos[resposta] for resposta in respostas]
+
+    async def validar_conversas_async(self, conversas: List[str], max_concorrencia: int = 8,
+                                      limitador: RateLimiter = None) -> List[List[Dict[str, Any]]]:
+        """
+        Valida várias conversas com as chamadas à IA em paralelo, no máximo `max_concorrencia` por vez.
+
+        O limite vale para todas as conversas juntas, não por conversa.
+
+        Returns:
+            list: Para cada conversa, os resultados das mensagens do chatbot na ordem original
+        """
+        mensagens_por_conversa = [self.extrair_mensagens_chatbot(conversa) for conversa in conversas]
+        todas = [mensagem for mensagens in mensagens_por_conversa for mensagem in mensagens]
+        semaforo = asyncio.Semaphore(max_concorrencia)
+        if self.tamanho_lote > 1:
+            # Os lotes misturam mensagens de conversas diferentes
+            relevantes = [mensagem for mensagem in todas if self._relevante(mensagem)]
+            vereditos = await self.consultar_ia_lote_async(relevantes, semaforo, limitador)
+            resultados = self._resultados_com_vereditos(todas, dict(zip(relevantes, vereditos)))
+        else:
+            # gather devolve na ordem das tarefas, independentemente de qual termina primeiro
+            resultados = await asyncio.gather(*(
+                self.validar_resposta_async(mensagem, semaforo, limitador) for mensagem in todas
+            ))
+        agrupados = []
+        inicio = 0
+        for mensagens in mensagens_por_conversa:
+            agrupados.append(list(resultados[inicio:inicio + len(mensagens)]))
+            inicio += len(mensagens)
+        return agrupados
+
+    async def validar_conversa_async(self, texto_conversa: str, max_concorrencia: int = 8,
+                                     limitador: RateLimiter = None) -> List[Dict[str, Any]]:
+        """Como validar_conversa, mas com as mensagens validadas em paralelo."""
+        resultados = await self.validar_conversas_async([texto_conversa], max_concorrencia, limitador)
+        return resultados[0]
+
+    def validar_conversas(self, conversas: List[str], max_concorrencia: int = 8,
+                          requisicoes_por_minuto: float = None,
+                          tokens_por_minuto: float = None) -> List[List[Dict[str, Any]]]:
+        """
+        Valida várias conversas em paralelo (para uso fora de código assíncrono).
+
+        Args:
+            conversas: Textos das conversas do WhatsApp
+            max_concorrencia: Chamadas simultâneas à IA; mantenha <= tamanho_pool para
+                reaproveitar as conexões da sessão
+            requisicoes_por_minuto: Cota de requisições da API (None = sem limite)
+            tokens_por_minuto: Cota de tokens da API (None = sem limite)
+
+        Returns:
+            list: Para cada conversa, os resultados na ordem original das mensagens
+        """
+        limitador = None
+        if requisicoes_por_minuto is not None or tokens_por_minuto is not None:
+            limitador = RateLimiter(requisicoes_por_minuto, tokens_por_minuto)
+
+        async def executar():
+            # O executor padrão tem poucas threads; cada chamada concorrente precisa da sua
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_concorrencia))
+            return await self.validar_conversas_async(conversas, max_concorrencia, limitador)
+
+        return asyncio.run(executar())
+
 
 # Função para teste rápido do validador
 def demonstrar_validacao(conversa: str, api_key: str = None):
@@ -196,8 +702,7 @@ def demonstrar_validacao(conversa: str, api_key: str = None):
     validator = ChatbotIAValidator(api_key=api_key)
     resultados = validator.validar_conversa(conversa)
     
-    print(f"\nAnalisando conversa com {len(resultados)} mens
-          agens do chatbot:")
+    print(f"\nAnalisando conversa com {len(resultados)} mensagens do chatbot:")
     for i, resultado in enumerate(resultados, 1):
         if not resultado["relevante"]:
             print(f"\nMensagem {i}: Não relevante para validação.")
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+class VerdictCache:
+    """
+    Cache persistente dos vereditos da IA, para não pagar de novo por respostas já validadas.
+
+    A chave é o hash de (modelo, versão do prompt, informações esperadas, resposta normalizada):
+    mudar qualquer um deles gera uma chave nova. Os vereditos ficam num arquivo SQLite, com
+    validade opcional (TTL) e um número máximo de itens; ao passar do máximo, saem os acessados
+    há mais tempo (LRU). Só vereditos válidos devem ser guardados, nunca respostas de erro da API.
+    """
+
+    def __init__(self, caminho=None, ttl=None, tamanho_maximo=100_000, relogio=time.time):
+        """
+        Args:
+            caminho (str): Arquivo SQLite (None = só em memória, durante a execução)
+            ttl (float): Validade de um veredito em segundos (None = não expira)
+            tamanho_maximo (int): Máximo de vereditos guardados
+            relogio (callable): Fonte de tempo em segundos (substituível nos testes)
+        """
+        self.caminho = caminho
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self._relogio = relogio
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.removidos = 0
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho or ":memory:", check_same_thread=False)
+        if caminho is not None:
+            # WAL: cada acerto atualiza o instante de acesso sem um fsync completo
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS vereditos "
+            "(chave TEXT PRIMARY KEY, veredito TEXT, criado REAL, acessado REAL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_vereditos_acessado ON vereditos (acessado)")
+        self._conexao.commit()
+        self._quantidade = self._conexao.execute("SELECT COUNT(*) FROM vereditos").fetchone()[0]
+
+    @staticmethod
+    def normalizar_texto(texto):
+        # Mesma chave para respostas que só diferem em espaços ou na forma Unicode dos acentos
+        return unicodedata.normalize("NFC", " ".join(texto.split()))
+
+    def chave(self, modelo, versao_prompt, informacoes_esperadas, resposta):
+        conteudo = json.dumps(
+            [modelo, versao_prompt, informacoes_esperadas, self.normalizar_texto(resposta)],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter(self, chave):
+        """Devolve o veredito guardado (dict) ou None se não houver ou tiver expirado."""
+        with self._trava:
+            agora = self._relogio()
+            linha = self._conexao.execute(
+                "SELECT veredito, criado FROM vereditos WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is not None and self.ttl is not None and agora - linha[1] > self.ttl:
+                self._conexao.execute("DELETE FROM vereditos WHERE chave = ?", (chave,))
+                self._conexao.commit()
+                self._quantidade -= 1
+                self.expirados += 1
+                linha = None
+            if linha is None:
+                self.faltas += 1
+                return None
+            self._conexao.execute("UPDATE vereditos SET acessado = ? WHERE chave = ?", (agora, chave))
+            self._conexao.commit()
+            self.acertos += 1
+            return json.loads(linha[0])
+
+    def guardar(self, chave, veredito):
+        """Guarda um veredito válido, removendo os menos usados se passar de tamanho_maximo."""
+        with self._trava:
+            agora = self._relogio()
+            conteudo = json.dumps(veredito, ensure_ascii=False)
+            cursor = self._conexao.execute(
+                "INSERT OR IGNORE INTO vereditos (chave, veredito, criado, acessado) VALUES (?, ?, ?, ?)",
+                (chave, conteudo, agora, agora)
+            )
+            if cursor.rowcount:
+                self._quantidade += 1
+            else:
+                self._conexao.execute(
+                    "UPDATE vereditos SET veredito = ?, criado = ?, acessado = ? WHERE chave = ?",
+                    (conteudo, agora, agora, chave)
+                )
+            excesso = self._quantidade - self.tamanho_maximo
+            if excesso > 0:
+                self._conexao.execute(
+                    "DELETE FROM vereditos WHERE chave IN "
+                    "(SELECT chave FROM vereditos ORDER BY acessado LIMIT ?)", (excesso,)
+                )
+                self._quantidade -= excesso
+                self.removidos += excesso
+            self._conexao.commit()
+
+    def __len__(self):
+        return self._quantidade
+
+    @property
+    def taxa_acerto(self):
+        total = self.acertos + self.faltas
+        return self.acertos / total if total else 0.0
+
+    def estatisticas(self):
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": self.taxa_acerto,
+            "expirados": self.expirados,
+            "removidos": self.removidos,
+            "itens": self._quantidade,
+        }
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
@@ -0,0 +1,81 @@
+import io
+import mmap
+import re
+from contextlib import contextmanager
+
+# Remetentes tratados como chatbot quando nenhum é informado
+REMETENTES_BOT_PADRAO = frozenset({"Futurotec Homologação"})
+
+# [15:26, 06/02/2025] Remetente: texto   (segundos opcionais na hora)
+_CABECALHO = re.compile(r"\[(\d{1,2}:\d{2}(?::\d{2})?), (\d{1,2}/\d{1,2}/\d{2,4})\] ([^:\n]+?): ?(.*)")
+
+# Marcas invisíveis que o WhatsApp coloca no início de algumas linhas exportadas
+_MARCAS_INICIO = "\ufeff\u200e\u200f"
+
+
+def _linhas(origem, encoding):
+    """Linhas de uma string, arquivo texto, arquivo binário ou mmap, uma de cada vez."""
+    if isinstance(origem, str):
+        origem = io.StringIO(origem)
+    if isinstance(origem, mmap.mmap) or isinstance(origem, (io.RawIOBase, io.BufferedIOBase)):
+        for linha in iter(origem.readline, b""):
+            yield linha.decode(encoding, errors="replace")
+    else:
+        yield from origem
+
+
+def iterar_mensagens(origem, remetentes_bot=None, apenas_bot=False, encoding="utf-8"):
+    """
+    Lê uma exportação de conversa do WhatsApp e gera as mensagens uma a uma, sem carregar o arquivo.
+
+    Linhas sem cabeçalho "[HH:MM, DD/MM/AAAA] Remetente:" são continuação da mensagem anterior
+    (mensagens com quebra de linha); linhas antes do primeiro cabeçalho são ignoradas.
+
+    Args:
+        origem: Texto da conversa, arquivo aberto (texto ou binário) ou mmap
+        remetentes_bot (set): Nomes dos remetentes que são o chatbot (padrão: REMETENTES_BOT_PADRAO)
+        apenas_bot (bool): Gera só as mensagens do chatbot
+        encoding (str): Codificação usada para arquivos binários e mmap
+
+    Yields:
+        dict: {"hora", "data", "remetente", "texto", "do_bot"}
+    """
+    remetentes_bot = REMETENTES_BOT_PADRAO if remetentes_bot is None else frozenset(remetentes_bot)
+    atual = None
+    partes = []
+    for linha in _linhas(origem, encoding):
+        linha = linha.rstrip("\r\n")
+        cabecalho = _CABECALHO.match(linha.lstrip(_MARCAS_INICIO))
+        if cabecalho is None:
+            if atual is not None:
+                partes.append(linha)
+            continue
+        if atual is not None and (atual["do_bot"] or not apenas_bot):
+            atual["texto"] = "\n".join(partes).strip()
+            yield atual
+        hora, data, remetente, texto = cabecalho.groups()
+        remetente = remetente.strip()
+        atual = {"hora": hora, "data": data, "remetente": remetente, "texto": "",
+                 "do_bot": remetente in remetentes_bot}
+        partes = [texto]
+    if atual is not None and (atual["do_bot"] or not apenas_bot):
+        atual["texto"] = "\n".join(partes).strip()
+        yield atual
+
+
+@contextmanager
+def abrir_exportacao(caminho):
+    """
+    Abre um arquivo exportado como mmap (somente leitura), para passar a iterar_mensagens.
+
+    O sistema operacional carrega as páginas sob demanda, então arquivos de centenas de MB
+    não ocupam memória do processo de uma vez.
+    """
+    with open(caminho, "rb") as arquivo:
+        if arquivo.seek(0, io.SEEK_END) == 0:
+            # mmap não aceita arquivo vazio
+            arquivo.seek(0)
+            yield arquivo
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            yield mapa
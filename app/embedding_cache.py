@@ -0,0 +1,153 @@
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from embedding_quantization import desquantizar, quantizar
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings endereçado por conteúdo, com chave (nome do modelo, texto normalizado).
+
+    Tem dois níveis: um LRU em memória e, opcionalmente, um arquivo SQLite em disco que
+    sobrevive entre execuções. Textos já vistos não passam de novo pelo modelo.
+    O nível em memória pode guardar os vetores em float16 ou int8; o disco guarda sempre
+    float32, então mudar a precisão não invalida o arquivo.
+    """
+
+    def __init__(self, nome_modelo, caminho=None, tamanho_memoria=10_000, precisao="float32"):
+        """
+        Args:
+            nome_modelo (str): Modelo que gerou os embeddings (faz parte da chave)
+            caminho (str): Arquivo SQLite do nível em disco (None = só memória)
+            tamanho_memoria (int): Máximo de embeddings mantidos no LRU em memória
+            precisao (str): Precisão do nível em memória: "float32", "float16" ou "int8"
+        """
+        self.nome_modelo = nome_modelo
+        self.caminho = caminho
+        self.tamanho_memoria = tamanho_memoria
+        self.precisao = precisao
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.faltas = 0
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+        self._conexao = None
+        if caminho is not None:
+            self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (chave TEXT PRIMARY KEY, dimensao INTEGER, vetor BLOB)"
+            )
+            self._conexao.commit()
+
+    @staticmethod
+    def normalizar_texto(texto):
+        # Mesma chave para textos que só diferem em espaços ou na forma Unicode dos acentos
+        return unicodedata.normalize("NFC", " ".join(texto.split()))
+
+    def chave(self, texto):
+        conteudo = f"{self.nome_modelo}\0{self.normalizar_texto(texto)}"
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter_lote(self, textos, codificar):
+        """
+        Devolve os embeddings de `textos`, chamando `codificar` apenas para os que não estão no cache.
+
+        Args:
+            textos (list): Textos a codificar
+            codificar (callable): Recebe uma lista de textos e devolve a matriz de embeddings
+
+        Returns:
+            np.ndarray: Matriz (len(textos), dimensão), na ordem de entrada
+        """
+        if not textos:
+            return np.zeros((0, 0), dtype=np.float32)
+        chaves = [self.chave(texto) for texto in textos]
+        encontrados = {}
+        with self._trava:
+            for chave in chaves:
+                if chave in encontrados:
+                    continue
+                guardado = self._memoria.get(chave)
+                if guardado is not None:
+                    self._memoria.move_to_end(chave)
+                    encontrados[chave] = desquantizar(*guardado)[0]
+
+            pendentes = [chave for chave in dict.fromkeys(chaves) if chave not in encontrados]
+            do_disco = self._ler_disco(pendentes)
+            for chave, vetor in do_disco.items():
+                encontrados[chave] = vetor
+                self._guardar_memoria(chave, vetor)
+
+        # Textos distintos que ainda faltam: uma única chamada ao modelo
+        faltantes = {}
+        for texto, chave in zip(textos, chaves):
+            if chave not in encontrados and chave not in faltantes:
+                faltantes[chave] = texto
+        if faltantes:
+            novos = np.asarray(codificar(list(faltantes.values())), dtype=np.float32)
+            with self._trava:
+                for chave, vetor in zip(faltantes, novos):
+                    encontrados[chave] = vetor
+                    self._guardar_memoria(chave, vetor)
+                self._gravar_disco(zip(faltantes, novos))
+
+        # Repetições dentro do mesmo lote contam como acerto em memória
+        with self._trava:
+            self.faltas += len(faltantes)
+            self.acertos_disco += len(do_disco)
+            self.acertos_memoria += len(chaves) - len(faltantes) - len(do_disco)
+
+        return np.stack([encontrados[chave] for chave in chaves])
+
+    def _guardar_memoria(self, chave, vetor):
+        self._memoria[chave] = quantizar(vetor[None], self.precisao)
+        self._memoria.move_to_end(chave)
+        if len(self._memoria) > self.tamanho_memoria:
+            self._memoria.popitem(last=False)
+
+    def _ler_disco(self, chaves, tamanho_consulta=500):
+        if self._conexao is None or not chaves:
+            return {}
+        encontrados = {}
+        for inicio in range(0, len(chaves), tamanho_consulta):
+            parte = chaves[inicio:inicio + tamanho_consulta]
+            marcadores = ",".join("?" * len(parte))
+            linhas = self._conexao.execute(
+                f"SELECT chave, vetor FROM embeddings WHERE chave IN ({marcadores})", parte
+            )
+            for chave, vetor in linhas:
+                encontrados[chave] = np.frombuffer(vetor, dtype=np.float32)
+        return encontrados
+
+    def _gravar_disco(self, itens):
+        if self._conexao is None:
+            return
+        self._conexao.executemany(
+            "INSERT OR REPLACE INTO embeddings (chave, dimensao, vetor) VALUES (?, ?, ?)",
+            [(chave, len(vetor), np.asarray(vetor, dtype=np.float32).tobytes()) for chave, vetor in itens]
+        )
+        self._conexao.commit()
+
+    @property
+    def taxa_acerto(self):
+        total = self.acertos_memoria + self.acertos_disco + self.faltas
+        return (self.acertos_memoria + self.acertos_disco) / total if total else 0.0
+
+    def estatisticas(self):
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "faltas": self.faltas,
+            "taxa_acerto": self.taxa_acerto,
+            "itens_memoria": len(self._memoria),
+        }
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
@@ -0,0 +1,51 @@
+import numpy as np
+
+PRECISOES = ("float32", "float16", "int8")
+
+
+def quantizar(matriz, precisao="float32"):
+    """
+    Converte embeddings (já normalizados) para a precisão pedida.
+
+    Args:
+        matriz (np.ndarray): Embeddings (n, d)
+        precisao (str): "float32", "float16" ou "int8"
+
+    Returns:
+        tuple: (dados, escalas). Em int8 cada linha tem sua escala (max |v| / 127), de forma que
+        linha ≈ dados * escala; nas demais precisões escalas é None.
+    """
+    if precisao not in PRECISOES:
+        raise ValueError(f"Precisão inválida: {precisao}. Use uma de {PRECISOES}")
+    matriz = np.asarray(matriz, dtype=np.float32)
+    if precisao != "int8":
+        return np.ascontiguousarray(matriz, dtype=precisao), None
+    maximos = np.abs(matriz).max(axis=1) if matriz.size else np.zeros(len(matriz), dtype=np.float32)
+    escalas = np.where(maximos == 0, 1, maximos / 127).astype(np.float32)
+    dados = np.clip(np.rint(matriz / escalas[:, None]), -127, 127).astype(np.int8)
+    return np.ascontiguousarray(dados), escalas
+
+
+def desquantizar(dados, escalas=None):
+    """Volta para float32 (inverso aproximado de quantizar)."""
+    matriz = np.asarray(dados, dtype=np.float32)
+    return matriz if escalas is None else matriz * escalas[:, None]
+
+
+def produto_quantizado(consultas, dados, escalas=None, tamanho_bloco=8192):
+    """
+    Produto escalar consultas (float32) x linhas quantizadas, equivalente a consultas @ desquantizar(dados).T.
+
+    As linhas são convertidas para float32 em blocos, para não materializar a matriz inteira
+    em float32 a cada chamada.
+    """
+    consultas = np.asarray(consultas, dtype=np.float32)
+    if dados.dtype == np.float32:
+        return consultas @ dados.T
+    resultado = np.empty((len(consultas), len(dados)), dtype=np.float32)
+    for inicio in range(0, len(dados), tamanho_bloco):
+        bloco = dados[inicio:inicio + tamanho_bloco].astype(np.float32)
+        resultado[:, inicio:inicio + len(bloco)] = consultas @ bloco.T
+    if escalas is not None:
+        resultado *= escalas
+    return resultado
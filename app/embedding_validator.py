@@ -1,72 +1,192 @@
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 from pre_processing.pre_processor import pre_process_portuguese
+from embedding_cache import EmbeddingCache
+from reference_registry import ReferenceRegistry
+
+# Cenário usado quando nenhum registro de referências é informado
+CENARIO_PADRAO = {
+    "nome": "ultrassonografia",
+    "respostas_referencia": [
+        "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+        "Encontrei um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. Seu laudo está previsto para 03/02/2025.",
+        "Verifiquei um ultrassom marcado para 31/01/2025, com laudo previsto em 03/02/2025."
+    ],
+    "informacoes_esperadas": {
+        "tipo_exame": "ULTRASSONOGRAFIA",
+        "data_realizacao": "31/01/2025",
+        "data_laudo": "03/02/2025",
+    },
+}
 
 class EmbeddingValidator:
-    def __init__(self, modelo='all-MiniLM-L6-v2'):
+    def __init__(self, modelo='all-MiniLM-L6-v2', cache=None, registro=None, cenario=None, precisao='float32'):
         """
         Inicializa o validador com modelo de embeddings.
         
         Args:
             modelo (str): Modelo de embedding a ser usado
+            cache (EmbeddingCache | str): Cache de embeddings, ou caminho do arquivo SQLite
+                para criar um. Se None, usa um cache apenas em memória.
+            registro (ReferenceRegistry | str): Cenários com as respostas de referência, ou caminho
+                do JSON com eles (ex: datasets/cenarios.json). Se None, usa CENARIO_PADRAO.
+            cenario (str): Cenário usado quando nenhum é informado na validação (padrão: o primeiro)
+            precisao (str): Precisão dos embeddings guardados ('float32', 'float16' ou 'int8').
+                Ver benchmarks/bench_quantization.py para a memória economizada e o desvio da nota.
+        
+        O modelo e os embeddings de referência só são carregados no primeiro uso (ou em warmup()).
         """
-        self.modelo = SentenceTransformer(modelo)
+        self.nome_modelo = modelo
+        self.precisao = precisao
+        self._modelo = None
+        self.referencias_processadas = None
         
-        # Respostas de referência para comparação
-        self.respostas_referencia = [
-            "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
-            "Encontrei um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. Seu laudo está previsto para 03/02/2025.",
-            "Verifiquei um ultrassom marcado para 31/01/2025, com laudo previsto em 03/02/2025."
-        ]
+        # Referências e respostas repetidas não passam de novo pelo modelo
+        if not isinstance(cache, EmbeddingCache):
+            cache = EmbeddingCache(modelo, caminho=cache, precisao=precisao)
+        self.cache = cache
+        
+        # Respostas de referência para comparação, agrupadas por cenário
+        if registro is None:
+            registro = ReferenceRegistry([CENARIO_PADRAO])
+        elif isinstance(registro, str):
+            registro = ReferenceRegistry.carregar(registro)
+        self.registro = registro
+        self.cenario = cenario or registro.nomes[0]
+    
+    @property
+    def modelo(self):
+        # sentence_transformers (e o torch) só são importados quando o modelo é realmente necessário
+        if self._modelo is None:
+            from sentence_transformers import SentenceTransformer
+            self._modelo = SentenceTransformer(self.nome_modelo)
+        return self._modelo
+    
+    def warmup(self):
+        """Carrega o modelo e os embeddings de referência agora, em vez de na primeira validação."""
+        self.modelo
+        self._preparar_referencias()
+        return self
+    
+    def _preparar_referencias(self):
+        if self.referencias_processadas is not None:
+            return
         
         # Aplicar pré-processamento
-        self.respostas_referencia = [
-            pre_process_portuguese(resposta) for resposta in self.respostas_referencia
+        referencias_processadas = [
+            pre_process_portuguese(resposta) for resposta in self.registro.respostas_referencia
         ]
         
-        # Pré-computar embeddings das respostas de referência
-        self.embeddings_referencia = self.modelo.encode(self.respostas_referencia)
+        # Pré-computar embeddings de todas as referências, numa única matriz normalizada.
+        # Se todas estiverem no cache em disco, o modelo nem chega a ser carregado.
+        self.registro.construir_embeddings(
+            lambda _: self.cache.obter_lote(referencias_processadas, self._codificar), precisao=self.precisao
+        )
+        self.referencias_processadas = referencias_processadas
+    
+    # Atalhos para o cenário padrão
+    @property
+    def respostas_referencia(self):
+        self._preparar_referencias()
+        return self.referencias_processadas[self.registro.fatia(self.cenario)]
     
-    def calcular_similaridade(self, resposta_chatbot):
+    @property
+    def embeddings_referencia(self):
+        self._preparar_referencias()
+        return self.registro.referencias(self.cenario)
+    
+    def calcular_similaridade(self, resposta_chatbot, cenario=None):
         """
         Calcula a similaridade da resposta com padrões de referência.
         
         Args:
             resposta_chatbot (str): Resposta do chatbot a ser validada
+            cenario (str): Cenário de referência (padrão: self.cenario)
         
         Returns:
             dict: Dicionário com métricas de validação
         """
+        return self.calcular_similaridade_lote([resposta_chatbot], cenario=cenario)[0]
+    
+    def calcular_similaridade_lote(self, respostas, batch_size=256, cenario=None):
+        """
+        Calcula a similaridade de várias respostas de uma vez.
         
+        Todas as respostas são codificadas em lotes grandes e a matriz resposta x referência
+        sai de um único produto de matrizes normalizadas.
         
-        # # Pré-processar resposta do chatbot
-        # resposta_processada = pre_process_portuguese(resposta_chatbot)
-        # # Gerar embedding da resposta do chatbot
+        Args:
+            respostas (iterable): Respostas do chatbot a serem validadas
+            batch_size (int): Quantidade de respostas por lote enviado ao modelo
+            cenario (str): Cenário de referência (padrão: self.cenario)
         
+        Returns:
+            list: Um dicionário por resposta, no mesmo formato de calcular_similaridade
+        """
+        respostas = list(respostas)
+        if not respostas:
+            return []
+        cenario = cenario or self.cenario
+        self._preparar_referencias()
         
-        embedding_resposta = self.modelo.encode([resposta_chatbot])
+        embeddings_respostas = self._embeddings_respostas(respostas, batch_size)
         
-        # Calcular similaridade de cosseno. Calcula o "ângulo" entre os vetores.Quanto mais próximo de 1, mais similar
-        similaridades = cosine_similarity(embedding_resposta, self.embeddings_referencia)[0]
+        # Similaridade de cosseno. Calcula o "ângulo" entre os vetores.Quanto mais próximo de 1, mais similar
+        matriz_similaridades = self.registro.similaridades(embeddings_respostas, cenario)
         
+        return [
+            self._montar_resultado(resposta, similaridades, cenario)
+            for resposta, similaridades in zip(respostas, matriz_similaridades)
+        ]
+    
+    def identificar_cenarios(self, respostas, k=1, aproximado=False, batch_size=256):
+        """
+        Encontra, para cada resposta, os k cenários com a referência mais similar.
         
+        Args:
+            respostas (iterable): Respostas do chatbot
+            k (int): Quantidade de cenários por resposta
+            aproximado (bool): Usa o índice aproximado do registro (útil com dezenas de milhares de referências)
+            batch_size (int): Quantidade de respostas por lote enviado ao modelo
+        
+        Returns:
+            list: Para cada resposta, lista de (cenário, similaridade) em ordem decrescente
+        """
+        respostas = list(respostas)
+        if not respostas:
+            return []
+        self._preparar_referencias()
+        embeddings_respostas = self._embeddings_respostas(respostas, batch_size)
+        return self.registro.melhores_cenarios(embeddings_respostas, k=k, aproximado=aproximado)
+    
+    def _embeddings_respostas(self, respostas, batch_size):
+        return self.cache.obter_lote(respostas, lambda textos: self._codificar(textos, batch_size=batch_size))
+    
+    def _codificar(self, textos, batch_size=256):
+        # Embeddings já normalizados: é o que fica guardado no cache
+        return self.modelo.encode(textos, batch_size=batch_size, normalize_embeddings=True)
+    
+    def _montar_resultado(self, resposta_chatbot, similaridades, cenario):
         # Duvidoso!
         nota_max = max(similaridades)
         nota = round(nota_max * 5, 2)
+        fatia = self.registro.fatia(cenario)
         
         return {
             "nota": nota,
             "similaridades": list(similaridades),
-            "resposta_mais_similar": self.respostas_referencia[np.argmax(similaridades)],
+            "resposta_mais_similar": self.referencias_processadas[fatia][np.argmax(similaridades)],
             "detalhes_validacao": {
-                "tipo_exame_encontrado": "ULTRASSONOGRAFIA" in resposta_chatbot,
-                "data_realizacao_encontrada": "31/01/2025" in resposta_chatbot,
-                "data_laudo_encontrada": "03/02/2025" in resposta_chatbot
+                _nome_detalhe(campo): valor in resposta_chatbot
+                for campo, valor in self.registro.informacoes_esperadas[cenario].items()
             }
         }
 
 
+def _nome_detalhe(campo):
+    # tipo_exame -> tipo_exame_encontrado; data_laudo -> data_laudo_encontrada
+    return f"{campo}_encontrada" if campo.startswith("data") else f"{campo}_encontrado"
+
+
 # Exemplo de uso
 def demonstrar_validacao():
     validator = EmbeddingValidator()
@@ -1,8 +1,6 @@
 # AVALIAÇÃO DO MODELO
 
 from sklearn.metrics import classification_report
-from training.training import train_model
-import pandas as pd
 
 """  
 x_test_vectorized: textos já vetorizados
@@ -1,26 +1,38 @@
 from pre_processing.pre_processor import load_df_processed
-from training.training import train_model
-from evaluation import evaluate_model
-from visualization import plot_sentiment_distribution
 from sklearn.metrics import classification_report
-from training.training import train_model
-from training.training_embedding import train_model
+
+# Modelo a treinar: "bow" (bag of words + Naive Bayes) ou "embedding" (GloVe + Random Forest),
+# ou "selecao" para comparar os dois por validação cruzada (training/model_selection.py).
+# Só o módulo de treino escolhido é importado, para não pagar o import do outro.
+MODELO = "embedding"
+
+if MODELO == "selecao":
+    from training.model_selection import imprimir_relatorio, selecionar_modelos
+elif MODELO == "bow":
+    from training.training import train_model
+else:
+    from training.training_embedding import train_model
 
 # Carregar dataset
 df = load_df_processed()
 
-# Treinar modelo
-# model, vectorizer, X_test_vectorized, y_test = train_model(df)
-model, vectorizer, X_test_vectorized, y_test = train_model(df)
+if MODELO == "selecao":
+    # Ranking das pipelines e hiperparâmetros (accuracy, F1 macro e latência), usando todos os núcleos
+    imprimir_relatorio(selecionar_modelos(df))
+else:
+    # Treinar modelo
+    # model, vectorizer, X_test_vectorized, y_test = train_model(df)
+    model, vectorizer, X_test_vectorized, y_test = train_model(df)
 
-# Avaliar modelo
-y_pred = model.predict(X_test_vectorized)
-print("\nRelatório de classificação:")
-print(classification_report(y_test, y_pred, target_names=['péssimo', 'ruim', 'Neutro', 'bom', 'ótimo']))
+    # Avaliar modelo
+    y_pred = model.predict(X_test_vectorized)
+    print("\nRelatório de classificação:")
+    print(classification_report(y_test, y_pred, target_names=['péssimo', 'ruim', 'Neutro', 'bom', 'ótimo']))
 
 # # Visualizar dados
+# from visualization import plot_sentiment_distribution
 # plot_sentiment_distribution(df)
 
 
+# from evaluation import evaluate_model
 # evaluate_model(model, X_test_vectorized, y_test, ['Negativo', 'Positivo', 'Neutro'])
-
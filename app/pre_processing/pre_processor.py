@@ -1,7 +1,10 @@
 import re
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import RSLPStemmer
+import json
+import threading
+from collections import OrderedDict
+
+# O NLTK, o pandas e o multiprocessing são importados só quando usados, para que importar
+# este módulo (ex: pelo validador do chatbot) não custe segundos de inicialização.
 
 def remove_urls(text):
     # Substitui qualquer URL (começando com http:// ou https:// ou www.) por string vazia
@@ -18,11 +21,12 @@ def remove_numbers(text):
 
 def tokenize_text(text):
     # Tokenizar - dividir o texto em palavras individuais usando tokenizador específico para português
+    from nltk.tokenize import word_tokenize
     return word_tokenize(text, language='portuguese')
 
 def remove_stopwords_and_short_tokens(tokens):
     # Remove stopwords e palavras muito curtas (menos de 3 caracteres)
-    stop_words = set(stopwords.words('portuguese'))
+    stop_words = _get_default_preprocessor().stop_words
     filtered_tokens = []
     for token in tokens:
         # Verifica se a palavra não é uma stopword e tem mais de 2 caracteres
@@ -40,54 +44,525 @@ def apply_stemming(tokens):
     O stemmer pode prejudicar a legibilidade do texto, mas ajuda a melhorar a eficácia do modelo. Devo verificar com e sem o stemming, já que pretendo validar textos curtos
     
     """
-    stemmer = RSLPStemmer()
-    return [stemmer.stem(token) for token in tokens]
+    stem = _get_default_preprocessor().stem
+    return [stem(token) for token in tokens]
+
+
+# Remoção de URLs, caracteres especiais e números numa única varredura.
+# A URL vem primeiro na alternância para ser removida inteira, como em remove_urls;
+# o resultado é o mesmo de aplicar as três funções acima em sequência.
+_CLEANUP_PATTERN = re.compile(
+    r'https?://\S+|www\.\S+'       # URLs
+    r'|[^\w\sáéíóúãõçÁÉÍÓÚÃÕÇ]'     # pontuação e caracteres especiais
+    r'|\d+'                        # números
+)
+
+
+class StemCache:
+    """
+    Cache token -> radical com limite de tamanho e descarte LRU (menos usado recentemente).
+
+    O vocabulário das avaliações é muito concentrado (poucos milhares de tokens se repetem
+    milhões de vezes), então a maior parte das chamadas ao RSLPStemmer vira uma consulta
+    ao dicionário. Pode ser salvo em disco (JSON) e pré-carregado em execuções seguintes.
+    Pode ser compartilhado entre threads.
+    """
+
+    def __init__(self, stemmer, maxsize=100_000, path=None):
+        """
+        Args:
+            stemmer: Objeto com método stem(token), ex: RSLPStemmer
+            maxsize (int): Número máximo de tokens mantidos no cache
+            path (str): Arquivo JSON para pré-carregar/salvar o cache (opcional)
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize deve ser positivo")
+        self.stemmer = stemmer
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._stems = OrderedDict()
+        self._new = None
+        self._lock = threading.Lock()
+        if path is not None:
+            self.load(path)
+
+    def stem(self, token):
+        # A consulta, o move_to_end e o descarte ficam sob o lock: sem ele, uma thread pode
+        # descartar o token que outra está movendo para o fim (KeyError)
+        stems = self._stems
+        with self._lock:
+            try:
+                stemmed = stems[token]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                stems.move_to_end(token)
+                return stemmed
+        # O stemmer roda fora do lock; se outra thread calcular o mesmo token, o resultado é igual
+        stemmed = self.stemmer.stem(token)
+        with self._lock:
+            stems[token] = stemmed
+            stems.move_to_end(token)
+            if self._new is not None:
+                self._new[token] = stemmed
+            if len(stems) > self.maxsize:
+                stems.popitem(last=False)
+        return stemmed
+
+    def __len__(self):
+        return len(self._stems)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self._stems),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def update(self, stems):
+        # Insere radicais já calculados (ex: por outros processos) sem alterar os contadores
+        with self._lock:
+            for token, stemmed in stems.items():
+                self._stems[token] = stemmed
+                self._stems.move_to_end(token)
+            while len(self._stems) > self.maxsize:
+                self._stems.popitem(last=False)
+
+    def track_new(self):
+        # Passa a registrar os radicais calculados, para serem repassados com pop_new()
+        self._new = {}
+
+    def pop_new(self):
+        with self._lock:
+            new, self._new = self._new or {}, {}
+        return new
+
+    def load(self, path):
+        # Pré-carrega o cache salvo; arquivo inexistente significa cache vazio
+        try:
+            with open(path, encoding="utf-8") as f:
+                stems = json.load(f)
+        except FileNotFoundError:
+            return
+        self.update(stems)
+
+    def save(self, path=None):
+        # Salva em ordem LRU, para que os tokens mais recentes sobrevivam a um maxsize menor
+        path = path or self.path
+        if path is None:
+            raise ValueError("Nenhum caminho informado para salvar o cache")
+        with self._lock:
+            stems = dict(self._stems)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stems, f, ensure_ascii=False)
+
+
+class PortuguesePreprocessor:
+    """
+    Pipeline de pré-processamento com o estado do NLTK carregado uma única vez.
+
+    As stopwords e o RSLPStemmer são criados no construtor e reaproveitados em todas
+    as chamadas, em vez de serem recriados para cada texto.
+    """
+
+    def __init__(self, min_token_length=3, use_stemming=True, stem_cache_size=100_000, stem_cache_path=None):
+        """
+        Args:
+            min_token_length (int): Tamanho mínimo para um token ser mantido
+            use_stemming (bool): Se False, os tokens não passam pelo stemmer
+            stem_cache_size (int): Tamanho do cache de radicais; 0 desativa o cache
+            stem_cache_path (str): Arquivo JSON do cache de radicais a pré-carregar (opcional)
+        """
+        from nltk.corpus import stopwords
+        from nltk.stem import RSLPStemmer
+        from nltk.tokenize import word_tokenize
+
+        self.min_token_length = min_token_length
+        self.use_stemming = use_stemming
+        self._word_tokenize = word_tokenize
+        self.stop_words = frozenset(stopwords.words('portuguese'))
+        self.stemmer = RSLPStemmer()
+        self.stem_cache = None
+        self.stem = self.stemmer.stem
+        if stem_cache_size:
+            self.stem_cache = StemCache(self.stemmer, maxsize=stem_cache_size, path=stem_cache_path)
+            self.stem = self.stem_cache.stem
+
+    def config(self):
+        # Parâmetros necessários para recriar um pré-processador equivalente (ex: em outro processo)
+        return {
+            "min_token_length": self.min_token_length,
+            "use_stemming": self.use_stemming,
+            "stem_cache_size": self.stem_cache.maxsize if self.stem_cache is not None else 0,
+        }
+
+    @staticmethod
+    def clean_text(text):
+        # Minúsculas + remoção de URLs, caracteres especiais e números em uma passada
+        return _CLEANUP_PATTERN.sub('', text.lower())
+
+    def process(self, text):
+        # Mesmo resultado de pre_process_portuguese, sem recriar stopwords e stemmer
+        if not isinstance(text, str):
+            return ""
+        tokens = self._word_tokenize(self.clean_text(text), language='portuguese')
+        stop_words = self.stop_words
+        min_length = self.min_token_length
+        tokens = [token for token in tokens if token not in stop_words and len(token) >= min_length]
+        if self.use_stemming:
+            stem = self.stem
+            tokens = [stem(token) for token in tokens]
+        return ' '.join(tokens)
+
+    def process_many(self, texts):
+        # Processa uma coleção de textos, mantendo a ordem de entrada
+        return [self.process(text) for text in texts]
+
+
+_default_preprocessor = None
+
+def _get_default_preprocessor():
+    # Instância compartilhada, criada só no primeiro uso para não carregar o NLTK no import
+    global _default_preprocessor
+    if _default_preprocessor is None:
+        _default_preprocessor = PortuguesePreprocessor()
+    return _default_preprocessor
 
 def pre_process_portuguese(text):
     # Função principal que realiza o pré-processamento completo do texto.
     if not isinstance(text, str):
         return ""
-    text = text.lower()
-    text = remove_urls(text)
-    text = remove_special_characters(text)
-    text = remove_numbers(text)
-    tokens = tokenize_text(text)
-    tokens = remove_stopwords_and_short_tokens(tokens)
-    tokens = apply_stemming(tokens) # Juntar as palavras processadas de volta em um texto único separado por espaços
-    return ' '.join(tokens)
+    return _get_default_preprocessor().process(text)
+
+
+# Estado de cada processo do pool: stopwords e stemmer são carregados uma vez por worker
+_worker_preprocessor = None
+
+def _init_worker(config, stem_cache_path):
+    global _worker_preprocessor
+    _worker_preprocessor = PortuguesePreprocessor(stem_cache_path=stem_cache_path, **config)
+    if _worker_preprocessor.stem_cache is not None:
+        _worker_preprocessor.stem_cache.track_new()
+
+def _process_chunk(texts):
+    # Devolve os textos processados e os radicais novos, para o processo principal juntar ao seu cache
+    processed = _worker_preprocessor.process_many(texts)
+    cache = _worker_preprocessor.stem_cache
+    return processed, (cache.pop_new() if cache is not None else {})
+
+def _resolve_n_jobs(n_jobs):
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+def _create_pool(preprocessor, n_jobs):
+    # Pool cujos workers recriam o pré-processador (e o cache de radicais salvo) uma única vez
+    from concurrent.futures import ProcessPoolExecutor
+
+    stem_cache = preprocessor.stem_cache
+    initargs = (preprocessor.config(), stem_cache.path if stem_cache is not None else None)
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=initargs)
+
+def process_texts(texts, n_jobs=1, chunksize=5_000, preprocessor=None, executor=None):
+    """
+    Pré-processa uma coleção de textos, opcionalmente dividindo-a em blocos entre vários processos.
+
+    O speedup com vários processos ainda não foi medido: ver benchmarks/bench_parallel_preprocessing.py.
+
+    Args:
+        texts (iterable): Textos a processar
+        n_jobs (int): Número de processos; 1 executa em série e -1 usa todos os núcleos
+        chunksize (int): Quantidade de textos enviada a cada worker por vez
+        preprocessor (PortuguesePreprocessor): Pré-processador base (padrão: instância compartilhada)
+        executor (ProcessPoolExecutor): Pool já criado com _create_pool, reaproveitado entre chamadas
+
+    Returns:
+        list: Textos processados, na mesma ordem da entrada. O resultado é idêntico ao caminho
+        em série, que também é usado quando há um único bloco ou o pool não pode ser criado.
+    """
+    preprocessor = preprocessor or _get_default_preprocessor()
+    texts = list(texts)
+    n_jobs = _resolve_n_jobs(n_jobs)
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    if n_jobs <= 1 or len(chunks) <= 1:
+        return preprocessor.process_many(texts)
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    stem_cache = preprocessor.stem_cache
+    results = []
+    try:
+        own_executor = executor is None
+        if own_executor:
+            executor = _create_pool(preprocessor, min(n_jobs, len(chunks)))
+        try:
+            # executor.map devolve os blocos na ordem de envio, preservando a ordem das linhas
+            for processed, new_stems in executor.map(_process_chunk, chunks):
+                results.extend(processed)
+                if stem_cache is not None:
+                    stem_cache.update(new_stems)
+        finally:
+            if own_executor:
+                executor.shutdown()
+    except (OSError, BrokenProcessPool) as e:
+        print(f"Aviso: pool de processos indisponível ({e}); processando em série.")
+        return preprocessor.process_many(texts)
+    return results
 
 
 # dataset real de avaliações de produtos da B2W (Americanas, Submarino, Shoptime). Link para download: https://github.com/americanas-tech/b2w-reviews01
-import pandas as pd
+import hashlib
 import os
 
+# Versão da lógica de pré-processamento. Incrementar sempre que uma mudança no código alterar
+# o texto processado ou os tipos das colunas, para invalidar os caches em disco gerados por
+# load_df_processed. Versão 2: nota como int8 e avaliações sem nota descartadas.
+PREPROCESSING_VERSION = 2
+
+
+def _file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _processed_cache_key(dataset_path, preprocessor):
+    # Chave do cache: conteúdo do CSV + versão do código + configuração que altera a saída
+    import nltk
+
+    config = preprocessor.config()
+    config.pop("stem_cache_size")  # só afeta a velocidade, não o resultado
+    key = {
+        "dataset_sha256": _file_sha256(dataset_path),
+        "preprocessing_version": PREPROCESSING_VERSION,
+        "nltk_version": nltk.__version__,
+        "config": config,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
 
-def load_df_processed():
+def _read_processed_cache(cache_path):
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(cache_path)
+    except FileNotFoundError:
+        return None
+    except ImportError as e:
+        print(f"Aviso: cache em disco desativado, Parquet indisponível ({e}).")
+        return None
+
+
+def _write_processed_cache(df, cache_path):
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=True)
+    except ImportError as e:
+        print(f"Aviso: cache em disco desativado, Parquet indisponível ({e}).")
+        return
+    # Troca atômica e remoção dos caches de versões anteriores
+    os.replace(tmp_path, cache_path)
+    for name in os.listdir(cache_dir):
+        if name.startswith("b2w_processed_") and name.endswith(".parquet") and \
+                os.path.join(cache_dir, name) != cache_path:
+            os.remove(os.path.join(cache_dir, name))
+
+
+# Apenas as colunas usadas, com tipos compactos (a nota cabe em int8). A nota é lida como Int8
+# (aceita valores ausentes) e convertida para int8 depois que as linhas sem nota são descartadas.
+B2W_COLUMNS = ["overall_rating", "review_text"]
+B2W_DTYPES = {"overall_rating": "Int8", "review_text": "object"}
+
+
+def _default_dataset_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "B2W-Reviews01.csv")
+
+
+def _drop_missing_ratings(df, dataset_path):
+    df = df.rename(columns={"overall_rating": "sentiment"})
+    missing = df["sentiment"].isna()
+    if missing.any():
+        print(f"Aviso: {missing.sum()} avaliações sem nota em {dataset_path} foram descartadas.")
+        df = df[~missing]
+    return df.astype({"sentiment": "int8"})
+
+
+def _empty_processed_df():
+    import pandas as pd
+
+    return pd.DataFrame({"sentiment": pd.Series(dtype="int8"), "processed_text": pd.Series(dtype=object)})
+
+
+def read_b2w_csv(dataset_path=None, chunksize=None):
+    """
+    Lê as colunas usadas do CSV da B2W, descartando as avaliações sem nota (com aviso).
+
+    Args:
+        dataset_path (str): Caminho do CSV (padrão: B2W-Reviews01.csv ao lado deste script)
+        chunksize (int): Se informado, lê em blocos desse tamanho
+
+    Returns:
+        DataFrame com as colunas ['sentiment' (int8), 'review_text'] e o índice original do CSV,
+        ou um iterador desses blocos se chunksize for informado
+    """
+    import pandas as pd
+
+    dataset_path = dataset_path or _default_dataset_path()
+    if chunksize is None:
+        df = pd.read_csv(dataset_path, encoding="utf-8", usecols=B2W_COLUMNS, dtype=B2W_DTYPES)
+        return _drop_missing_ratings(df, dataset_path)
+
+    def chunks():
+        with pd.read_csv(dataset_path, encoding="utf-8", usecols=B2W_COLUMNS, dtype=B2W_DTYPES,
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield _drop_missing_ratings(chunk, dataset_path)
+
+    return chunks()
+
+
+def iter_processed_chunks(dataset_path=None, chunksize=50_000, n_jobs=1, worker_chunksize=5_000, preprocessor=None):
+    """
+    Lê o CSV da B2W em blocos de tamanho fixo e devolve cada bloco já pré-processado.
+
+    Só um bloco de texto bruto fica em memória por vez, o que permite processar arquivos
+    maiores que a RAM disponível.
+
+    Args:
+        dataset_path (str): Caminho do CSV (padrão: B2W-Reviews01.csv ao lado deste script)
+        chunksize (int): Linhas lidas do CSV por bloco
+        n_jobs (int): Processos usados no pré-processamento de cada bloco (o pool é reaproveitado)
+        worker_chunksize (int): Textos enviados a cada worker por vez
+        preprocessor (PortuguesePreprocessor): Pré-processador base (padrão: instância compartilhada)
+
+    Yields:
+        DataFrame: Bloco com as colunas ['sentiment', 'processed_text'], com o índice original do CSV
+    """
+    preprocessor = preprocessor or _get_default_preprocessor()
+    n_jobs = _resolve_n_jobs(n_jobs)
+    reader = read_b2w_csv(dataset_path, chunksize=chunksize)
+    executor = _create_pool(preprocessor, n_jobs) if n_jobs > 1 else None
+    try:
+        for chunk in reader:
+            chunk["processed_text"] = process_texts(
+                chunk.pop("review_text"), n_jobs=n_jobs, chunksize=worker_chunksize,
+                preprocessor=preprocessor, executor=executor
+            )
+            yield chunk
+    finally:
+        reader.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+def write_processed_dataset(output_path, dataset_path=None, chunksize=50_000, n_jobs=1, preprocessor=None):
+    """
+    Pré-processa o CSV em blocos e grava cada bloco em um arquivo Parquet assim que fica pronto.
+
+    Returns:
+        int: Número de avaliações gravadas
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    total = 0
+    writer = None
+    try:
+        for chunk in iter_processed_chunks(dataset_path, chunksize=chunksize, n_jobs=n_jobs,
+                                           preprocessor=preprocessor):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def load_df_processed(stem_cache_path=None, n_jobs=1, chunksize=5_000, use_cache=True, cache_dir=None,
+                      read_chunksize=None, dataset_path=None):
     """
     Carrega o dataset de avaliações da B2W e converte as notas em categorias de sentimento.
     
+    Parâmetros:
+    - stem_cache_path (str): Arquivo JSON do cache de radicais. Se informado, é pré-carregado
+      antes do pré-processamento e salvo ao final, para que execuções seguintes não repitam o stemming.
+    - n_jobs (int): Número de processos usados no pré-processamento (1 = em série, -1 = todos os núcleos).
+      Ver benchmarks/bench_parallel_preprocessing.py para medir o ganho com 1/2/4/8 workers.
+    - chunksize (int): Quantidade de avaliações enviada a cada worker por vez.
+    - use_cache (bool): Lê/grava o resultado em um arquivo Parquet. A chave combina o hash do CSV,
+      PREPROCESSING_VERSION e a configuração do pré-processador, então qualquer mudança invalida o cache.
+    - cache_dir (str): Pasta do cache (padrão: .cache/ ao lado deste script).
+    - read_chunksize (int): Se informado, lê e pré-processa o CSV em blocos desse tamanho
+      (ver iter_processed_chunks), mantendo só um bloco de texto bruto em memória.
+    - dataset_path (str): CSV no formato da B2W (padrão: B2W-Reviews01.csv ao lado deste script).
+    
     Retorna:
-    - df (DataFrame): DataFrame processado com as colunas ['overall_rating', 'review_title', 'sentiment'].
+    - df (DataFrame): DataFrame processado com as colunas ['sentiment', 'processed_text'].
     """
+    import pandas as pd
+
     # 🔹 Obtém o diretório onde este script está salvo
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     # 🔹 Caminho absoluto do dataset
-    dataset_path = os.path.join(script_dir, "B2W-Reviews01.csv")
+    dataset_path = dataset_path or _default_dataset_path()
     
     try:
-        # Carrega o dataset
-        df = pd.read_csv(dataset_path, encoding="utf-8")
-        
-        # Filtra colunas relevantes
-        df_subset = df[["overall_rating", "review_text"]].copy()
-        df_subset.rename(columns={"overall_rating": "sentiment"}, inplace=True)
-        
-        # Aplica o pré-processamento na coluna 'review_text' e substitui o conteúdo original
-        df_subset['processed_text'] = df_subset['review_text'].apply(pre_process_portuguese)
-        
-        # Remove a coluna 'review_text' e mantém apenas o texto processado
-        df_subset.drop(columns=['review_text'], inplace=True)
+        if stem_cache_path is None:
+            preprocessor = _get_default_preprocessor()
+        else:
+            preprocessor = PortuguesePreprocessor(stem_cache_path=stem_cache_path)
+
+        # 🔹 Partida a quente: reaproveita o resultado de uma execução anterior
+        cache_path = None
+        if use_cache:
+            cache_key = _processed_cache_key(dataset_path, preprocessor)
+            cache_path = os.path.join(cache_dir or os.path.join(script_dir, ".cache"),
+                                      f"b2w_processed_{cache_key}.parquet")
+            df_cached = _read_processed_cache(cache_path)
+            if df_cached is not None:
+                return df_cached
+
+        if read_chunksize:
+            # Modo em blocos: só um bloco de texto bruto em memória por vez
+            chunks = list(iter_processed_chunks(dataset_path, chunksize=read_chunksize, n_jobs=n_jobs,
+                                                worker_chunksize=chunksize, preprocessor=preprocessor))
+            # CSV só com cabeçalho (ou com todas as linhas descartadas) pode não gerar nenhum bloco
+            df_subset = pd.concat(chunks) if chunks else _empty_processed_df()
+        else:
+            # Carrega o dataset, apenas com as colunas relevantes
+            df_subset = read_b2w_csv(dataset_path)
+
+            # Aplica o pré-processamento na coluna 'review_text' e substitui o conteúdo original
+            df_subset['processed_text'] = process_texts(
+                df_subset['review_text'], n_jobs=n_jobs, chunksize=chunksize, preprocessor=preprocessor
+            )
+
+            # Remove a coluna 'review_text' e mantém apenas o texto processado
+            df_subset.drop(columns=['review_text'], inplace=True)
+
+        if stem_cache_path is not None:
+            preprocessor.stem_cache.save()
+
+        if cache_path is not None:
+            _write_processed_cache(df_subset, cache_path)
         
         return df_subset
 
@@ -1,5 +1,11 @@
+import os
+import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
+import pre_processor
 from pre_processor import (
     remove_urls,
     remove_special_characters,
@@ -7,7 +13,12 @@ from pre_processor import (
     tokenize_text,
     remove_stopwords_and_short_tokens,
     apply_stemming,
-    pre_process_portuguese
+    pre_process_portuguese,
+    PortuguesePreprocessor,
+    StemCache,
+    process_texts,
+    read_b2w_csv,
+    load_df_processed
 )
 
 class TestPreProcessor(unittest.TestCase):
@@ -61,5 +72,132 @@ class TestPreProcessor(unittest.TestCase):
         """Testa se entrada não string retorna vazia."""
         self.assertEqual(pre_process_portuguese(12345), "")
 
+    def test_clean_text_matches_sequential_steps(self):
+        """Testa se a varredura única equivale a remover URLs, caracteres especiais e números em sequência."""
+        text = "Comprei 2 em www.loja.com.br, veja https://x.co/a?b=1 #top :) R$ 10,50!"
+        expected = remove_numbers(remove_special_characters(remove_urls(text.lower())))
+        self.assertEqual(PortuguesePreprocessor.clean_text(text), expected)
+
+    def test_preprocessor_process_matches_function(self):
+        """Testa se o pipeline reutilizável produz o mesmo resultado da função."""
+        preprocessor = PortuguesePreprocessor()
+        texts = ["Hoje é um ótimo dia para estudar!", "Produto chegou rápido, recomendo.", "", None]
+        self.assertEqual(preprocessor.process(texts[0]), "hoj ótim dia estud")
+        self.assertEqual(preprocessor.process_many(texts), [pre_process_portuguese(t) for t in texts])
+
+    def test_stem_cache_counts_hits_and_evicts_lru(self):
+        """Testa contadores de acerto/erro e o descarte do token menos usado recentemente."""
+        class UpperStemmer:
+            def stem(self, token):
+                return token.upper()
+
+        cache = StemCache(UpperStemmer(), maxsize=2)
+        self.assertEqual(cache.stem('produto'), 'PRODUTO')
+        self.assertEqual(cache.stem('entrega'), 'ENTREGA')
+        self.assertEqual(cache.stem('produto'), 'PRODUTO')  # 'entrega' passa a ser o menos recente
+        cache.stem('recomendo')
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 2))
+        cache.stem('entrega')  # foi descartado, conta como erro
+        self.assertEqual(cache.misses, 4)
+
+    def test_stem_cache_shared_between_threads(self):
+        """Testa se várias threads usando o mesmo cache pequeno não perdem tokens nem levantam KeyError."""
+        class UpperStemmer:
+            def stem(self, token):
+                return token.upper()
+
+        cache = StemCache(UpperStemmer(), maxsize=8)
+        tokens = [f"token{i}" for i in range(16)]
+        erros = []
+
+        def usar_cache():
+            try:
+                for _ in range(500):
+                    for token in tokens:
+                        if cache.stem(token) != token.upper():
+                            erros.append(token)
+            except Exception as erro:
+                erros.append(erro)
+
+        # Troca de thread o mais frequente possível, para aumentar a chance de intercalar hit e descarte
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=usar_cache) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(intervalo)
+        self.assertEqual(erros, [])
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(cache.hits + cache.misses, 4 * 500 * len(tokens))
+
+    def test_stem_cache_save_and_preload(self):
+        """Testa se o cache salvo em disco é pré-carregado e evita novas chamadas ao stemmer."""
+        class CountingStemmer:
+            calls = 0
+            def stem(self, token):
+                CountingStemmer.calls += 1
+                return token[:4]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stems.json')
+            first = StemCache(CountingStemmer(), path=path)
+            first.stem('comprando')
+            first.save()
+            preloaded = StemCache(CountingStemmer(), path=path)
+            self.assertEqual(preloaded.stem('comprando'), 'comp')
+            self.assertEqual((preloaded.hits, preloaded.misses), (1, 0))
+            self.assertEqual(CountingStemmer.calls, 1)
+
+    def test_process_texts_parallel_preserves_order(self):
+        """Testa se o modo com vários processos devolve o mesmo resultado, na mesma ordem, do modo em série."""
+        texts = ["Produto ótimo, recomendo!", "Entrega atrasou 10 dias.", None, "Não gostei da embalagem.",
+                 "Chegou antes do prazo", "Veja em www.loja.com"] * 3
+        self.assertEqual(process_texts(texts, n_jobs=2, chunksize=4), process_texts(texts, n_jobs=1))
+
+    def test_read_b2w_csv_drops_missing_ratings(self):
+        """Testa se avaliações sem nota são descartadas e a nota fica em int8, lendo inteiro ou em blocos."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "avaliacoes.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("overall_rating,review_text,recommend_to_a_friend\n"
+                        "5,ótimo,Yes\n,sem nota,No\n2,ruim,No\n,,Yes\n4,bom,Yes\n")
+            df = read_b2w_csv(path)
+            self.assertEqual(list(df.columns), ["sentiment", "review_text"])
+            self.assertEqual(str(df["sentiment"].dtype), "int8")
+            self.assertEqual(df["sentiment"].tolist(), [5, 2, 4])
+            self.assertEqual(df.index.tolist(), [0, 2, 4])
+            chunks = list(read_b2w_csv(path, chunksize=2))
+            self.assertEqual([chunk["sentiment"].tolist() for chunk in chunks], [[5], [2], [4]])
+    def test_load_df_processed_without_rows(self):
+        """Testa se um CSV sem avaliações válidas devolve um DataFrame vazio, lendo inteiro ou em blocos."""
+        class LowerPreprocessor:
+            stem_cache = None
+            def process_many(self, texts):
+                return [text.lower() for text in texts]
+
+        cabecalho = "overall_rating,review_text,recommend_to_a_friend\n"
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.object(pre_processor, "_default_preprocessor", LowerPreprocessor()):
+            for nome, conteudo in (("vazio", cabecalho), ("sem_nota", cabecalho + ",sem nota,No\n,,Yes\n")):
+                path = os.path.join(tmpdir, f"{nome}.csv")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(conteudo)
+                for read_chunksize in (None, 1):
+                    with self.subTest(arquivo=nome, read_chunksize=read_chunksize):
+                        df = load_df_processed(use_cache=False, read_chunksize=read_chunksize, dataset_path=path)
+                        self.assertEqual(list(df.columns), ["sentiment", "processed_text"])
+                        self.assertEqual(len(df), 0)
+                        self.assertEqual(str(df["sentiment"].dtype), "int8")
+
+            # Leitor que não gera nenhum bloco (pd.concat de uma lista vazia)
+            with mock.patch.object(pre_processor, "read_b2w_csv", return_value=(chunk for chunk in ())):
+                df = load_df_processed(use_cache=False, read_chunksize=1, dataset_path=path)
+            self.assertEqual(list(df.columns), ["sentiment", "processed_text"])
+            self.assertEqual(len(df), 0)
+
 if __name__ == "__main__":
     unittest.main()
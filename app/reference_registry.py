@@ -0,0 +1,199 @@
+import json
+
+import numpy as np
+
+from embedding_quantization import desquantizar, produto_quantizado, quantizar
+
+
+def normalizar_linhas(matriz):
+    """Divide cada linha pela sua norma (linhas nulas continuam nulas)."""
+    matriz = np.asarray(matriz, dtype=np.float32)
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.where(normas == 0, 1, normas)
+
+
+class ReferenceRegistry:
+    """
+    Registro de cenários (intenções) de validação, cada um com várias respostas de referência.
+
+    Os embeddings de todas as referências ficam numa única matriz contígua e normalizada
+    (float32, ou float16/int8 para economizar memória); `offsets[i]:offsets[i + 1]` são as
+    linhas do cenário i. Assim, pontuar uma resposta contra um cenário é um produto com uma
+    fatia da matriz, e achar o melhor cenário é um produto com a matriz inteira seguido de um
+    máximo por cenário.
+    """
+
+    def __init__(self, cenarios):
+        """
+        Args:
+            cenarios (list): Dicionários com "nome", "respostas_referencia" e,
+                opcionalmente, "informacoes_esperadas"
+        """
+        self.nomes = []
+        self.respostas_referencia = []
+        self.informacoes_esperadas = {}
+        offsets = [0]
+        for cenario in cenarios:
+            nome = cenario["nome"]
+            respostas = list(cenario["respostas_referencia"])
+            if nome in self.informacoes_esperadas:
+                raise ValueError(f"Cenário duplicado: {nome}")
+            if not respostas:
+                raise ValueError(f"Cenário sem respostas de referência: {nome}")
+            self.nomes.append(nome)
+            self.respostas_referencia.extend(respostas)
+            self.informacoes_esperadas[nome] = dict(cenario.get("informacoes_esperadas", {}))
+            offsets.append(offsets[-1] + len(respostas))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._posicao = {nome: i for i, nome in enumerate(self.nomes)}
+        self.precisao = "float32"
+        self.dados = None
+        self.escalas = None
+        self.indice_aproximado = None
+        self._matriz = None
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega os cenários de um arquivo JSON no formato {"cenarios": [...]}."""
+        with open(caminho, encoding="utf-8") as f:
+            return cls(json.load(f)["cenarios"])
+
+    def construir_embeddings(self, codificar, precisao="float32"):
+        """
+        Calcula a matriz de embeddings das referências.
+
+        Args:
+            codificar (callable): Recebe a lista de textos e devolve a matriz de embeddings
+            precisao (str): "float32", "float16" (metade da memória) ou "int8" com escala por
+                vetor (um quarto da memória); a pontuação usa o produto escalar correspondente
+        """
+        matriz = normalizar_linhas(codificar(self.respostas_referencia))
+        self.dados, self.escalas = quantizar(matriz, precisao)
+        self.precisao = precisao
+        self.indice_aproximado = None
+        self._matriz = None
+        return self
+
+    @property
+    def matriz(self):
+        """
+        Matriz de referências em float32 (cópia desquantizada se a precisão for menor).
+
+        A cópia é feita no primeiro acesso e reaproveitada até o próximo construir_embeddings;
+        com float16/int8 ela ocupa a memória do float32, então os caminhos de pontuação usam
+        `similaridades`/`melhores_cenarios` (ou `referencias`, só com as linhas de um cenário).
+        """
+        if self.dados is None:
+            return None
+        if self._matriz is None:
+            self._matriz = desquantizar(self.dados, self.escalas)
+        return self._matriz
+
+    def referencias(self, cenario):
+        """Embeddings float32 das referências de um cenário, desquantizando só as linhas dele."""
+        linhas = self.fatia(cenario)
+        if self._matriz is not None:
+            return self._matriz[linhas]
+        return desquantizar(self.dados[linhas], self.escalas[linhas] if self.escalas is not None else None)
+
+    def memoria_bytes(self):
+        """Memória ocupada pelos embeddings das referências (incluindo as escalas em int8)."""
+        return self.dados.nbytes + (self.escalas.nbytes if self.escalas is not None else 0)
+
+    def _produto(self, consultas, linhas=slice(None)):
+        escalas = self.escalas[linhas] if self.escalas is not None else None
+        return produto_quantizado(consultas, self.dados[linhas], escalas)
+
+    def fatia(self, cenario):
+        """Intervalo de linhas da matriz que pertence ao cenário."""
+        i = self._posicao[cenario]
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def respostas_do_cenario(self, cenario):
+        return self.respostas_referencia[self.fatia(cenario)]
+
+    def similaridades(self, embeddings, cenario):
+        """
+        Similaridade de cosseno de cada resposta com cada referência do cenário.
+
+        Args:
+            embeddings (np.ndarray): Embeddings normalizados das respostas (n, d)
+
+        Returns:
+            np.ndarray: Matriz (n, referências do cenário)
+        """
+        return self._produto(embeddings, self.fatia(cenario))
+
+    def melhores_cenarios(self, embeddings, k=1, aproximado=False, tamanho_bloco=256):
+        """
+        Os k cenários mais próximos de cada resposta (pela referência mais similar de cada cenário).
+
+        Args:
+            embeddings (np.ndarray): Embeddings normalizados das respostas (n, d)
+            k (int): Quantidade de cenários por resposta
+            aproximado (bool): Usa o índice aproximado (ver construir_indice_aproximado)
+            tamanho_bloco (int): Respostas por produto de matrizes no caminho exato
+
+        Returns:
+            list: Para cada resposta, lista de (nome do cenário, similaridade) em ordem decrescente
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        k = min(k, len(self.nomes))
+        if aproximado:
+            if self.indice_aproximado is None:
+                self.construir_indice_aproximado()
+            return [self._melhores_aproximado(consulta, k) for consulta in embeddings]
+
+        resultados = []
+        for inicio in range(0, len(embeddings), tamanho_bloco):
+            similaridades = self._produto(embeddings[inicio:inicio + tamanho_bloco])
+            # Máximo de cada cenário: reduceat percorre as colunas de offset em offset
+            por_cenario = np.maximum.reduceat(similaridades, self.offsets[:-1], axis=1)
+            resultados.extend(self._top_k(linha, k) for linha in por_cenario)
+        return resultados
+
+    def _top_k(self, pontuacoes, k):
+        melhores = np.argpartition(-pontuacoes, k - 1)[:k]
+        melhores = melhores[np.argsort(-pontuacoes[melhores])]
+        return [(self.nomes[i], float(pontuacoes[i])) for i in melhores]
+
+    def construir_indice_aproximado(self, n_listas=None, n_sondagens=8, iteracoes=10, semente=42):
+        """
+        Índice aproximado do tipo IVF: as referências são agrupadas por k-means (cosseno) e a busca
+        só compara a resposta com as referências dos `n_sondagens` grupos mais próximos.
+
+        Mantém a latência estável quando o número de referências cresce (ex: 100 mil).
+        """
+        matriz = self.matriz
+        n_referencias = len(matriz)
+        n_listas = min(n_listas or max(1, int(np.sqrt(n_referencias))), n_referencias)
+        rng = np.random.default_rng(semente)
+        centroides = matriz[rng.choice(n_referencias, size=n_listas, replace=False)].copy()
+        for _ in range(iteracoes):
+            grupos = np.argmax(matriz @ centroides.T, axis=1)
+            for g in range(n_listas):
+                membros = matriz[grupos == g]
+                if len(membros):
+                    centroides[g] = membros.sum(axis=0)
+            centroides = normalizar_linhas(centroides)
+        grupos = np.argmax(matriz @ centroides.T, axis=1)
+        ordem = np.argsort(grupos, kind="stable")
+        limites = np.searchsorted(grupos[ordem], np.arange(n_listas + 1))
+        self.indice_aproximado = {
+            "centroides": centroides,
+            "listas": [ordem[limites[g]:limites[g + 1]] for g in range(n_listas)],
+            "n_sondagens": min(n_sondagens, n_listas),
+        }
+        return self
+
+    def _melhores_aproximado(self, consulta, k):
+        indice = self.indice_aproximado
+        proximos = np.argpartition(-(indice["centroides"] @ consulta), indice["n_sondagens"] - 1)
+        candidatos = np.concatenate([indice["listas"][g] for g in proximos[:indice["n_sondagens"]]])
+        pontuacoes = self._produto(consulta[None], candidatos)[0]
+        cenarios = np.searchsorted(self.offsets, candidatos, side="right") - 1
+        # Melhor pontuação de cada cenário entre os candidatos
+        por_cenario = np.full(len(self.nomes), -np.inf, dtype=np.float32)
+        np.maximum.at(por_cenario, cenarios, pontuacoes)
+        k = min(k, int(np.isfinite(por_cenario).sum()))
+        return self._top_k(por_cenario, k) if k else []
@@ -0,0 +1,221 @@
+"""
+Pacote de inferência do modelo de sentimento (CountVectorizer + MultinomialNB), sem o sklearn.
+
+Formato (uma pasta, versionado por BUNDLE_FORMAT_VERSION):
+
+    manifest.json           versão do formato, config do pré-processador e do vetorizador, classes
+    vocabulary.json         termos na ordem das colunas do vetorizador
+    feature_log_prob.npy    log P(termo | classe), transposto: (n_termos, n_classes)
+    class_log_prior.npy     log P(classe): (n_classes,)
+    classes.npy             rótulos das classes
+
+As matrizes são abertas com mmap_mode='r': carregar é quase instantâneo e vários processos
+compartilham as mesmas páginas. A predição reproduz CountVectorizer.transform + MultinomialNB.predict
+só com numpy:
+
+    predictor = SentimentPredictor.load("models/sentimento-v1")
+    predictor.predict(["Produto excelente, chegou antes do prazo!"])
+"""
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+BUNDLE_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+VOCABULARY_FILE = "vocabulary.json"
+FEATURE_LOG_PROB_FILE = "feature_log_prob.npy"
+CLASS_LOG_PRIOR_FILE = "class_log_prior.npy"
+CLASSES_FILE = "classes.npy"
+
+# Pré-processador usado em load_df_processed quando nenhum é informado
+DEFAULT_PREPROCESSOR_CONFIG = {"min_token_length": 3, "use_stemming": True}
+
+
+def _vectorizer_config(vectorizer):
+    """Parâmetros do CountVectorizer que afetam a tokenização; recusa os que não são reproduzidos aqui."""
+    params = vectorizer.get_params()
+    unsupported = {
+        "analyzer": params["analyzer"] != "word",
+        "tokenizer": params["tokenizer"] is not None,
+        "preprocessor": params["preprocessor"] is not None,
+        "strip_accents": params["strip_accents"] is not None,
+        "stop_words": params["stop_words"] is not None and not isinstance(params["stop_words"], (list, tuple, set, frozenset)),
+    }
+    problems = [name for name, bad in unsupported.items() if bad]
+    if problems:
+        raise ValueError(f"Parâmetros do vetorizador não suportados no pacote: {', '.join(problems)}")
+    return {
+        "type": type(vectorizer).__name__,
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "stop_words": sorted(params["stop_words"]) if params["stop_words"] is not None else None,
+        "binary": params["binary"],
+    }
+
+
+def save_bundle(path, model, vectorizer, preprocessor_config):
+    """
+    Salva um MultinomialNB treinado e seu CountVectorizer no formato do pacote.
+
+    Args:
+        path (str): Pasta de destino (criada se não existir)
+        model: MultinomialNB treinado
+        vectorizer: CountVectorizer ajustado (vocabulary_ definido)
+        preprocessor_config (dict): PortuguesePreprocessor.config() do pré-processador que gerou
+            os textos de treino; é com ele que SentimentPredictor pré-processa as avaliações novas
+
+    Returns:
+        str: path
+    """
+    from pre_processing.pre_processor import PREPROCESSING_VERSION
+
+    vectorizer_config = _vectorizer_config(vectorizer)
+    vocabulary = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        vocabulary[index] = term
+
+    preprocessor_config = dict(preprocessor_config)
+    # O tamanho do cache de radicais não muda o resultado
+    preprocessor_config.pop("stem_cache_size", None)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, FEATURE_LOG_PROB_FILE), np.ascontiguousarray(model.feature_log_prob_.T))
+    np.save(os.path.join(path, CLASS_LOG_PRIOR_FILE), model.class_log_prior_)
+    np.save(os.path.join(path, CLASSES_FILE), model.classes_)
+    with open(os.path.join(path, VOCABULARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "preprocessing": {"version": PREPROCESSING_VERSION, "config": preprocessor_config},
+        "vectorizer": vectorizer_config,
+        "model": {"type": type(model).__name__, "n_classes": len(model.classes_), "n_features": len(vocabulary)},
+    }
+    # Manifesto por último: uma pasta sem manifesto é um salvamento incompleto
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
+
+
+class SentimentPredictor:
+    """Classifica avaliações com um pacote salvo por save_bundle, usando só numpy (e o pré-processador)."""
+
+    def __init__(self, manifest, vocabulary, feature_log_prob, class_log_prior, classes):
+        self.manifest = manifest
+        self.vocabulary = vocabulary
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes = classes
+        vectorizer = manifest["vectorizer"]
+        self.lowercase = vectorizer["lowercase"]
+        self.token_pattern = re.compile(vectorizer["token_pattern"])
+        self.ngram_range = tuple(vectorizer["ngram_range"])
+        self.stop_words = frozenset(vectorizer["stop_words"] or ())
+        self.binary = vectorizer["binary"]
+        self._preprocessor = None
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Abre um pacote salvo por save_bundle.
+
+        Args:
+            path (str): Pasta do pacote
+            mmap (bool): Abre as matrizes com memory-map (False = carrega na RAM)
+
+        Raises:
+            FileNotFoundError: Se a pasta não tiver manifest.json
+            ValueError: Se o pacote for de uma versão de formato mais nova
+        """
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Pacote de modelo não encontrado (ou incompleto) em {path}")
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["format_version"] > BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Pacote na versão {manifest['format_version']} do formato; "
+                f"este código lê até a {BUNDLE_FORMAT_VERSION}"
+            )
+        with open(os.path.join(path, VOCABULARY_FILE), encoding="utf-8") as f:
+            vocabulary = {term: index for index, term in enumerate(json.load(f))}
+        mmap_mode = "r" if mmap else None
+        feature_log_prob = np.load(os.path.join(path, FEATURE_LOG_PROB_FILE), mmap_mode=mmap_mode)
+        class_log_prior = np.load(os.path.join(path, CLASS_LOG_PRIOR_FILE))
+        classes = np.load(os.path.join(path, CLASSES_FILE), allow_pickle=False)
+        if feature_log_prob.shape != (len(vocabulary), len(classes)):
+            raise ValueError(f"Pacote inconsistente: feature_log_prob {feature_log_prob.shape}, "
+                             f"{len(vocabulary)} termos e {len(classes)} classes")
+        return cls(manifest, vocabulary, feature_log_prob, class_log_prior, classes)
+
+    @property
+    def preprocessor(self):
+        """PortuguesePreprocessor com a mesma configuração do treino (criado no primeiro uso)."""
+        if self._preprocessor is None:
+            from pre_processing.pre_processor import PREPROCESSING_VERSION, PortuguesePreprocessor
+
+            preprocessing = self.manifest["preprocessing"]
+            if preprocessing["version"] != PREPROCESSING_VERSION:
+                print(f"Aviso: pacote treinado com o pré-processamento v{preprocessing['version']}; "
+                      f"o atual é v{PREPROCESSING_VERSION}")
+            self._preprocessor = PortuguesePreprocessor(**preprocessing["config"])
+        return self._preprocessor
+
+    def _analyze(self, text):
+        # Mesmos termos que CountVectorizer(analyzer="word").build_analyzer() geraria
+        if self.lowercase:
+            text = text.lower()
+        tokens = [token for token in self.token_pattern.findall(text) if token not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = tokens if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def _joint_log_likelihood(self, processed_texts):
+        # Índices dos termos de todos os documentos concatenados (formato CSR sem o scipy)
+        get_index = self.vocabulary.get
+        indices = []
+        indptr = [0]
+        for text in processed_texts:
+            found = [index for term in self._analyze(text) if (index := get_index(term)) is not None]
+            if self.binary:
+                found = list(dict.fromkeys(found))
+            indices.extend(found)
+            indptr.append(len(indices))
+        indptr = np.asarray(indptr)
+
+        scores = np.zeros((len(indptr) - 1, len(self.classes)), dtype=self.feature_log_prob.dtype)
+        non_empty = np.diff(indptr) > 0
+        if indices:
+            # Soma de log P(termo | classe) por documento; termos repetidos contam uma vez por ocorrência
+            per_term = self.feature_log_prob[np.asarray(indices)]
+            scores[non_empty] = np.add.reduceat(per_term, indptr[:-1][non_empty], axis=0)
+        return scores + self.class_log_prior
+
+    def predict_processed(self, processed_texts):
+        """Classifica textos já pré-processados (como a coluna processed_text)."""
+        return self.classes[np.argmax(self._joint_log_likelihood(processed_texts), axis=1)]
+
+    def predict(self, texts, n_jobs=1):
+        """
+        Classifica avaliações brutas.
+
+        Args:
+            texts (list): Textos das avaliações
+            n_jobs (int): Processos do pré-processamento (ver process_texts)
+
+        Returns:
+            np.ndarray: Classe prevista para cada texto
+        """
+        from pre_processing.pre_processor import process_texts
+
+        return self.predict_processed(process_texts(list(texts), n_jobs=n_jobs, preprocessor=self.preprocessor))
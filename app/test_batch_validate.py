@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from batch_validate import BatchValidator, Checkpoint, abrir_saida
+from chatbot.mock_llm_server import MockLLMServer
+from chatbot.validate_chatbot import ChatbotIAValidator
+
+CONVERSA = """[15:26, 06/02/2025] {nome}: gostaria de listar meus exames
+[15:27, 06/02/2025] Futurotec Homologação: {nome}, você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025.
+[15:27, 06/02/2025] Futurotec Homologação: O laudo do exame está previsto para 03/02/2025.
+[15:28, 06/02/2025] Futurotec Homologação: Posso ajudar em algo mais?"""
+
+
+class FalhaEm:
+    """Validador que falha nos arquivos indicados e delega o resto."""
+    def __init__(self, validador, nomes):
+        self.validador = validador
+        self.nomes = nomes
+
+    def validar_exportacao(self, origem):
+        primeira_linha = origem.readline().decode("utf-8")
+        origem.seek(0)
+        if any(nome in primeira_linha for nome in self.nomes):
+            raise RuntimeError("queda simulada")
+        return self.validador.validar_exportacao(origem)
+
+
+class TestBatchValidator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.tmpdir.name, "conversas")
+        os.makedirs(os.path.join(self.entrada, "janeiro"))
+        for caminho, nome in [("a.txt", "Ana"), ("b.txt", "Bruno"), ("janeiro/c.txt", "Carla")]:
+            with open(os.path.join(self.entrada, caminho), "w", encoding="utf-8") as f:
+                f.write(CONVERSA.format(nome=nome))
+        self.servidor = MockLLMServer().iniciar()
+        self.validador = ChatbotIAValidator(api_key="teste", endpoint=self.servidor.url)
+
+    def tearDown(self):
+        self.validador.fechar()
+        self.servidor.parar()
+        self.tmpdir.cleanup()
+
+    def executar(self, saida, validador=None, **kwargs):
+        lote = BatchValidator(validador or self.validador, trabalhadores=2, saida_progresso=io.StringIO())
+        return lote.validar_diretorio(self.entrada, saida, **kwargs)
+
+    def modificar(self, caminho):
+        with open(os.path.join(self.entrada, caminho), "a", encoding="utf-8") as f:
+            f.write("\n[15:29, 06/02/2025] Futurotec Homologação: Até logo!")
+
+    def test_resume_skips_finished_files(self):
+        """Testa se uma execução interrompida continua sem chamar a IA de novo nem duplicar linhas."""
+        saida = os.path.join(self.tmpdir.name, "resultados.jsonl")
+        resumo = self.executar(saida, FalhaEm(self.validador, ["Bruno"]))
+        self.assertEqual((resumo["concluidos"], resumo["falhas"], resumo["mensagens"]), (2, 1, 6))
+        self.assertEqual(self.servidor.requisicoes, 4)  # 2 mensagens sobre exame por arquivo
+        # Linha gravada depois do último checkpoint (queda no meio da escrita)
+        with open(saida, "a", encoding="utf-8") as f:
+            f.write('{"arquivo": "parcial"')
+
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"], resumo["falhas"]), (2, 1, 0))
+        self.assertEqual(self.servidor.requisicoes, 6)
+
+        with open(saida, encoding="utf-8") as f:
+            linhas = [json.loads(linha) for linha in f]
+        self.assertEqual(sorted({linha["arquivo"] for linha in linhas}),
+                         ["a.txt", "b.txt", os.path.join("janeiro", "c.txt")])
+        self.assertEqual(len(linhas), 9)
+        self.assertEqual(linhas[0]["hora"], "15:27")
+
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"]), (3, 0))
+        self.assertEqual(self.servidor.requisicoes, 6)
+
+    def test_api_errors_are_failures(self):
+        """Testa se um arquivo com erro na API fica fora da saída e do checkpoint."""
+        saida = os.path.join(self.tmpdir.name, "resultados.jsonl")
+        self.servidor.falhas = [(401, {})]
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["concluidos"], resumo["falhas"], resumo["mensagens"]), (2, 1, 6))
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"], resumo["falhas"]), (2, 1, 0))
+        with open(saida, encoding="utf-8") as f:
+            linhas = [json.loads(linha) for linha in f]
+        self.assertEqual(len(linhas), 9)
+        self.assertFalse(any("Erro na consulta" in linha["observacoes"] for linha in linhas))
+
+    def test_modified_file_replaces_old_rows(self):
+        saida = os.path.join(self.tmpdir.name, "resultados.jsonl")
+        self.executar(saida)
+        self.modificar("a.txt")
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"]), (2, 1))
+        with open(saida, encoding="utf-8") as f:
+            arquivos = [json.loads(linha)["arquivo"] for linha in f]
+        self.assertEqual(arquivos.count("a.txt"), 4)
+        self.assertEqual(len(arquivos), 10)
+        # Mais uma execução não muda nada
+        self.assertEqual(self.executar(saida)["pulados"], 3)
+
+    def test_deleted_output_is_rebuilt(self):
+        """Testa se a saída apagada com o checkpoint mantido é refeita, sem encher o arquivo de NULs."""
+        saida = os.path.join(self.tmpdir.name, "resultados.jsonl")
+        self.executar(saida)
+        os.remove(saida)
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"]), (0, 3))
+        with open(saida, "rb") as f:
+            conteudo = f.read()
+        self.assertNotIn(b"\0", conteudo)
+        self.assertEqual(len(conteudo.splitlines()), 9)
+
+    def test_parquet_output(self):
+        saida = os.path.join(self.tmpdir.name, "resultados.parquet")
+        self.executar(saida)
+        df = pd.read_parquet(saida)
+        self.assertEqual(len(df), 9)
+        self.assertTrue(df["relevante"].iloc[:2].all())
+        self.assertTrue(json.loads(df["validacao_ia"].iloc[0])["informacoes_corretas"])
+        # Arquivo modificado é validado de novo
+        self.modificar("a.txt")
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"]), (2, 1))
+        self.assertEqual(len(os.listdir(saida)), 2)
+
+    def test_parquet_crash_keeps_finished_files(self):
+        """Testa se uma queda sem fechar() (SIGKILL, falta de memória) só repete os arquivos da parte aberta."""
+        saida = os.path.join(self.tmpdir.name, "resultados.parquet")
+        lote = BatchValidator(self.validador, saida_progresso=io.StringIO())
+        checkpoint = Checkpoint(f"{saida}.checkpoint")
+        escritor = abrir_saida(saida, checkpoint, linhas_por_parte=1000, segundos_por_parte=0)
+        for arquivo in ["a.txt", "b.txt"]:
+            caminho = os.path.join(self.entrada, arquivo)
+            entrada = {"arquivo": arquivo, "assinatura": [os.path.getsize(caminho), os.stat(caminho).st_mtime_ns]}
+            for confirmada in escritor.escrever(entrada, lote.validar_arquivo(caminho, arquivo)):
+                checkpoint.registrar(confirmada)
+        # Queda: nem escritor.fechar() nem o finally de validar_diretorio rodam
+        checkpoint.fechar()
+        self.assertEqual(self.servidor.requisicoes, 4)
+
+        resumo = self.executar(saida)
+        self.assertEqual((resumo["pulados"], resumo["concluidos"]), (2, 1))
+        self.assertEqual(self.servidor.requisicoes, 6)
+        self.assertEqual(len(pd.read_parquet(saida)), 9)
+
+    def test_parquet_part_names_are_not_reused(self):
+        """Testa se uma parte nova não sobrescreve outra depois que uma parte antiga sai do checkpoint."""
+        saida = os.path.join(self.tmpdir.name, "resultados.parquet")
+        self.executar(saida, linhas_por_parte=3)
+        for arquivo in ["a.txt", "b.txt"]:
+            self.modificar(arquivo)
+            self.executar(saida, linhas_por_parte=3)
+        df = pd.read_parquet(saida)
+        self.assertEqual(df.groupby("arquivo").size().to_dict(),
+                         {"a.txt": 4, "b.txt": 4, os.path.join("janeiro", "c.txt"): 3})
+        # Parte apagada: os arquivos dela são validados de novo
+        os.remove(os.path.join(saida, sorted(os.listdir(saida))[0]))
+        resumo = self.executar(saida, linhas_por_parte=3)
+        self.assertEqual(resumo["concluidos"], 1)
+        self.assertEqual(len(pd.read_parquet(saida)), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
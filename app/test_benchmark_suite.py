@@ -0,0 +1,113 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.suite import REPETICOES_MINIMAS_P99, ambiente, carregar_baseline, comparar
+
+
+def metricas(vazao=100.0, repeticoes=50, p50_ms=10.0, p99_ms=20.0, pico_rss_mb=100.0):
+    return {"itens": repeticoes, "repeticoes": repeticoes, "vazao": vazao, "p50_ms": p50_ms,
+            "p95_ms": p99_ms, "p99_ms": p99_ms, "pico_rss_mb": pico_rss_mb}
+
+
+class TestComparar(unittest.TestCase):
+    def comparar_caso(self, atual, base=None):
+        return comparar({"caso": atual}, {"casos": {"caso": base or metricas()}})
+
+    def test_within_limits(self):
+        self.assertEqual(self.comparar_caso(metricas(vazao=80, p99_ms=24, pico_rss_mb=115)), [])
+
+    def test_throughput_drop(self):
+        regressoes = self.comparar_caso(metricas(vazao=70))
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn("vazão", regressoes[0])
+
+    def test_p99_with_many_repetitions(self):
+        """Com muitas repetições a latência comparada é o p99; a mediana pode subir sozinha."""
+        self.assertEqual(self.comparar_caso(metricas(p50_ms=20)), [])
+        regressoes = self.comparar_caso(metricas(p99_ms=30))
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn("p99", regressoes[0])
+
+    def test_p50_with_few_repetitions(self):
+        """Nos casos em lote (poucas repetições, no atual ou no baseline) o p99 é ignorado e vale a mediana."""
+        poucas = REPETICOES_MINIMAS_P99 - 1
+        self.assertEqual(self.comparar_caso(metricas(repeticoes=poucas, p99_ms=30)), [])
+        self.assertEqual(self.comparar_caso(metricas(p99_ms=30), base=metricas(repeticoes=poucas)), [])
+        regressoes = self.comparar_caso(metricas(repeticoes=poucas, p50_ms=13))
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn("p50", regressoes[0])
+
+    def test_rss_rise(self):
+        regressoes = self.comparar_caso(metricas(pico_rss_mb=130))
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn("RSS", regressoes[0])
+        # Sem medida de RSS (ex: plataforma sem resource) não há comparação de memória
+        self.assertEqual(self.comparar_caso(metricas(pico_rss_mb=None)), [])
+
+    def test_unavailable_case(self):
+        """Caso indisponível só é regressão se o baseline tem números para ele."""
+        indisponivel = {"indisponivel": "LookupError: Resource stopwords not found."}
+        regressoes = self.comparar_caso(indisponivel)
+        self.assertEqual(len(regressoes), 1)
+        self.assertIn("stopwords", regressoes[0])
+        self.assertEqual(self.comparar_caso(indisponivel, base={"indisponivel": "ImportError"}), [])
+        self.assertEqual(comparar({"caso": indisponivel}, {"casos": {}}), [])
+
+
+class TestCarregarBaseline(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "baseline.json")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def carregar(self, escala=1.0):
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            baseline = carregar_baseline(self.caminho, escala)
+        return baseline, saida.getvalue()
+
+    def gravar(self, escala=1.0, **amb):
+        with open(self.caminho, "w", encoding="utf-8") as f:
+            json.dump({"ambiente": {**ambiente(), **amb}, "escala": escala, "casos": {"caso": metricas()}}, f)
+
+    def test_same_environment_and_scale(self):
+        self.gravar()
+        baseline, saida = self.carregar()
+        self.assertEqual(baseline["casos"]["caso"], metricas())
+        self.assertEqual(saida, "")
+
+    def test_missing_file(self):
+        baseline, saida = self.carregar()
+        self.assertIsNone(baseline)
+        self.assertIn("Aviso: sem baseline", saida)
+
+    def test_scale_mismatch(self):
+        self.gravar(escala=0.5)
+        baseline, saida = self.carregar(escala=1.0)
+        self.assertIsNone(baseline)
+        self.assertIn("escala 0.5", saida)
+
+    def test_environment_mismatch(self):
+        for diferenca in ({"nucleos": (os.cpu_count() or 1) + 1}, {"processador": "outra-arquitetura"},
+                          {"python": "2.7.18"}):
+            with self.subTest(**diferenca):
+                self.gravar(**diferenca)
+                baseline, saida = self.carregar()
+                self.assertIsNone(baseline)
+                self.assertIn("outro ambiente", saida)
+
+    def test_patch_version_is_same_environment(self):
+        python = ambiente()["python"].split(".")
+        self.gravar(python=".".join(python[:2] + ["999"]))
+        baseline, _ = self.carregar()
+        self.assertIsNotNone(baseline)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+class FakeEncoder:
+    """Codificador determinístico que registra quantos textos recebeu."""
+    def __init__(self):
+        self.textos_codificados = []
+
+    def __call__(self, textos):
+        self.textos_codificados.extend(textos)
+        return np.array([[len(t), t.count('a'), 1.0] for t in textos], dtype=np.float32)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_memory_tier_skips_model(self):
+        """Testa se textos repetidos (inclusive no mesmo lote) não passam de novo pelo modelo."""
+        cache = EmbeddingCache('modelo-teste')
+        encoder = FakeEncoder()
+        primeiro = cache.obter_lote(['exame marcado', 'laudo pronto', 'exame marcado'], encoder)
+        segundo = cache.obter_lote(['laudo  pronto'], encoder)  # espaços extras são normalizados
+        self.assertEqual(encoder.textos_codificados, ['exame marcado', 'laudo pronto'])
+        np.testing.assert_array_equal(primeiro[0], primeiro[2])
+        np.testing.assert_array_equal(segundo[0], primeiro[1])
+        self.assertEqual(cache.estatisticas()['faltas'], 2)
+        self.assertAlmostEqual(cache.taxa_acerto, 0.5)
+
+    def test_disk_tier_survives_new_instance(self):
+        """Testa se o nível em SQLite é reaproveitado por outra instância com o mesmo modelo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = os.path.join(tmp, 'embeddings.sqlite')
+            cache = EmbeddingCache('modelo-teste', caminho=caminho)
+            esperado = cache.obter_lote(['ultrassom em 31/01'], FakeEncoder())
+            cache.fechar()
+
+            encoder = FakeEncoder()
+            reaberto = EmbeddingCache('modelo-teste', caminho=caminho)
+            np.testing.assert_array_equal(reaberto.obter_lote(['ultrassom em 31/01'], encoder), esperado)
+            self.assertEqual(encoder.textos_codificados, [])
+            self.assertEqual(reaberto.estatisticas()['acertos_disco'], 1)
+
+            # Outro modelo gera outra chave
+            outro = EmbeddingCache('outro-modelo', caminho=caminho)
+            outro.obter_lote(['ultrassom em 31/01'], encoder)
+            self.assertEqual(encoder.textos_codificados, ['ultrassom em 31/01'])
+            reaberto.fechar()
+            outro.fechar()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+import zlib
+from unittest import mock
+
+import numpy as np
+
+import embedding_validator
+from embedding_validator import CENARIO_PADRAO, EmbeddingValidator
+from reference_registry import ReferenceRegistry
+
+RESPOSTAS = [
+    "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025. O laudo está previsto para 03/02/2025.",
+    "Olá! Encontrei seu exame de imagem para o próximo mês.",
+    "Bom dia! Seu ultrassom foi agendado e será processado em breve.",
+    "Posso ajudar em algo mais?",
+]
+
+
+class FakeModelo:
+    """Mesma interface de SentenceTransformer.encode: saco de palavras com hash estável, normalizado."""
+    def __init__(self, dimensao=64):
+        self.dimensao = dimensao
+        self.textos_codificados = []
+
+    def encode(self, textos, batch_size=32, normalize_embeddings=False):
+        self.textos_codificados.extend(textos)
+        vetores = np.zeros((len(textos), self.dimensao), dtype=np.float32)
+        for i, texto in enumerate(textos):
+            for palavra in texto.lower().split():
+                vetores[i, zlib.crc32(palavra.encode("utf-8")) % self.dimensao] += 1
+        if normalize_embeddings:
+            normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+            vetores /= np.where(normas == 0, 1, normas)
+        return vetores
+
+CENARIO_CANCELAMENTO = {
+    "nome": "cancelamento",
+    "respostas_referencia": [
+        "sua consulta de cardiologia foi cancelada com sucesso",
+        "o cancelamento da consulta de cardiologia foi confirmado",
+    ],
+    "informacoes_esperadas": {"especialidade": "cardiologia"},
+}
+
+
+def criar_validador(**kwargs):
+    validador = EmbeddingValidator(**kwargs)
+    validador._modelo = FakeModelo()
+    return validador
+
+
+def resultado_original(modelo, resposta):
+    """Cálculo do EmbeddingValidator original (uma resposta por vez, sem cache), como referência."""
+    referencias = [resposta.lower() for resposta in CENARIO_PADRAO["respostas_referencia"]]
+    embedding = modelo.encode([resposta])[0]
+    embeddings_referencia = modelo.encode(referencias)
+    similaridades = embeddings_referencia @ embedding / (
+        np.linalg.norm(embeddings_referencia, axis=1) * np.linalg.norm(embedding)
+    )
+    return {
+        "nota": round(max(similaridades) * 5, 2),
+        "similaridades": list(similaridades),
+        "resposta_mais_similar": referencias[np.argmax(similaridades)],
+        "detalhes_validacao": {
+            "tipo_exame_encontrado": "ULTRASSONOGRAFIA" in resposta,
+            "data_realizacao_encontrada": "31/01/2025" in resposta,
+            "data_laudo_encontrada": "03/02/2025" in resposta,
+        },
+    }
+
+
+# Sem os dados do NLTK o pré-processamento real não roda; as referências só passam a minúsculas
+@mock.patch.object(embedding_validator, "pre_process_portuguese", str.lower)
+class TestEmbeddingValidator(unittest.TestCase):
+    def test_batch_matches_single_and_original(self):
+        """Testa se o lote dá o mesmo resultado, na mesma ordem, que uma resposta por vez e que o cálculo original."""
+        validador = criar_validador()
+        lote = validador.calcular_similaridade_lote(RESPOSTAS, batch_size=3)
+        individuais = [validador.calcular_similaridade(resposta) for resposta in RESPOSTAS]
+        self.assertEqual(len(lote), len(RESPOSTAS))
+        for resultado, individual, resposta in zip(lote, individuais, RESPOSTAS):
+            original = resultado_original(FakeModelo(), resposta)
+            for esperado in (individual, original):
+                self.assertEqual(set(resultado), set(esperado))
+                self.assertAlmostEqual(resultado["nota"], esperado["nota"], places=4)
+                np.testing.assert_allclose(resultado["similaridades"], esperado["similaridades"], atol=1e-5)
+                self.assertEqual(resultado["resposta_mais_similar"], esperado["resposta_mais_similar"])
+                self.assertEqual(resultado["detalhes_validacao"], esperado["detalhes_validacao"])
+        # Ordem de entrada: a resposta completa é a mais parecida com as referências
+        notas = [resultado["nota"] for resultado in lote]
+        self.assertEqual(np.argmax(notas), 0)
+        invertido = validador.calcular_similaridade_lote(RESPOSTAS[::-1])
+        self.assertEqual([resultado["nota"] for resultado in invertido], notas[::-1])
+
+    def test_empty_input(self):
+        validador = criar_validador()
+        self.assertEqual(validador.calcular_similaridade_lote([]), [])
+        self.assertEqual(validador.identificar_cenarios([]), [])
+        self.assertEqual(validador._modelo.textos_codificados, [])
+
+    def test_cache_hit_skips_encode(self):
+        """Testa se respostas repetidas não voltam ao modelo."""
+        validador = criar_validador()
+        primeiro = validador.calcular_similaridade_lote(RESPOSTAS)
+        codificados = len(validador._modelo.textos_codificados)
+        segundo = validador.calcular_similaridade_lote(RESPOSTAS)
+        self.assertEqual(len(validador._modelo.textos_codificados), codificados)
+        self.assertEqual([r["nota"] for r in segundo], [r["nota"] for r in primeiro])
+
+    def test_sqlite_cache_across_instances(self):
+        """Testa se uma nova instância com o mesmo arquivo de cache não codifica nada de novo."""
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "cache.sqlite")
+            primeiro_validador = criar_validador(cache=caminho)
+            primeiro = primeiro_validador.calcular_similaridade_lote(RESPOSTAS)
+            self.assertTrue(primeiro_validador._modelo.textos_codificados)
+            primeiro_validador.cache.fechar()
+
+            segundo_validador = criar_validador(cache=caminho)
+            segundo = segundo_validador.calcular_similaridade_lote(RESPOSTAS)
+            segundo_validador.cache.fechar()
+            self.assertEqual(segundo_validador._modelo.textos_codificados, [])
+            self.assertEqual([r["nota"] for r in segundo], [r["nota"] for r in primeiro])
+
+    def test_identify_scenarios(self):
+        """Testa se cada resposta é associada ao cenário com a referência mais parecida."""
+        validador = criar_validador(registro=ReferenceRegistry([CENARIO_PADRAO, CENARIO_CANCELAMENTO]))
+        cenarios = validador.identificar_cenarios(
+            [RESPOSTAS[0], "Sua consulta de cardiologia foi cancelada."], k=2
+        )
+        self.assertEqual([melhores[0][0] for melhores in cenarios], [CENARIO_PADRAO["nome"], "cancelamento"])
+        for melhores in cenarios:
+            self.assertEqual(len(melhores), 2)
+            self.assertGreaterEqual(melhores[0][1], melhores[1][1])
+
+    def test_scenario_routing(self):
+        """Testa se cenario= escolhe as referências e os campos esperados daquele cenário."""
+        validador = criar_validador(registro=ReferenceRegistry([CENARIO_PADRAO, CENARIO_CANCELAMENTO]))
+        self.assertEqual(validador.cenario, CENARIO_PADRAO["nome"])
+        resposta = "Sua consulta de cardiologia foi cancelada."
+
+        padrao = validador.calcular_similaridade(resposta)
+        self.assertEqual(len(padrao["similaridades"]), 3)
+        self.assertEqual(set(padrao["detalhes_validacao"]), {
+            "tipo_exame_encontrado", "data_realizacao_encontrada", "data_laudo_encontrada",
+        })
+
+        cancelamento = validador.calcular_similaridade(resposta, cenario="cancelamento")
+        self.assertEqual(len(cancelamento["similaridades"]), 2)
+        self.assertIn(cancelamento["resposta_mais_similar"], CENARIO_CANCELAMENTO["respostas_referencia"])
+        self.assertEqual(cancelamento["detalhes_validacao"], {"especialidade_encontrado": True})
+        self.assertGreater(cancelamento["nota"], padrao["nota"])
+
+        lote = validador.calcular_similaridade_lote([resposta, RESPOSTAS[0]], cenario="cancelamento")
+        self.assertEqual(lote[0]["resposta_mais_similar"], cancelamento["resposta_mais_similar"])
+        np.testing.assert_allclose(lote[0]["similaridades"], cancelamento["similaridades"], atol=1e-6)
+
+    def test_reduced_precision_close_to_float32(self):
+        """Testa se float16 e int8 mantêm as notas e a referência mais similar do float32."""
+        referencia = criar_validador().calcular_similaridade_lote(RESPOSTAS)
+        for precisao, tolerancia in (("float16", 1e-3), ("int8", 2e-2)):
+            with self.subTest(precisao=precisao):
+                validador = criar_validador(precisao=precisao)
+                resultados = validador.calcular_similaridade_lote(RESPOSTAS)
+                self.assertEqual(validador.registro.dados.dtype, np.dtype(precisao))
+                for resultado, esperado in zip(resultados, referencia):
+                    np.testing.assert_allclose(
+                        resultado["similaridades"], esperado["similaridades"], atol=tolerancia
+                    )
+                    self.assertAlmostEqual(resultado["nota"], esperado["nota"], delta=5 * tolerancia + 0.01)
+                    self.assertEqual(resultado["resposta_mais_similar"], esperado["resposta_mais_similar"])
+
+    def test_constructor_does_not_import_model(self):
+        """Testa se o construtor não importa sentence_transformers (nem carrega o modelo)."""
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop("sentence_transformers", None)
+            validador = EmbeddingValidator()
+            self.assertNotIn("sentence_transformers", sys.modules)
+        self.assertIsNone(validador._modelo)
+        self.assertIsNone(validador.referencias_processadas)
+
+    def test_warmup_loads_model(self):
+        """Testa se warmup() importa e carrega o modelo e já prepara as referências."""
+        carregados = []
+
+        def carregar(nome):
+            carregados.append(nome)
+            return FakeModelo()
+
+        modulo = types.ModuleType("sentence_transformers")
+        modulo.SentenceTransformer = carregar
+        with mock.patch.dict(sys.modules, {"sentence_transformers": modulo}):
+            validador = EmbeddingValidator(modelo="modelo-teste")
+            self.assertEqual(carregados, [])
+            self.assertIs(validador.warmup(), validador)
+        self.assertEqual(carregados, ["modelo-teste"])
+        self.assertIsInstance(validador._modelo, FakeModelo)
+        self.assertIsNotNone(validador.referencias_processadas)
+        self.assertEqual(len(validador._modelo.textos_codificados), len(CENARIO_PADRAO["respostas_referencia"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from reference_registry import ReferenceRegistry, normalizar_linhas
+
+
+def codificar_aleatorio(semente, dimensao=16):
+    rng = np.random.default_rng(semente)
+    return lambda textos: rng.normal(size=(len(textos), dimensao)).astype(np.float32)
+
+
+class TestReferenceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registro = ReferenceRegistry([
+            {"nome": "ultrassom", "respostas_referencia": ["a", "b", "c"],
+             "informacoes_esperadas": {"tipo_exame": "ULTRASSONOGRAFIA"}},
+            {"nome": "raio_x", "respostas_referencia": ["d"]},
+            {"nome": "sangue", "respostas_referencia": ["e", "f"]},
+        ]).construir_embeddings(codificar_aleatorio(0))
+
+    def test_contiguous_normalized_matrix_with_offsets(self):
+        """Testa se todas as referências ficam numa matriz float32 contígua, normalizada e fatiada por cenário."""
+        matriz = self.registro.matriz
+        self.assertEqual(matriz.dtype, np.float32)
+        self.assertTrue(matriz.flags['C_CONTIGUOUS'])
+        np.testing.assert_allclose(np.linalg.norm(matriz, axis=1), 1.0, rtol=1e-5)
+        self.assertEqual(self.registro.offsets.tolist(), [0, 3, 4, 6])
+        self.assertEqual(self.registro.respostas_do_cenario("sangue"), ["e", "f"])
+
+    def test_dequantized_matrix_is_cached(self):
+        registro = ReferenceRegistry([{"nome": "ultrassom", "respostas_referencia": ["a", "b"]},
+                                      {"nome": "sangue", "respostas_referencia": ["c"]}])
+        registro.construir_embeddings(codificar_aleatorio(0), precisao="int8")
+        np.testing.assert_allclose(registro.referencias("sangue"), registro.matriz[2:])
+        self.assertIs(registro.matriz, registro.matriz)
+        anterior = registro.matriz
+        registro.construir_embeddings(codificar_aleatorio(1), precisao="int8")
+        self.assertIsNot(registro.matriz, anterior)
+
+    def test_best_scenarios_match_brute_force(self):
+        """Testa se o top-k vetorizado coincide com o cálculo cenário a cenário."""
+        consultas = normalizar_linhas(codificar_aleatorio(1)(range(20)))
+        resultado = self.registro.melhores_cenarios(consultas, k=2, tamanho_bloco=7)
+        for consulta, melhores in zip(consultas, resultado):
+            esperado = sorted(
+                ((nome, float(np.max(self.registro.similaridades(consulta[None], nome))))
+                 for nome in self.registro.nomes),
+                key=lambda item: -item[1]
+            )[:2]
+            self.assertEqual([nome for nome, _ in melhores], [nome for nome, _ in esperado])
+            np.testing.assert_allclose([p for _, p in melhores], [p for _, p in esperado], rtol=1e-5)
+
+    def test_approximate_index_probing_all_lists_is_exact(self):
+        """Testa se o índice aproximado, sondando todos os grupos, dá o mesmo resultado exato."""
+        registro = ReferenceRegistry([
+            {"nome": f"cenario_{i}", "respostas_referencia": [f"r{i}_{j}" for j in range(20)]}
+            for i in range(50)
+        ]).construir_embeddings(codificar_aleatorio(2))
+        registro.construir_indice_aproximado(n_listas=16, n_sondagens=16)
+        consultas = normalizar_linhas(codificar_aleatorio(3)(range(10)))
+        exato = registro.melhores_cenarios(consultas, k=3)
+        aproximado = registro.melhores_cenarios(consultas, k=3, aproximado=True)
+        self.assertEqual([[n for n, _ in r] for r in aproximado], [[n for n, _ in r] for r in exato])
+
+    def test_reduced_precision_scores_stay_close(self):
+        """Testa se float16/int8 economizam memória e mantêm as similaridades próximas do float32."""
+        cenarios = [{"nome": f"c{i}", "respostas_referencia": ["x"] * 10} for i in range(20)]
+        consultas = normalizar_linhas(codificar_aleatorio(4, dimensao=384)(range(30)))
+        exato = ReferenceRegistry(cenarios).construir_embeddings(codificar_aleatorio(5, dimensao=384))
+        for precisao, tolerancia in (("float16", 1e-3), ("int8", 2e-2)):
+            reduzido = ReferenceRegistry(cenarios).construir_embeddings(codificar_aleatorio(5, dimensao=384),
+                                                                        precisao=precisao)
+            self.assertLess(reduzido.memoria_bytes(), exato.memoria_bytes())
+            np.testing.assert_allclose(reduzido.similaridades(consultas, "c3"), exato.similaridades(consultas, "c3"),
+                                       atol=tolerancia)
+
+    def test_load_from_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = os.path.join(tmp, "cenarios.json")
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump({"cenarios": [{"nome": "x", "respostas_referencia": ["olá"],
+                                         "informacoes_esperadas": {"data_laudo": "03/02/2025"}}]}, f)
+            registro = ReferenceRegistry.carregar(caminho)
+        self.assertEqual(registro.nomes, ["x"])
+        self.assertEqual(registro.informacoes_esperadas["x"], {"data_laudo": "03/02/2025"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from sentiment_predictor import DEFAULT_PREPROCESSOR_CONFIG, MANIFEST_FILE, SentimentPredictor, save_bundle
+from training.training import train_model
+
+TREINO = [
+    ("produt otim cheg rapid", 5), ("excel qualidad recomend", 5), ("adore produt excel", 5),
+    ("produt quebr pessim", 1), ("horrivel entreg atras", 1), ("pessim qualidad nao recomend", 1),
+    ("produt razoavel", 3), ("normal entreg prazo", 3), ("razoavel qualidad preco", 3),
+] * 4
+TESTE = ["produt otim", "entreg atras pessim", "razoavel", "", "palavr desconhec", "otim otim pessim"]
+
+
+class FakePreprocessor:
+    """Só a config() de um PortuguesePreprocessor (sem carregar o NLTK)."""
+    def config(self):
+        return {"min_token_length": 4, "use_stemming": False, "stem_cache_size": 0}
+
+
+class TestSentimentPredictor(unittest.TestCase):
+    def treinar(self, **vectorizer_params):
+        vectorizer = CountVectorizer(**vectorizer_params)
+        model = MultinomialNB().fit(vectorizer.fit_transform([t for t, _ in TREINO]), [s for _, s in TREINO])
+        return model, vectorizer
+
+    def test_matches_sklearn_predictions(self):
+        """Testa se o pacote prevê o mesmo que vectorizer.transform + model.predict (inclusive n-gramas)."""
+        for params in ({}, {"ngram_range": (1, 2)}, {"binary": True, "ngram_range": (2, 2)}):
+            model, vectorizer = self.treinar(**params)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                predictor = SentimentPredictor.load(save_bundle(tmpdir, model, vectorizer, DEFAULT_PREPROCESSOR_CONFIG))
+                esperado = model.predict(vectorizer.transform(TESTE))
+                np.testing.assert_array_equal(predictor.predict_processed(TESTE), esperado, err_msg=str(params))
+                np.testing.assert_allclose(
+                    predictor._joint_log_likelihood(TESTE), model.predict_joint_log_proba(vectorizer.transform(TESTE))
+                )
+                self.assertIsInstance(predictor.feature_log_prob, np.memmap)
+
+    def test_train_model_saves_bundle(self):
+        df = pd.DataFrame(TREINO, columns=["processed_text", "sentiment"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model, vectorizer, _, _ = train_model(df, bundle_path=tmpdir, preprocessor=FakePreprocessor())
+            with open(os.path.join(tmpdir, MANIFEST_FILE), encoding="utf-8") as f:
+                manifest = json.load(f)
+            # A configuração do pré-processador do treino, não a padrão
+            self.assertEqual(manifest["preprocessing"]["config"], {"min_token_length": 4, "use_stemming": False})
+            predictor = SentimentPredictor.load(tmpdir, mmap=False)
+            np.testing.assert_array_equal(predictor.predict_processed(TESTE), model.predict(vectorizer.transform(TESTE)))
+
+    def test_rejects_newer_format_and_unsupported_vectorizer(self):
+        model, vectorizer = self.treinar()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            save_bundle(tmpdir, model, vectorizer, DEFAULT_PREPROCESSOR_CONFIG)
+            caminho = os.path.join(tmpdir, MANIFEST_FILE)
+            with open(caminho, encoding="utf-8") as f:
+                manifest = json.load(f)
+            manifest["format_version"] += 1
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            with self.assertRaises(ValueError):
+                SentimentPredictor.load(tmpdir)
+        with self.assertRaises(FileNotFoundError):
+            SentimentPredictor.load(os.path.join(tempfile.gettempdir(), "pacote-inexistente"))
+        model, vectorizer = self.treinar(analyzer="char")
+        with tempfile.TemporaryDirectory() as tmpdir, self.assertRaises(ValueError):
+            save_bundle(tmpdir, model, vectorizer, DEFAULT_PREPROCESSOR_CONFIG)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from chatbot.validate_chatbot import ChatbotIAValidator
+from validation_service import MicroBatcher, ValidationService
+
+
+class FakeEmbeddingValidator:
+    """Similaridade = 0.9 quando a resposta cita o exame; registra o tamanho de cada lote."""
+    def __init__(self, espera=0.0):
+        self.espera = espera
+        self.lotes = []
+
+    def calcular_similaridade_lote(self, respostas, cenario=None):
+        self.lotes.append(len(respostas))
+        time.sleep(self.espera)
+        return [
+            {"nota": 4.5 if "exame" in r else 1.0, "similaridades": [0.9 if "exame" in r else 0.2], "cenario": cenario}
+            for r in respostas
+        ]
+
+
+CONVERSA = """[14:30, 31/01/2025] Jonas Camargo: Olá, gostaria de saber sobre meu exame
+[14:31, 31/01/2025] Futurotec Homologação: Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025.
+[14:31, 31/01/2025] Futurotec Homologação: Posso ajudar em algo mais?"""
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_items(self):
+        lotes = []
+
+        def processar(itens):
+            lotes.append(len(itens))
+            return [item * 2 for item in itens]
+
+        batcher = MicroBatcher(processar, tamanho_maximo_lote=8, janela=0.05)
+        try:
+            futuros = [batcher.enviar(i) for i in range(20)]
+            self.assertEqual([f.result(timeout=2) for f in futuros], [i * 2 for i in range(20)])
+        finally:
+            batcher.parar()
+        self.assertLessEqual(max(lotes), 8)
+        self.assertLess(len(lotes), 20)
+        self.assertEqual(batcher.estatisticas()["itens"], 20)
+
+    def test_full_queue_raises_and_errors_propagate(self):
+        liberar = threading.Event()
+
+        def processar(itens):
+            liberar.wait()
+            raise ValueError("falhou")
+
+        batcher = MicroBatcher(processar, tamanho_maximo_lote=1, janela=0, tamanho_fila=1)
+        try:
+            primeiro = batcher.enviar(1)
+            time.sleep(0.2)  # o trabalhador pegou o primeiro e ficou preso nele
+            segundo = batcher.enviar(2)
+            with self.assertRaises(queue.Full):
+                batcher.enviar(3)
+            self.assertEqual(batcher.rejeitados, 1)
+            liberar.set()
+            with self.assertRaises(ValueError):
+                primeiro.result(timeout=2)
+            with self.assertRaises(ValueError):
+                segundo.result(timeout=2)
+        finally:
+            batcher.parar()
+
+    def test_missing_results_fail_every_item(self):
+        """Testa se um lote com menos resultados que itens falha todos os futuros, em vez de deixá-los esperando."""
+        batcher = MicroBatcher(lambda itens: itens[:-1], tamanho_maximo_lote=8, janela=0.05)
+        try:
+            futuros = [batcher.enviar(i) for i in range(3)]
+            for futuro in futuros:
+                with self.assertRaises(ValueError):
+                    futuro.result(timeout=2)
+        finally:
+            batcher.parar()
+
+
+class TestValidationService(unittest.TestCase):
+    def test_concurrent_requests_share_batches(self):
+        """Testa se requisições simultâneas chegam ao modelo em lotes, e se as métricas registram p50/p99."""
+        validador = FakeEmbeddingValidator(espera=0.02)
+        with ValidationService(validador, janela=0.02) as servico, requests.Session() as sessao:
+            def validar(i):
+                resposta = requests.post(f"{servico.url}/validar", json={"resposta": f"exame número {i}"})
+                return resposta.status_code, resposta.json()
+
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                resultados = list(executor.map(validar, range(32)))
+            metricas = sessao.get(f"{servico.url}/metricas").json()
+
+        self.assertTrue(all(status == 200 for status, _ in resultados))
+        self.assertEqual(resultados[0][1]["embedding"]["similaridades"], [0.9])
+        self.assertEqual(sum(validador.lotes), 32)
+        self.assertLess(len(validador.lotes), 32)
+        self.assertEqual(metricas["endpoints"]["/validar"]["requisicoes"], 32)
+        self.assertGreater(metricas["endpoints"]["/validar"]["p99_ms"], 0)
+        self.assertGreater(metricas["lotes"]["embedding"]["tamanho_medio_lote"], 1)
+
+    def test_transcript_with_ai_validator(self):
+        validador_ia = ChatbotIAValidator(tamanho_lote=4)  # sem api_key: vereditos simulados
+        with ValidationService(FakeEmbeddingValidator(), validador_ia) as servico:
+            resposta = requests.post(f"{servico.url}/validar/conversa", json={"conversa": CONVERSA, "cenario": "x"})
+            sem_ia = requests.post(f"{servico.url}/validar", json={"resposta": "exame", "ia": False})
+
+        self.assertEqual(resposta.status_code, 200)
+        resultados = resposta.json()["resultados"]
+        self.assertEqual([r["mensagem"] for r in resultados], [
+            "Você tem um exame de ULTRASSONOGRAFIA realizado em 31/01/2025.", "Posso ajudar em algo mais?"
+        ])
+        self.assertEqual(resultados[0]["hora"], "14:31")
+        self.assertEqual(resultados[0]["embedding"]["cenario"], "x")
+        self.assertTrue(resultados[0]["ia"]["relevante"])
+        self.assertFalse(resultados[1]["ia"]["relevante"])
+        self.assertNotIn("ia", sem_ia.json())
+
+    def test_backpressure_and_bad_requests(self):
+        with ValidationService(FakeEmbeddingValidator(espera=0.5), tamanho_maximo_lote=1, tamanho_fila=1) as servico:
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                status = list(executor.map(
+                    lambda _: requests.post(f"{servico.url}/validar", json={"resposta": "exame"}), range(6)
+                ))
+            invalido = requests.post(f"{servico.url}/validar", data=b"{nao json")
+            sem_campo = requests.post(f"{servico.url}/validar", json={})
+            desconhecido = requests.get(f"{servico.url}/nada")
+            ia_texto = requests.post(f"{servico.url}/validar", json={"resposta": "exame", "ia": "false"})
+
+        rejeitadas = [r for r in status if r.status_code == 503]
+        self.assertTrue(rejeitadas)
+        self.assertEqual(rejeitadas[0].headers["Retry-After"], "1")
+        self.assertIn(200, [r.status_code for r in status])
+        self.assertEqual((invalido.status_code, sem_campo.status_code, desconhecido.status_code), (400, 400, 404))
+        self.assertEqual(ia_texto.status_code, 400)
+        self.assertIn('"ia"', ia_texto.json()["erro"])
+
+    def test_transcript_larger_than_queue(self):
+        """Testa se uma conversa que nunca caberia na fila recebe 413, sem Retry-After."""
+        with ValidationService(FakeEmbeddingValidator(), tamanho_fila=1) as servico:
+            grande = requests.post(f"{servico.url}/validar/conversa", json={"conversa": CONVERSA})
+            pequena = requests.post(f"{servico.url}/validar/conversa", json={"conversa": CONVERSA.rsplit("\n", 1)[0]})
+
+        self.assertEqual(grande.status_code, 413)
+        self.assertNotIn("Retry-After", grande.headers)
+        self.assertIn("máximo é 1", grande.json()["erro"])
+        self.assertEqual(pequena.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import unittest
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+except ImportError:
+    webdriver = None
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets", "whatsapp_web_fixture.html")
+
+
+def criar_chrome_headless():
+    """Chrome headless, ou None se o Chrome/ChromeDriver não estiver disponível."""
+    if webdriver is None:
+        return None
+    opcoes = webdriver.ChromeOptions()
+    opcoes.add_argument("--headless=new")
+    opcoes.add_argument("--no-sandbox")
+    opcoes.add_argument("--disable-dev-shm-usage")
+    try:
+        return webdriver.Chrome(options=opcoes)
+    except WebDriverException:
+        return None
+
+
+@unittest.skipIf(webdriver is None, "selenium não instalado")
+class TestWhatsAppMessageCapturer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.driver = criar_chrome_headless()
+        if cls.driver is None:
+            raise unittest.SkipTest("Chrome headless indisponível")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+
+    def setUp(self):
+        from WhatsAppMessageCapturer import WhatsAppMessageCapturer
+
+        self.driver.get(f"file://{FIXTURE}")
+        self.capturador = WhatsAppMessageCapturer(driver=self.driver)
+
+    def adicionar(self, texto, recebida=True):
+        self.driver.execute_script("adicionarMensagem(arguments[0], arguments[1])", texto, recebida)
+
+    def test_capturar_ultima_mensagem(self):
+        mensagem = self.capturador.capturar_ultima_mensagem("Jonas Camargo")
+        self.assertEqual(mensagem, "Olá, Jonas! Boa Tarde! Como posso ajudar?")
+
+    def test_drain_delivers_new_bot_messages_once(self):
+        """Testa se só mensagens novas do chatbot são entregues, cada uma uma única vez."""
+        self.capturador.abrir_contato("Jonas Camargo")
+        self.capturador.iniciar_observador()
+        self.adicionar("exame de ULTRASSONOGRAFIA em 31/01/2025")
+        self.adicionar("obrigado", recebida=False)
+        self.adicionar("laudo previsto para 03/02/2025")
+        self.assertEqual(self.capturador.drenar(tamanho_lote=1), ["exame de ULTRASSONOGRAFIA em 31/01/2025"])
+        self.assertEqual(self.capturador.drenar(), ["laudo previsto para 03/02/2025"])
+        self.assertEqual(self.capturador.drenar(), [])
+        # Reinstalar o observador não entrega de novo o que já está na tela
+        self.capturador.iniciar_observador()
+        self.adicionar("mais alguma coisa?")
+        self.assertEqual(self.capturador.drenar(), ["mais alguma coisa?"])
+
+    def test_reload_keeps_high_water_mark(self):
+        self.capturador.iniciar_observador()
+        self.adicionar("primeira")
+        self.assertEqual(self.capturador.drenar(), ["primeira"])
+        self.driver.refresh()
+        self.assertEqual(self.capturador.drenar(), [])
+        self.adicionar("depois do refresh")
+        self.assertEqual(self.capturador.drenar(), ["depois do refresh"])
+
+    def test_observar_streams_into_validator(self):
+        class Validador:
+            def validar_resposta(self, resposta):
+                return {"mensagem_original": resposta}
+
+        self.capturador.iniciar_observador()
+        self.adicionar("Seu exame está pronto")
+        resultados = list(self.capturador.validar_em_tempo_real(Validador(), intervalo=0.05, duracao=0.3))
+        self.assertEqual(resultados, [{"mensagem_original": "Seu exame está pronto"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
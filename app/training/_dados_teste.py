@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+
+def dataset_sintetico(n_por_classe=30, semente=0):
+    """
+    Dataset pequeno e separável para os testes de treino (já no formato processado).
+
+    Args:
+        n_por_classe (int): Quantidade de linhas por sentimento (1, 3 e 5)
+        semente (int): Semente do gerador aleatório
+
+    Returns:
+        pd.DataFrame: Colunas processed_text e sentiment
+    """
+    rng = np.random.default_rng(semente)
+    vocabulario = {1: ["pessimo", "horrivel", "quebrado"], 3: ["normal", "razoavel", "ok"], 5: ["otimo", "excelente", "adorei"]}
+    comuns = ["produto", "entrega", "loja", "compra"]
+    linhas = []
+    for sentimento, palavras in vocabulario.items():
+        for _ in range(n_por_classe):
+            tokens = list(rng.choice(palavras, size=3)) + list(rng.choice(comuns, size=3))
+            linhas.append({"processed_text": " ".join(tokens), "sentiment": sentimento})
+    return pd.DataFrame(linhas)
@@ -0,0 +1,126 @@
+"""
+Armazenamento local dos vetores de palavras, aberto com memory-map.
+
+A conversão é feita uma única vez (precisa do gensim e, para modelos do gensim-data, de rede):
+
+    python -m training.embedding_store convert glove-wiki-gigaword-50
+
+Depois disso o treino só lê arquivos locais: `vectors.npy` é aberto com mmap_mode='r' (início
+quase instantâneo, páginas compartilhadas entre processos pelo cache do sistema operacional)
+e `vocab.json` guarda as palavras na ordem das linhas da matriz.
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+DEFAULT_MODEL = "glove-wiki-gigaword-50"
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embeddings", DEFAULT_MODEL)
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.json"
+META_FILE = "meta.json"
+
+
+class EmbeddingStore:
+    """
+    Vetores de palavras somente leitura, com a mesma interface usada de gensim KeyedVectors
+    (`key_to_index`, `vectors`, `vector_size`, `word in store`, `store[word]`).
+    """
+
+    def __init__(self, vectors, index_to_key):
+        self.vectors = vectors
+        self.index_to_key = index_to_key
+        self.key_to_index = {word: index for index, word in enumerate(index_to_key)}
+        self.vector_size = vectors.shape[1]
+
+    @classmethod
+    def open(cls, path=DEFAULT_STORE_DIR):
+        """
+        Abre um armazenamento criado por save_keyed_vectors, sem copiar a matriz para a RAM.
+
+        Raises:
+            FileNotFoundError: Se a conversão ainda não foi feita
+        """
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        if not os.path.exists(vectors_path):
+            raise FileNotFoundError(
+                f"Vetores não encontrados em {path}. Gere-os uma vez com: "
+                f"python -m training.embedding_store convert {DEFAULT_MODEL} --output {path}"
+            )
+        vectors = np.load(vectors_path, mmap_mode="r")
+        with open(os.path.join(path, VOCAB_FILE), encoding="utf-8") as f:
+            index_to_key = json.load(f)
+        return cls(vectors, index_to_key)
+
+    def __contains__(self, word):
+        return word in self.key_to_index
+
+    def __getitem__(self, word):
+        return self.vectors[self.key_to_index[word]]
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+
+def save_keyed_vectors(keyed_vectors, output_dir, source=None):
+    """
+    Grava vetores no formato do EmbeddingStore (float32 contíguo + vocabulário).
+
+    Args:
+        keyed_vectors: Objeto com `index_to_key` e `vectors` (ex: gensim KeyedVectors)
+        output_dir (str): Pasta de destino; substituída por inteiro ao final
+        source (str): Origem dos vetores, registrada em meta.json
+    """
+    tmp_dir = output_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    vectors = np.ascontiguousarray(keyed_vectors.vectors, dtype=np.float32)
+    np.save(os.path.join(tmp_dir, VECTORS_FILE), vectors)
+    with open(os.path.join(tmp_dir, VOCAB_FILE), "w", encoding="utf-8") as f:
+        json.dump(list(keyed_vectors.index_to_key), f, ensure_ascii=False)
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"source": source, "count": vectors.shape[0], "vector_size": vectors.shape[1]}, f)
+
+    # Só substitui o armazenamento anterior depois que todos os arquivos foram gravados
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+
+
+def convert(source=DEFAULT_MODEL, output_dir=None):
+    """
+    Converte um modelo do gensim-data (ex: glove-wiki-gigaword-50) ou um arquivo KeyedVectors local.
+    """
+    # Importado aqui: o gensim só é necessário na conversão, não no treino
+    from gensim.models import KeyedVectors
+
+    if os.path.exists(source):
+        keyed_vectors = KeyedVectors.load(source)
+    else:
+        import gensim.downloader as api
+        keyed_vectors = api.load(source)
+
+    output_dir = output_dir or os.path.join(os.path.dirname(DEFAULT_STORE_DIR), os.path.basename(source))
+    save_keyed_vectors(keyed_vectors, output_dir, source=source)
+    print(f"{len(keyed_vectors.index_to_key)} vetores de dimensão {keyed_vectors.vector_size} gravados em {output_dir}")
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazenamento local de vetores de palavras")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="Converte vetores do gensim para o formato com mmap")
+    convert_parser.add_argument("source", nargs="?", default=DEFAULT_MODEL,
+                                help="Nome no gensim-data ou caminho de um KeyedVectors salvo")
+    convert_parser.add_argument("--output", default=None, help="Pasta de destino")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert(args.source, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import MultinomialNB
+
+try:
+    from training_embedding import get_average_word2vec
+except ImportError:
+    # Importado a partir de app/, como training.model_selection
+    from training.training_embedding import get_average_word2vec
+
+# Grade padrão: as configurações de training.train_model e training_embedding.train_model e variações.
+# Para cada pipeline, todas as combinações vetorizador x classificador são avaliadas.
+GRADE_PADRAO = {
+    "bow": {
+        "vetorizador": [
+            {"max_features": 5000},
+            {"max_features": 20000},
+            {"max_features": 20000, "ngram_range": (1, 2)},
+        ],
+        "classificador": [{"alpha": 0.1}, {"alpha": 0.5}, {"alpha": 1.0}],
+    },
+    "embedding": {
+        # A média dos embeddings não tem hiperparâmetros: um único "vetorizador"
+        "vetorizador": [{}],
+        "classificador": [
+            {"n_estimators": 100},
+            {"n_estimators": 200, "min_samples_leaf": 2},
+            {"n_estimators": 200, "max_depth": 20},
+        ],
+    },
+}
+
+
+def _descrever(params):
+    return ", ".join(f"{chave}={valor}" for chave, valor in params.items())
+
+
+def _criar_classificador(pipeline, params, random_state):
+    if pipeline == "bow":
+        return MultinomialNB(**params)
+    # n_jobs=1: o paralelismo já está nas dobras, não dentro de cada floresta
+    return RandomForestClassifier(n_jobs=1, random_state=random_state, **params)
+
+
+def _avaliar_dobra(pipeline, params_vetorizador, grade_classificador, X_train, X_test, y_train, y_test,
+                   dobra, random_state):
+    """
+    Vetoriza a dobra uma vez e treina todas as configurações de classificador sobre as mesmas features.
+
+    Returns:
+        list: Uma linha (dict) por configuração de classificador
+    """
+    inicio = time.perf_counter()
+    if pipeline == "bow":
+        vectorizer = CountVectorizer(**params_vetorizador)
+        X_train = vectorizer.fit_transform(X_train)
+        X_test = vectorizer.transform(X_test)
+    tempo_vetorizacao = time.perf_counter() - inicio
+
+    linhas = []
+    for params in grade_classificador:
+        model = _criar_classificador(pipeline, params, random_state)
+        inicio = time.perf_counter()
+        model.fit(X_train, y_train)
+        tempo_fit = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        y_pred = model.predict(X_test)
+        tempo_predict = time.perf_counter() - inicio
+        linhas.append({
+            "pipeline": pipeline,
+            "vetorizador": _descrever(params_vetorizador),
+            "classificador": _descrever(params),
+            "dobra": dobra,
+            "accuracy": accuracy_score(y_test, y_pred),
+            "f1_macro": f1_score(y_test, y_pred, average="macro"),
+            "vetorizacao_s": tempo_vetorizacao,
+            "fit_s": tempo_fit,
+            "predict_us_por_doc": 1e6 * tempo_predict / len(y_test),
+        })
+    return linhas
+
+
+def selecionar_modelos(df, grade=None, n_splits=5, n_jobs=-1, embedding_path=None, vetores_palavras=None,
+                       random_state=42):
+    """
+    Validação cruzada estratificada (k dobras) das pipelines BoW e embedding, em paralelo.
+
+    Cada tarefa é uma (dobra, configuração de vetorizador): o vetorizador é ajustado uma vez
+    por dobra e as features são reaproveitadas por todas as configurações de classificador.
+    As médias de embeddings não dependem do treino, então são calculadas uma vez para o
+    dataset inteiro e só fatiadas por dobra.
+
+    Args:
+        df (pd.DataFrame): Colunas processed_text e sentiment (ex: load_df_processed())
+        grade (dict): Pipelines e hiperparâmetros a testar (padrão: GRADE_PADRAO)
+        n_splits (int): Número de dobras
+        n_jobs (int): Processos do joblib (-1 = todos os núcleos)
+        embedding_path (str): Pasta do EmbeddingStore (padrão: a de training_embedding.train_model)
+        vetores_palavras: Vetores de palavras já abertos (com key_to_index e vectors); tem prioridade
+            sobre embedding_path
+        random_state (int): Semente das dobras e das florestas
+
+    Returns:
+        pd.DataFrame: Resultado por dobra (ver relatorio para o ranking)
+    """
+    grade = GRADE_PADRAO if grade is None else grade
+    X = df['processed_text'].to_numpy()
+    y = df['sentiment'].to_numpy()
+    dobras = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X, y))
+
+    features = {"bow": X}
+    if "embedding" in grade:
+        if vetores_palavras is None:
+            from training.embedding_store import EmbeddingStore, DEFAULT_STORE_DIR
+
+            vetores_palavras = EmbeddingStore.open(embedding_path or DEFAULT_STORE_DIR)
+        features["embedding"] = get_average_word2vec(X, vetores_palavras, vector_size=vetores_palavras.vectors.shape[1])
+
+    tarefas = (
+        delayed(_avaliar_dobra)(
+            pipeline, params_vetorizador, config["classificador"],
+            features[pipeline][treino], features[pipeline][teste], y[treino], y[teste],
+            dobra, random_state
+        )
+        for pipeline, config in grade.items()
+        for params_vetorizador in config["vetorizador"]
+        for dobra, (treino, teste) in enumerate(dobras)
+    )
+    resultados = Parallel(n_jobs=n_jobs)(tarefas)
+    return pd.DataFrame([linha for linhas in resultados for linha in linhas])
+
+
+def relatorio(resultados, metrica="f1_macro"):
+    """
+    Ranking das configurações pela média da métrica entre as dobras.
+
+    Returns:
+        pd.DataFrame: Uma linha por configuração, com média e desvio de accuracy e f1_macro,
+        e tempos médios de vetorização e fit (s) e de predição (µs por documento)
+    """
+    agrupado = resultados.groupby(["pipeline", "vetorizador", "classificador"]).agg(
+        accuracy=("accuracy", "mean"),
+        accuracy_std=("accuracy", "std"),
+        f1_macro=("f1_macro", "mean"),
+        f1_macro_std=("f1_macro", "std"),
+        vetorizacao_s=("vetorizacao_s", "mean"),
+        fit_s=("fit_s", "mean"),
+        predict_us_por_doc=("predict_us_por_doc", "mean"),
+    )
+    ranking = agrupado.sort_values(metrica, ascending=False).reset_index()
+    ranking.index = np.arange(1, len(ranking) + 1)
+    return ranking
+
+
+def imprimir_relatorio(resultados, metrica="f1_macro"):
+    ranking = relatorio(resultados, metrica)
+    with pd.option_context("display.max_columns", None, "display.width", 200, "display.float_format", "{:.4f}".format):
+        print(f"\nRanking por {metrica} ({resultados['dobra'].nunique()} dobras):")
+        print(ranking)
+    return ranking
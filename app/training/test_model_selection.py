@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from _dados_teste import dataset_sintetico
+from model_selection import relatorio, selecionar_modelos
+
+
+class FakeWordVectors:
+    """Vetores de palavras mínimos (key_to_index + vectors), como EmbeddingStore."""
+    def __init__(self, palavras, dimensao=8, semente=0):
+        self.key_to_index = {palavra: i for i, palavra in enumerate(palavras)}
+        self.vectors = np.random.default_rng(semente).normal(size=(len(palavras), dimensao)).astype(np.float32)
+
+
+class TestModelSelection(unittest.TestCase):
+    def test_grid_over_both_pipelines(self):
+        df = dataset_sintetico()
+        grade = {
+            "bow": {"vetorizador": [{"max_features": 5}, {"max_features": 50}],
+                    "classificador": [{"alpha": 0.5}, {"alpha": 1.0}]},
+            "embedding": {"vetorizador": [{}], "classificador": [{"n_estimators": 10}]},
+        }
+        palavras = sorted({p for texto in df["processed_text"] for p in texto.split()})
+        resultados = selecionar_modelos(df, grade, n_splits=3, n_jobs=2, vetores_palavras=FakeWordVectors(palavras))
+
+        # (2 vetorizadores x 2 classificadores + 1) configurações x 3 dobras
+        self.assertEqual(len(resultados), 15)
+        ranking = relatorio(resultados)
+        self.assertEqual(len(ranking), 5)
+        self.assertTrue(ranking["f1_macro"].is_monotonic_decreasing)
+        self.assertEqual(list(ranking.index), [1, 2, 3, 4, 5])
+        # Vocabulário completo separa as classes sintéticas
+        melhor_bow = ranking[ranking["vetorizador"] == "max_features=50"]["accuracy"].max()
+        self.assertGreater(melhor_bow, 0.9)
+        self.assertTrue((resultados["predict_us_por_doc"] > 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+try:
+    from training import train_model, train_model_incremental
+except ImportError:
+    # Rodando a partir de app/, onde "training" é a pasta
+    from training.training import train_model, train_model_incremental
+from _dados_teste import dataset_sintetico
+
+
+def acuracia(model, X_test, y_test):
+    return float(np.mean(model.predict(X_test) == np.asarray(y_test)))
+
+
+class TestTrainModelIncremental(unittest.TestCase):
+    def setUp(self):
+        self.df = dataset_sintetico(n_por_classe=40).sample(frac=1, random_state=0).reset_index(drop=True)
+        model, _, X_test, y_test = train_model(self.df)
+        self.acuracia_referencia = acuracia(model, X_test, y_test)
+
+    def test_single_chunk_matches_train_model(self):
+        """Com um bloco só, a divisão é a mesma de train_model e o Naive Bayes acerta o mesmo."""
+        model, _, X_test, y_test = train_model_incremental([self.df], classes=(1, 3, 5))
+        self.assertEqual(len(y_test), 24)
+        self.assertAlmostEqual(acuracia(model, X_test, y_test), self.acuracia_referencia)
+
+    def test_ragged_chunks(self):
+        """Testa blocos de tamanhos irregulares, inclusive com 0, 1 e 2 linhas."""
+        limites = [0, 1, 1, 3, 40, 41, 43, 90, 119, 120]
+        chunks = [self.df.iloc[inicio:fim] for inicio, fim in zip(limites, limites[1:])]
+        model, _, X_test, y_test = train_model_incremental(chunks, classes=(1, 3, 5))
+        self.assertEqual(X_test.shape[0], len(y_test))
+        self.assertEqual(model.class_count_.sum() + len(y_test), len(self.df))
+        self.assertGreaterEqual(acuracia(model, X_test, y_test), self.acuracia_referencia - 0.1)
+
+    def test_bounded_test_set(self):
+        chunks = [self.df.iloc[inicio:inicio + 10] for inicio in range(0, len(self.df), 10)]
+        model, _, X_test, y_test = train_model_incremental(chunks, classes=(1, 3, 5), max_test_size=5)
+        self.assertEqual((X_test.shape[0], len(y_test)), (5, 5))
+        # Linhas que saíram da amostra de teste foram usadas no treino
+        self.assertEqual(model.class_count_.sum(), len(self.df) - 5)
+
+    def test_empty_chunks(self):
+        with self.assertRaisesRegex(ValueError, "Nenhuma linha"):
+            train_model_incremental(iter([]))
+        with self.assertRaisesRegex(ValueError, "Nenhuma linha"):
+            train_model_incremental([self.df.iloc[:0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
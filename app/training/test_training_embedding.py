@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from embedding_store import EmbeddingStore, save_keyed_vectors
+from training_embedding import get_average_word2vec
+
+
+def average_word2vec_loop(tokens_list, model, vector_size):
+    """Implementação original (laço por documento), usada como referência."""
+    embeddings = []
+    for tokens in tokens_list:
+        word_vecs = [model[word] for word in tokens if word in model]
+        if len(word_vecs) == 0:
+            embeddings.append(np.zeros(vector_size))
+        else:
+            embeddings.append(np.mean(word_vecs, axis=0))
+    return np.array(embeddings)
+
+
+class TestAverageWord2Vec(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.model = KeyedVectors(vector_size=8)
+        self.model.add_vectors(['produto', 'entrega', 'rapida', 'otimo', 'ruim'],
+                               rng.normal(size=(5, 8)).astype(np.float32))
+
+    def test_matches_loop_implementation(self):
+        """Testa se a versão vetorizada dá o mesmo resultado do laço original para listas de tokens."""
+        docs = [['produto', 'otimo'], ['entrega', 'entrega', 'rapida', 'desconhecida'], [], ['xyz'], ['ruim']]
+        expected = average_word2vec_loop(docs, self.model, 8)
+        result = get_average_word2vec(docs, self.model, vector_size=8, batch_size=2)
+        np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6)
+
+    def test_text_is_split_into_tokens(self):
+        """Testa se textos processados são tratados como palavras, não como caracteres."""
+        result = get_average_word2vec(['produto otimo', ''], self.model, vector_size=8)
+        expected = average_word2vec_loop([['produto', 'otimo'], []], self.model, 8)
+        np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6)
+
+    def test_embedding_store_round_trip_is_memory_mapped(self):
+        """Testa se o armazenamento local abre com mmap e dá as mesmas médias do KeyedVectors."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'vetores')
+            save_keyed_vectors(self.model, path, source='teste')
+            store = EmbeddingStore.open(path)
+            self.assertIsInstance(store.vectors, np.memmap)
+            self.assertIn('entrega', store)
+            np.testing.assert_array_equal(store['entrega'], self.model['entrega'])
+            docs = ['produto entrega', 'ruim desconhecida', '']
+            np.testing.assert_allclose(get_average_word2vec(docs, store, vector_size=8),
+                                       get_average_word2vec(docs, self.model, vector_size=8))
+            del store
+
+    def test_embedding_store_missing_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(FileNotFoundError):
+                EmbeddingStore.open(os.path.join(tmp, 'inexistente'))
+
+if __name__ == "__main__":
+    unittest.main()
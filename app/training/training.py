@@ -1,9 +1,14 @@
-from sklearn.feature_extraction.text import CountVectorizer
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import MultinomialNB
 
 # PREPARAÇÃO PARA MODELAGEM UTILIZANDO BAG OF WORDS - talvez mudar para embeddings
-def train_model(df):
+def train_model(df, bundle_path=None, preprocessor=None):
+    # bundle_path: se informado, salva o pacote de inferência (ver sentiment_predictor.SentimentPredictor)
+    # preprocessor: PortuguesePreprocessor que gerou processed_text (padrão: o de load_df_processed);
+    # a config() dele vai para o manifesto do pacote
     # Separa features (X) e target (y)
     X = df['processed_text'] # Features: coluna com os textos já pré-processados
     y = df['sentiment'] # Target: sentimentos (0, 1 ou 2) - coluna de rótulos de sentimento (exemplo: 0 = negativo, 1 = neutro, 2 = positivo).
@@ -39,6 +44,15 @@ def train_model(df):
     """
     model.fit(X_train_vectorized, y_train)
 
+    if bundle_path is not None:
+        from sentiment_predictor import save_bundle
+
+        if preprocessor is None:
+            from pre_processing.pre_processor import PortuguesePreprocessor
+
+            preprocessor = PortuguesePreprocessor()
+        save_bundle(bundle_path, model, vectorizer, preprocessor.config())
+
     return model, vectorizer, X_test_vectorized, y_test
 
 
@@ -55,4 +69,82 @@ def train_model(df):
         macro avg       0.46      0.46      0.46     26475
         weighted avg       0.52      0.54      0.53     26475
         
-    """
\ No newline at end of file
+    """
+
+
+# TREINAMENTO INCREMENTAL (FORA DA MEMÓRIA) - mesmo Naive Bayes, alimentado bloco a bloco
+def train_model_incremental(chunks, n_features=2**18, classes=(1, 2, 3, 4, 5), test_size=0.2, random_state=42,
+                            max_test_size=50_000):
+    """
+    Treina o MultinomialNB com partial_fit, consumindo os blocos de iter_processed_chunks.
+
+    O HashingVectorizer não guarda vocabulário (cada palavra vira uma coluna pelo hash), então
+    não precisa ver o corpus inteiro antes de vetorizar e a memória de treino fica constante,
+    independentemente do tamanho do dataset. Cada bloco é dividido 80/20 como em train_model
+    (blocos pequenos demais para dividir vão inteiros para o treino). O teste é uma amostra
+    uniforme (reservoir sampling) de no máximo `max_test_size` linhas entre os 20% de todos os
+    blocos; as linhas que saem da amostra são usadas no treino, então nenhuma se perde.
+
+    Exemplo:
+        chunks = iter_processed_chunks(chunksize=50_000)
+        model, vectorizer, X_test_vectorized, y_test = train_model_incremental(chunks)
+
+    Returns:
+        Mesma tupla de train_model: (model, vectorizer, X_test_vectorized, y_test)
+
+    Raises:
+        ValueError: Se os blocos não tiverem nenhuma linha
+    """
+    # alternate_sign=False e norm=None: contagens não negativas, como o CountVectorizer, exigidas pelo MultinomialNB
+    vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+    model = MultinomialNB()
+    classes = np.asarray(classes)
+    rng = np.random.default_rng(random_state)
+
+    test_texts, test_labels = [], []
+    candidatos = 0  # linhas de teste vistas até agora, para o reservoir sampling
+    linhas = 0
+    for chunk in chunks:
+        X = chunk['processed_text']
+        y = chunk['sentiment']
+        if len(chunk) == 0:
+            continue
+        linhas += len(chunk)
+        n_test = int(np.ceil(test_size * len(chunk)))
+        if n_test == 0 or n_test >= len(chunk):
+            X_train, y_train, X_test, y_test = X, y, X.iloc[:0], y.iloc[:0]
+        else:
+            # Estratifica quando possível: cada classe precisa de exemplos nos dois lados da divisão
+            n_classes = y.nunique()
+            estratificavel = (n_classes > 1 and y.value_counts().min() >= 2
+                              and min(n_test, len(chunk) - n_test) >= n_classes)
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, stratify=y if estratificavel else None, random_state=random_state
+            )
+
+        # Linhas que não ficam (ou deixam de ficar) na amostra de teste voltam para o treino
+        extra_texts, extra_labels = [], []
+        for texto, rotulo in zip(X_test, y_test):
+            if len(test_texts) < max_test_size:
+                test_texts.append(texto)
+                test_labels.append(rotulo)
+            else:
+                j = rng.integers(candidatos + 1)
+                if j < max_test_size:
+                    extra_texts.append(test_texts[j])
+                    extra_labels.append(test_labels[j])
+                    test_texts[j], test_labels[j] = texto, rotulo
+                else:
+                    extra_texts.append(texto)
+                    extra_labels.append(rotulo)
+            candidatos += 1
+
+        model.partial_fit(vectorizer.transform(list(X_train) + extra_texts), list(y_train) + extra_labels,
+                          classes=classes)
+
+    if linhas == 0:
+        raise ValueError("Nenhuma linha nos blocos de treino: verifique o caminho do dataset e o chunksize")
+
+    X_test_vectorized = vectorizer.transform(test_texts).tocsr()
+    y_test = pd.Series(test_labels, name='sentiment', dtype=y.dtype)
+    return model, vectorizer, X_test_vectorized, y_test
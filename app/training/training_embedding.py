@@ -1,26 +1,57 @@
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import MultinomialNB
 import numpy as np
-import gensim.downloader as api
-from gensim.models import Word2Vec
-from tqdm import tqdm
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
 
 # Função para gerar a média dos embeddings de palavras
-def get_average_word2vec(tokens_list, model, vector_size):
-    embeddings = []
-    for tokens in tokens_list:
-        word_vecs = [model[word] for word in tokens if word in model]
-        if len(word_vecs) == 0:
-            # Se nenhuma das palavras tem embedding, adiciona um vetor de zeros
-            embeddings.append(np.zeros(vector_size))
-        else:
-            # Calcula a média dos vetores de palavras
-            embeddings.append(np.mean(word_vecs, axis=0))
-    return np.array(embeddings)
+def get_average_word2vec(tokens_list, model, vector_size, batch_size=10_000):
+    """
+    Calcula, para cada documento, a média dos embeddings das palavras presentes no modelo.
+
+    Cada token é convertido uma vez no seu índice da matriz de embeddings; as médias de um lote
+    de documentos saem de um único produto (matriz esparsa documento x palavra, com peso 1/n) @ vetores,
+    gravado direto na matriz de saída pré-alocada.
+
+    Args:
+        tokens_list: Documentos, cada um como lista de tokens ou texto com tokens separados por espaço
+        model: Vetores de palavras com `key_to_index` e `vectors` (ex: gensim KeyedVectors)
+        vector_size (int): Dimensão dos embeddings
+        batch_size (int): Documentos por produto esparso
+
+    Returns:
+        np.ndarray: Matriz (n_documentos, vector_size); documentos sem palavras conhecidas ficam com zeros
+    """
+    tokens_list = list(tokens_list)
+    vectors = model.vectors
+    get_index = model.key_to_index.get
+    embeddings = np.zeros((len(tokens_list), vector_size), dtype=vectors.dtype)
+
+    for start in range(0, len(tokens_list), batch_size):
+        batch = tokens_list[start:start + batch_size]
+        indices = []
+        indptr = [0]
+        for tokens in batch:
+            if isinstance(tokens, str):
+                # processed_text é um texto: itera sobre as palavras, não sobre os caracteres
+                tokens = tokens.split()
+            indices.extend([index for word in tokens if (index := get_index(word)) is not None])
+            indptr.append(len(indices))
+
+        counts = np.diff(indptr)
+        # Peso 1/n para cada palavra encontrada: a linha do produto vira a média dos vetores.
+        # Mesmo dtype dos vetores, para o produto não converter a matriz de embeddings inteira.
+        weights = np.repeat((1.0 / np.maximum(counts, 1)).astype(vectors.dtype), counts)
+        doc_word = sparse.csr_matrix((weights, indices, indptr), shape=(len(batch), len(vectors)))
+        embeddings[start:start + len(batch)] = doc_word @ vectors
+
+    return embeddings
 
 # PREPARAÇÃO PARA MODELAGEM UTILIZANDO EMBEDDINGS
-def train_model(df):
+def train_model(df, embedding_path=None):
+    # embedding_path: pasta gerada por `python -m training.embedding_store convert` (padrão: glove-wiki-gigaword-50)
+    from training.embedding_store import EmbeddingStore, DEFAULT_STORE_DIR
+
     # Separa features (X) e target (y)
     X = df['processed_text'] # Features: coluna com os textos já pré-processados
     y = df['sentiment'] # Target: sentimentos (1, 2, 3, 4 e 5)
@@ -28,12 +59,12 @@ def train_model(df):
     # Divisão de treino e teste (80/20)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
 
-    # Baixa o modelo de Word2Vec (exemplo: Google News)
-    word2vec_model = api.load("glove-wiki-gigaword-50")  # 50 dimensões, mas existem opções maiores.
+    # Abre os vetores locais com memory-map (sem rede; páginas compartilhadas entre processos)
+    word2vec_model = EmbeddingStore.open(embedding_path or DEFAULT_STORE_DIR)  # 50 dimensões, mas existem opções maiores.
 
     # Transforma os textos em embeddings
-    X_train_vectorized = get_average_word2vec(X_train, word2vec_model, vector_size=50)
-    X_test_vectorized = get_average_word2vec(X_test, word2vec_model, vector_size=50)
+    X_train_vectorized = get_average_word2vec(X_train, word2vec_model, vector_size=word2vec_model.vector_size)
+    X_test_vectorized = get_average_word2vec(X_test, word2vec_model, vector_size=word2vec_model.vector_size)
 
     # # Usa um classificador simples (ex: Naive Bayes)
     # model = MultinomialNB()
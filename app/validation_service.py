@@ -0,0 +1,459 @@
+"""
+Serviço HTTP local que mantém o EmbeddingValidator e o ChatbotIAValidator carregados entre requisições.
+
+Uso (a partir da pasta app/):
+    python validation_service.py --porta 8080 --cenarios datasets/cenarios.json
+    curl -X POST localhost:8080/validar -d '{"resposta": "Seu exame de ULTRASSONOGRAFIA ..."}'
+
+Endpoints:
+    POST /validar            {"resposta": str, "cenario": str (opcional), "ia": bool (opcional)}
+    POST /validar/conversa   {"conversa": str (exportação do WhatsApp), "cenario": ..., "ia": ...}
+    GET  /metricas           latências p50/p99 por endpoint e tamanho dos lotes
+    GET  /saude
+
+Requisições simultâneas não vão uma a uma para o modelo: cada validador tem um MicroBatcher que
+junta o que chegar numa janela curta (padrão 5 ms) e chama calcular_similaridade_lote /
+validar_respostas uma vez por lote. As filas são limitadas; cheias, o serviço responde 503 com
+Retry-After em vez de acumular trabalho. Uma conversa com mais mensagens do que cabem na fila
+recebe 413 (sem Retry-After), já que nunca caberia. Ver benchmarks/bench_validation_service.py.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from chatbot.whatsapp_parser import REMETENTES_BOT_PADRAO, iterar_mensagens
+
+
+class MicroBatcher:
+    """
+    Junta itens enviados por várias threads em lotes, processados por trabalhadores em segundo plano.
+
+    O trabalhador espera o primeiro item e então mais até `janela` segundos (ou até
+    tamanho_maximo_lote itens) antes de chamar processar_lote com a lista.
+    """
+
+    def __init__(self, processar_lote, tamanho_maximo_lote=64, janela=0.005, tamanho_fila=1024, trabalhadores=1):
+        """
+        Args:
+            processar_lote (callable): Recebe a lista de itens e devolve a lista de resultados, na mesma ordem
+            tamanho_maximo_lote (int): Máximo de itens por chamada a processar_lote
+            janela (float): Segundos de espera por mais itens depois do primeiro
+            tamanho_fila (int): Máximo de itens esperando; acima disso enviar levanta queue.Full
+            trabalhadores (int): Threads processando lotes em paralelo (mais de uma ajuda com APIs remotas)
+        """
+        self.processar_lote = processar_lote
+        self.tamanho_maximo_lote = tamanho_maximo_lote
+        self.janela = janela
+        self.lotes = 0
+        self.itens = 0
+        self.rejeitados = 0
+        self.capacidade_fila = tamanho_fila
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._trava = threading.Lock()
+        self._parando = threading.Event()
+        self._threads = [threading.Thread(target=self._trabalhar, daemon=True) for _ in range(trabalhadores)]
+        for thread in self._threads:
+            thread.start()
+
+    def enviar(self, item):
+        """
+        Coloca o item na fila sem bloquear.
+
+        Returns:
+            Future: Recebe o resultado do item quando o lote dele for processado
+
+        Raises:
+            queue.Full: Se a fila estiver cheia
+        """
+        futuro = Future()
+        try:
+            self._fila.put_nowait((item, futuro))
+        except queue.Full:
+            with self._trava:
+                self.rejeitados += 1
+            raise
+        return futuro
+
+    def _coletar(self):
+        try:
+            lote = [self._fila.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        prazo = time.monotonic() + self.janela
+        while len(lote) < self.tamanho_maximo_lote:
+            restante = prazo - time.monotonic()
+            try:
+                lote.append(self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _trabalhar(self):
+        while not self._parando.is_set():
+            # Itens cujo cliente já desistiu (futuro cancelado) não são processados
+            lote = [(item, futuro) for item, futuro in self._coletar() if futuro.set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            try:
+                resultados = list(self.processar_lote([item for item, _ in lote]))
+                # Com menos resultados, o zip abaixo deixaria os últimos futuros esperando para sempre
+                if len(resultados) != len(lote):
+                    raise ValueError(f"processar_lote devolveu {len(resultados)} resultados para {len(lote)} itens")
+            except Exception as e:
+                for _, futuro in lote:
+                    futuro.set_exception(e)
+                continue
+            with self._trava:
+                self.lotes += 1
+                self.itens += len(lote)
+            for (_, futuro), resultado in zip(lote, resultados):
+                futuro.set_result(resultado)
+
+    @property
+    def tamanho_fila(self):
+        return self._fila.qsize()
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                "fila": self.tamanho_fila,
+                "lotes": self.lotes,
+                "itens": self.itens,
+                "tamanho_medio_lote": self.itens / self.lotes if self.lotes else 0.0,
+                "rejeitados": self.rejeitados,
+            }
+
+    def parar(self):
+        """Termina os trabalhadores; itens ainda na fila recebem RuntimeError."""
+        self._parando.set()
+        for thread in self._threads:
+            thread.join()
+        while True:
+            try:
+                _, futuro = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if futuro.set_running_or_notify_cancel():
+                futuro.set_exception(RuntimeError("Serviço encerrado"))
+
+
+class LatencyMetrics:
+    """Latências das últimas `janela` requisições de cada endpoint, para p50/p99."""
+
+    def __init__(self, janela=10_000):
+        self.janela = janela
+        self._latencias = {}
+        self._contagens = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, endpoint, segundos, status):
+        with self._trava:
+            self._latencias.setdefault(endpoint, deque(maxlen=self.janela)).append(segundos)
+            contagens = self._contagens.setdefault(endpoint, {})
+            contagens[status] = contagens.get(status, 0) + 1
+
+    def resumo(self):
+        with self._trava:
+            latencias = {endpoint: np.array(valores) for endpoint, valores in self._latencias.items()}
+            contagens = {endpoint: dict(valores) for endpoint, valores in self._contagens.items()}
+        resumo = {}
+        for endpoint, valores in latencias.items():
+            p50, p99 = np.percentile(valores, [50, 99]) * 1000
+            resumo[endpoint] = {
+                "requisicoes": sum(contagens[endpoint].values()),
+                "status": {str(status): n for status, n in sorted(contagens[endpoint].items())},
+                "p50_ms": round(float(p50), 2),
+                "p99_ms": round(float(p99), 2),
+            }
+        return resumo
+
+
+class _ErroRequisicao(Exception):
+    def __init__(self, status, mensagem, cabecalhos=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.cabecalhos = cabecalhos or {}
+
+
+def _json_padrao(valor):
+    # Similaridades saem do numpy
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._atender({"/saude": self.server.servico.saude, "/metricas": self.server.servico.metricas})
+
+    def do_POST(self):
+        self._atender({"/validar": self.server.servico.validar, "/validar/conversa": self.server.servico.validar_conversa})
+
+    def _atender(self, rotas):
+        inicio = time.perf_counter()
+        cabecalhos = {}
+        rota = rotas.get(self.path)
+        try:
+            if rota is None:
+                raise _ErroRequisicao(404, f"Endpoint não encontrado: {self.path}")
+            corpo = rota(self._ler_json()) if self.command == "POST" else rota()
+            status = 200
+        except _ErroRequisicao as e:
+            status, cabecalhos, corpo = e.status, e.cabecalhos, {"erro": str(e)}
+        except Exception as e:
+            status, corpo = 500, {"erro": f"{type(e).__name__}: {e}"}
+        self._responder(status, corpo, cabecalhos)
+        if rota is not None:
+            self.server.servico.latencias.registrar(self.path, time.perf_counter() - inicio, status)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(tamanho) or b"{}")
+        except ValueError:
+            raise _ErroRequisicao(400, "Corpo da requisição não é JSON válido")
+        if not isinstance(payload, dict):
+            raise _ErroRequisicao(400, "O corpo deve ser um objeto JSON")
+        return payload
+
+    def _responder(self, status, corpo, cabecalhos):
+        dados = json.dumps(corpo, ensure_ascii=False, default=_json_padrao).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # O padrão do socketserver (5) recusa conexões quando dezenas de clientes conectam ao mesmo tempo
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Cliente que fechou a conexão antes da resposta (ex: teste de carga interrompido)
+        pass
+
+
+class ValidationService:
+    """
+    Serviço de validação numa thread, com os validadores já carregados.
+
+    Args:
+        validador_embedding: EmbeddingValidator (ou None para não calcular similaridade)
+        validador_ia: ChatbotIAValidator (ou None para não consultar a IA). Com tamanho_lote > 1,
+            cada micro-lote vira prompts em lote na API.
+        host (str): Endereço de escuta
+        porta (int): Porta (0 = uma porta livre, ver url)
+        janela (float): Janela dos micro-lotes, em segundos
+        tamanho_maximo_lote (int): Máximo de respostas por micro-lote
+        tamanho_fila (int): Máximo de respostas esperando em cada validador (acima disso, 503; uma
+            conversa com mais mensagens que isso recebe 413)
+        trabalhadores_ia (int): Lotes de IA processados em paralelo
+        tempo_limite (float): Segundos de espera pelo resultado antes de responder 504
+    """
+
+    def __init__(self, validador_embedding=None, validador_ia=None, host="127.0.0.1", porta=0, janela=0.005,
+                 tamanho_maximo_lote=64, tamanho_fila=1024, trabalhadores_ia=4, tempo_limite=30.0):
+        if validador_embedding is None and validador_ia is None:
+            raise ValueError("Informe ao menos um validador")
+        self.validador_embedding = validador_embedding
+        self.validador_ia = validador_ia
+        self.host = host
+        self.porta = porta
+        self.tempo_limite = tempo_limite
+        self.latencias = LatencyMetrics()
+        self.remetentes_bot = getattr(validador_ia, "remetentes_bot", REMETENTES_BOT_PADRAO)
+        self._lotes = {}
+        if validador_embedding is not None:
+            self._lotes["embedding"] = MicroBatcher(self._processar_embeddings, tamanho_maximo_lote, janela,
+                                                    tamanho_fila)
+        if validador_ia is not None:
+            self._lotes["ia"] = MicroBatcher(validador_ia.validar_respostas, tamanho_maximo_lote, janela,
+                                             tamanho_fila, trabalhadores=trabalhadores_ia)
+        self._servidor = None
+        self._thread = None
+
+    def _processar_embeddings(self, itens):
+        # Um lote pode misturar cenários: uma chamada ao modelo por cenário
+        resultados = [None] * len(itens)
+        por_cenario = {}
+        for i, (_, cenario) in enumerate(itens):
+            por_cenario.setdefault(cenario, []).append(i)
+        for cenario, indices in por_cenario.items():
+            lote = self.validador_embedding.calcular_similaridade_lote([itens[i][0] for i in indices], cenario=cenario)
+            for i, resultado in zip(indices, lote):
+                resultados[i] = resultado
+        return resultados
+
+    def _opcoes(self, payload):
+        cenario = payload.get("cenario")
+        registro = getattr(self.validador_embedding, "registro", None)
+        if cenario is not None and registro is not None and cenario not in registro.nomes:
+            raise _ErroRequisicao(400, f"Cenário desconhecido: {cenario}")
+        usar_ia = payload.get("ia", True)
+        if not isinstance(usar_ia, bool):
+            # "false" ou 0 não podem virar True por serem valores "verdadeiros" em Python
+            raise _ErroRequisicao(400, 'Campo "ia" deve ser true ou false')
+        usar_ia = usar_ia and "ia" in self._lotes
+        return cenario, usar_ia
+
+    def _enviar(self, respostas, cenario, usar_ia):
+        """Coloca cada resposta nas filas; devolve [(futuro_embedding, futuro_ia)] na mesma ordem."""
+        filas = [self._lotes[nome] for nome in ("embedding", "ia") if nome in self._lotes and (nome != "ia" or usar_ia)]
+        capacidade = min((lote.capacidade_fila for lote in filas), default=len(respostas))
+        if len(respostas) > capacidade:
+            # Nunca caberia nas filas: tentar de novo (503 com Retry-After) não adiantaria
+            raise _ErroRequisicao(413, f"{len(respostas)} mensagens por requisição; o máximo é {capacidade}")
+        futuros = []
+        try:
+            for resposta in respostas:
+                futuros.append((
+                    self._lotes["embedding"].enviar((resposta, cenario)) if "embedding" in self._lotes else None,
+                    self._lotes["ia"].enviar(resposta) if usar_ia else None,
+                ))
+        except queue.Full:
+            self._cancelar(futuros)
+            raise _ErroRequisicao(503, "Serviço sobrecarregado, tente novamente", {"Retry-After": "1"})
+        return futuros
+
+    @staticmethod
+    def _cancelar(futuros):
+        for par in futuros:
+            for futuro in par:
+                if futuro is not None:
+                    futuro.cancel()
+
+    def _aguardar(self, futuros):
+        prazo = time.monotonic() + self.tempo_limite
+        resultados = []
+        try:
+            for futuro_embedding, futuro_ia in futuros:
+                resultado = {}
+                if futuro_embedding is not None:
+                    resultado["embedding"] = futuro_embedding.result(timeout=max(0.0, prazo - time.monotonic()))
+                if futuro_ia is not None:
+                    resultado["ia"] = futuro_ia.result(timeout=max(0.0, prazo - time.monotonic()))
+                resultados.append(resultado)
+        except FuturesTimeoutError:
+            self._cancelar(futuros)
+            raise _ErroRequisicao(504, f"Validação não terminou em {self.tempo_limite}s")
+        return resultados
+
+    def validar(self, payload):
+        """POST /validar: similaridade e/ou veredito da IA de uma resposta."""
+        resposta = payload.get("resposta")
+        if not isinstance(resposta, str) or not resposta:
+            raise _ErroRequisicao(400, 'Campo "resposta" (texto) obrigatório')
+        cenario, usar_ia = self._opcoes(payload)
+        return self._aguardar(self._enviar([resposta], cenario, usar_ia))[0]
+
+    def validar_conversa(self, payload):
+        """POST /validar/conversa: valida cada mensagem do chatbot de uma exportação do WhatsApp."""
+        conversa = payload.get("conversa")
+        if not isinstance(conversa, str):
+            raise _ErroRequisicao(400, 'Campo "conversa" (texto) obrigatório')
+        cenario, usar_ia = self._opcoes(payload)
+        mensagens = [
+            mensagem for mensagem in iterar_mensagens(conversa, self.remetentes_bot, apenas_bot=True)
+            if mensagem["texto"]
+        ]
+        resultados = self._aguardar(self._enviar([mensagem["texto"] for mensagem in mensagens], cenario, usar_ia))
+        return {"resultados": [
+            {"data": mensagem["data"], "hora": mensagem["hora"], "remetente": mensagem["remetente"],
+             "mensagem": mensagem["texto"], **resultado}
+            for mensagem, resultado in zip(mensagens, resultados)
+        ]}
+
+    def saude(self):
+        return {"status": "ok", "validadores": sorted(self._lotes)}
+
+    def metricas(self):
+        return {
+            "endpoints": self.latencias.resumo(),
+            "lotes": {nome: lote.estatisticas() for nome, lote in self._lotes.items()},
+        }
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self):
+        self._servidor = _Servidor((self.host, self.porta), _Handler)
+        self._servidor.servico = self
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._thread.join()
+            self._servidor = None
+        for lote in self._lotes.values():
+            lote.parar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--cenarios", default=None, help="JSON de cenários (padrão: CENARIO_PADRAO)")
+    parser.add_argument("--cache-embeddings", default=None, help="Arquivo SQLite do EmbeddingCache")
+    parser.add_argument("--api-key", default=None, help="Chave da API de IA (sem ela, vereditos simulados)")
+    parser.add_argument("--endpoint", default=None)
+    parser.add_argument("--tamanho-lote-ia", type=int, default=8, help="Respostas por prompt na API")
+    parser.add_argument("--sem-embedding", action="store_true")
+    parser.add_argument("--sem-ia", action="store_true")
+    parser.add_argument("--janela-ms", type=float, default=5.0)
+    parser.add_argument("--tamanho-fila", type=int, default=1024)
+    args = parser.parse_args()
+
+    validador_embedding = validador_ia = None
+    if not args.sem_embedding:
+        from embedding_validator import EmbeddingValidator
+
+        validador_embedding = EmbeddingValidator(cache=args.cache_embeddings, registro=args.cenarios).warmup()
+    if not args.sem_ia:
+        from chatbot.validate_chatbot import ChatbotIAValidator
+
+        validador_ia = ChatbotIAValidator(api_key=args.api_key, endpoint=args.endpoint,
+                                          tamanho_lote=args.tamanho_lote_ia)
+
+    servico = ValidationService(validador_embedding, validador_ia, host=args.host, porta=args.porta,
+                                janela=args.janela_ms / 1000, tamanho_fila=args.tamanho_fila)
+    with servico:
+        print(f"Serviço de validação em {servico.url} (Ctrl+C para sair)")
+        try:
+            servico._thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()